@@ -0,0 +1,117 @@
+"""
+Author-centric queries over the imported graph
+
+Purpose
+- Answer "which communities contain author X" and "which works of author X are in community C"
+  through the indexed AUTHOR nodes created by `Neo4jImportData.add_author_nodes`
+- Replace the `p.authors CONTAINS $nameJson` label scans used in over_segmentation.cql
+
+Usage
+    from neo4j_connection import get_connection
+    import author_queries as aq
+
+    driver = get_connection().driver
+    aq.communities_for_author(driver, DB, name="David M. Nathan")
+    aq.works_for_author(driver, DB, name="David M. Nathan", community=0)
+
+Notes
+- Authors can be selected by OpenAlex id (`author_id`) or by exact display name (`name`);
+  a display name may cover several OpenAlex ids, and an id matches every spelling it was
+  imported under, as the old `authors CONTAINS` scan did. Each spelling is a uniquely indexed
+  (:AUTHOR_NAME {name})-[:SPELLING_OF]->(:AUTHOR), so a name lookup is an index seek
+"""
+
+import argparse
+
+from neo4j_connection import add_connection_arguments, connection_from_args
+
+
+def _author_match(author_id, name):
+    """MATCH clause and parameters selecting AUTHOR nodes by id or by any of their exact spellings"""
+    if author_id is not None:
+        return "MATCH (a:AUTHOR {id: $author_id})", {"author_id": author_id}
+    if name is not None:
+        return "MATCH (:AUTHOR_NAME {name: $name})-[:SPELLING_OF]->(a:AUTHOR)", {"name": name}
+    raise ValueError("author_id or name is required")
+
+
+def find_authors(driver, db, name):
+    """AUTHOR nodes with this exact display name among their spellings as [{id, name, names, works}]"""
+    records, _, _ = driver.execute_query(
+        """
+        MATCH (:AUTHOR_NAME {name: $name})-[:SPELLING_OF]->(a:AUTHOR)
+        RETURN a.id AS id, a.name AS name, [(s:AUTHOR_NAME)-[:SPELLING_OF]->(a) | s.name] AS names,
+               COUNT { (a)-[:AUTHORED]->() } AS works
+        ORDER BY works DESC
+        """,
+        name=name, database_=db,
+    )
+    return [r.data() for r in records]
+
+
+def communities_for_author(driver, db, author_id=None, name=None):
+    """Communities containing the author's works, as [(community, size)] largest first"""
+    match, params = _author_match(author_id, name)
+    records, _, _ = driver.execute_query(
+        match + """
+        MATCH (a)-[:AUTHORED]->(p:PUBLICATION)
+        RETURN p.community AS community, count(DISTINCT p) AS size
+        ORDER BY size DESC
+        """,
+        **params, database_=db,
+    )
+    return [(r["community"], r["size"]) for r in records]
+
+
+def works_for_author(driver, db, author_id=None, name=None, community=None):
+    """The author's works (optionally only those in `community`) as [{id, title, year, venue, community}]"""
+    match, params = _author_match(author_id, name)
+    records, _, _ = driver.execute_query(
+        match + """
+        MATCH (a)-[:AUTHORED]->(p:PUBLICATION)
+        WHERE $community IS NULL OR p.community = $community
+        RETURN DISTINCT p.id AS id, p.title AS title, p.year AS year, p.venue AS venue, p.community AS community
+        ORDER BY community, id
+        """,
+        **params, community=community, database_=db,
+    )
+    return [r.data() for r in records]
+
+
+def shared_authors(driver, db, pub_id1, pub_id2):
+    """
+    Authors shared by two publications as [{id, name}], read from AUTHOR nodes
+
+    Rebuilds what a full COAUTHOR payload stores when edges were imported with payload "ids" or "none"
+    """
+    records, _, _ = driver.execute_query(
+        """
+        MATCH (a:AUTHOR)-[:AUTHORED]->(:PUBLICATION {id: $pub_id1}),
+              (a)-[:AUTHORED]->(:PUBLICATION {id: $pub_id2})
+        RETURN a.id AS id, a.name AS name
+        ORDER BY id
+        """,
+        pub_id1=pub_id1, pub_id2=pub_id2, database_=db,
+    )
+    return [r.data() for r in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query communities and works of an author")
+    add_connection_arguments(parser)
+    parser.add_argument("--author_id", help="OpenAlex author id (e.g. A5113797452)")
+    parser.add_argument("--name", help="Exact author display name (e.g. 'David M. Nathan')")
+    parser.add_argument("--community", type=int, help="List the author's works in this community")
+    args = parser.parse_args()
+
+    conn = connection_from_args(args)
+    if args.community is None:
+        for community, size in communities_for_author(conn.driver, conn.database, args.author_id, args.name):
+            print(f"Community {community}: {size} works")
+    else:
+        for work in works_for_author(conn.driver, conn.database, args.author_id, args.name, args.community):
+            print(f"{work['id']}\t{work['year']}\t{work['title']}")
+
+
+if __name__ == "__main__":
+    main()
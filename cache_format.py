@@ -0,0 +1,595 @@
+"""
+Cache formats for the per-name OpenAlex data
+
+Purpose
+- Keep the cache written by `neo4j_data.py` / `openAlex_to_HGCN.py` readable without a full JSON parse
+- Provide one entry point (`read_cache`) that detects the on-disk format automatically
+- Stream works one at a time (`iter_works`) for names too large to hold as parsed JSON
+
+Formats
+- json: the original `cache/<Author>_data.json` (indent=2), still the default for import/export
+- columnar: `cache/<Author>_data.cols`, a single typed file that is opened with a memory map
+    MAGIC (8 bytes) | header length (uint64) | header JSON | 64-byte aligned arrays
+
+    Works       : work_id, work_title (strings), work_year (int32 + null mask), work_venue (int32 -> venue)
+    Authorships : authorship_ptr (int64, CSR offsets per work),
+                  authorship_author (int32 -> author_id), authorship_name (int32 -> author_name)
+    Venues      : venue (strings)
+    Candidates  : cand_id, cand_name, cand_first, cand_middle, cand_last, cand_label (strings),
+                  cand_works_count (int64), cand_work_ptr / cand_work_idx (CSR into works)
+
+  Strings are stored as a uint8 UTF-8 buffer plus int64 offsets (`<col>.data`, `<col>.offsets`),
+  with an optional `<col>.null` mask when a column holds None values.
+- store: `cache/<Author>_data.manifest.json` plus the shared `cache/works.sqlite` (see works_store.py)
+
+How to run
+- Convert an existing cache: `python cache_format.py "David Nathan" --to columnar`
+- Convert back: `python cache_format.py "David Nathan" --to json`
+- Move into the shared works store: `python cache_format.py "David Nathan" --to store`
+
+Notes
+- Candidate work ids that are missing from works_data are dropped in the columnar format;
+  the exporters skip those ids anyway
+- When a name has caches in several formats, cache_path prefers store > columnar > JSON; writing a
+  cache never touches the other formats (write_cache warns when the new file is shadowed). Older
+  formats are retired to `*.superseded` only by an explicit conversion (`python cache_format.py
+  <name> --to <format>`) or `python works_store.py --migrate`
+- Scripts taking a cache take a path or a name (find_cache), so they follow the name's live format
+"""
+
+import os
+import re
+import json
+import argparse
+
+import works_store
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+FORMAT_JSON = "json"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_STORE = "store"
+
+MAGIC = b"ANDCOLS1"
+ALIGN = 64
+CACHE_DIR = "cache"
+EXTENSIONS = {FORMAT_COLUMNAR: ".cols", FORMAT_JSON: ".json", FORMAT_STORE: works_store.MANIFEST_SUFFIX}
+
+# Which existing cache a name resolves to when it has several: the store once migrated, then columnar, then JSON
+PRECEDENCE = (FORMAT_STORE, FORMAT_COLUMNAR, FORMAT_JSON)
+SUPERSEDED_SUFFIX = ".superseded"
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy not installed. `pip install numpy`")
+
+
+def cache_path(author_name, fmt=None, cache_dir=CACHE_DIR):
+    """
+    Path of the cache file for a name
+
+    With `fmt` set, returns the path for that format whether or not it exists.
+    Without it, returns the existing cache file first in PRECEDENCE order, or None.
+    """
+    if fmt is not None:
+        return os.path.join(cache_dir, f"{author_name}_data{EXTENSIONS[fmt]}")
+
+    for f in PRECEDENCE:
+        path = cache_path(author_name, f, cache_dir)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def supersede_other_formats(path):
+    """
+    Rename the same name's caches in the other formats to `<file>.superseded`
+
+    Called by explicit conversions (convert_cache, works_store.migrate) only, so a name's
+    git-tracked JSON cache is never retired as a side effect of a fetch. Returns the renamed paths.
+    """
+    author_name = name_from_path(path)
+    if author_name is None:
+        return []
+    cache_dir = os.path.dirname(path)
+    renamed = []
+    for fmt in EXTENSIONS:
+        other = cache_path(author_name, fmt, cache_dir)
+        if os.path.abspath(other) != os.path.abspath(path) and os.path.exists(other):
+            os.replace(other, other + SUPERSEDED_SUFFIX)
+            renamed.append(other)
+            print(f"Superseded older cache: {other} -> {other + SUPERSEDED_SUFFIX}")
+    return renamed
+
+
+def find_cache(name_or_path, cache_dir=CACHE_DIR):
+    """A cache file path as given, or the live cache of an author name (cache_path); None if neither exists"""
+    if os.path.exists(name_or_path):
+        return name_or_path
+    return cache_path(name_or_path, cache_dir=cache_dir)
+
+
+def detect_format(path):
+    """Detect the cache format from the file name (store manifests) or its leading bytes"""
+    if works_store.is_manifest(path):
+        return FORMAT_STORE
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC))
+    return FORMAT_COLUMNAR if head == MAGIC else FORMAT_JSON
+
+
+# --- String columns ---
+
+def _pack_strings(values):
+    """Encode a list of str (or None) into {'.data', '.offsets'[, '.null']} arrays"""
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    arrays = {
+        ".data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        ".offsets": offsets,
+    }
+    if any(v is None for v in values):
+        arrays[".null"] = np.array([v is None for v in values], dtype=np.uint8)
+    return arrays
+
+
+class StringColumn:
+    """Lazily decoded view over a packed string column"""
+
+    def __init__(self, data, offsets, null=None):
+        self._data = data
+        self._offsets = offsets
+        self._null = null
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if self._null is not None and self._null[i]:
+            return None
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tolist(self):
+        return list(self)
+
+
+# --- Writers ---
+
+class Interner:
+    """Assign dense int ids to hashable values in first-seen order"""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def __call__(self, value):
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def _columnar_arrays(data):
+    """Turn the cache dict into the named arrays of the columnar layout"""
+    works_data = data["works_data"]
+    author_data = data["author_data"]
+    author_id_to_label = data["author_id_to_label"]
+
+    work_ids = list(works_data.keys())
+    work_index = {wid: i for i, wid in enumerate(work_ids)}
+
+    venues, author_ids, author_names = Interner(), Interner(), Interner()
+    years = np.zeros(len(work_ids), dtype=np.int32)
+    year_null = np.zeros(len(work_ids), dtype=np.uint8)
+    work_venue = np.zeros(len(work_ids), dtype=np.int32)
+    authorship_ptr = np.zeros(len(work_ids) + 1, dtype=np.int64)
+    authorship_author, authorship_name = [], []
+
+    for i, wid in enumerate(work_ids):
+        work = works_data[wid]
+        if work.get("year") is None:
+            year_null[i] = 1
+        else:
+            years[i] = int(work["year"])
+        work_venue[i] = -1 if work.get("venue") is None else venues(work["venue"])
+        for a in work.get("authors", []):
+            authorship_author.append(author_ids(a["id"]))
+            authorship_name.append(author_names(a["name"]))
+        authorship_ptr[i + 1] = len(authorship_author)
+
+    cand_ids = list(author_data.keys())
+    cand_work_ptr = np.zeros(len(cand_ids) + 1, dtype=np.int64)
+    cand_work_idx = []
+    for i, cid in enumerate(cand_ids):
+        cand_work_idx.extend(work_index[w] for w in author_data[cid].get("works", []) if w in work_index)
+        cand_work_ptr[i + 1] = len(cand_work_idx)
+
+    columns = {
+        "work_year": years,
+        "work_year.null": year_null,
+        "work_venue": work_venue,
+        "authorship_ptr": authorship_ptr,
+        "authorship_author": np.array(authorship_author, dtype=np.int32),
+        "authorship_name": np.array(authorship_name, dtype=np.int32),
+        "cand_works_count": np.array([author_data[c].get("works_count") or 0 for c in cand_ids], dtype=np.int64),
+        "cand_work_ptr": cand_work_ptr,
+        "cand_work_idx": np.array(cand_work_idx, dtype=np.int32),
+    }
+    strings = {
+        "work_id": work_ids,
+        "work_title": [works_data[w].get("title") for w in work_ids],
+        "venue": venues.values,
+        "author_id": author_ids.values,
+        "author_name": author_names.values,
+        "cand_id": cand_ids,
+        "cand_name": [author_data[c].get("name") for c in cand_ids],
+        "cand_first": [author_data[c].get("name_first") for c in cand_ids],
+        "cand_middle": [author_data[c].get("name_middle") for c in cand_ids],
+        "cand_last": [author_data[c].get("name_last") for c in cand_ids],
+        "cand_label": [author_id_to_label.get(c) for c in cand_ids],
+    }
+    for name, values in strings.items():
+        for suffix, arr in _pack_strings(values).items():
+            columns[name + suffix] = arr
+    return columns
+
+
+def write_columnar(path, data):
+    """Write the cache dict to `path` in the columnar format"""
+    _require_numpy()
+    columns = _columnar_arrays(data)
+
+    header = {"version": 1, "author_name": data.get("author_name"), "arrays": {}}
+    offset = 0
+    for name, arr in columns.items():
+        arr = np.ascontiguousarray(arr)
+        columns[name] = arr
+        header["arrays"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix_len = len(MAGIC) + 8 + len(header_bytes)
+    body_start = -(-prefix_len // ALIGN) * ALIGN
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        f.write(b"\0" * (body_start - prefix_len))
+        for name, arr in columns.items():
+            f.write(arr.tobytes())
+            f.write(b"\0" * (-arr.nbytes % ALIGN))
+
+
+def write_cache(path, data, fmt=FORMAT_JSON):
+    """Write the cache dict in the requested format (the name's caches in other formats are left alone)"""
+    if fmt == FORMAT_COLUMNAR:
+        write_columnar(path, data)
+    elif fmt == FORMAT_STORE:
+        works_store.save_name(path, data)
+    elif fmt == FORMAT_JSON:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    else:
+        raise ValueError(f"Unknown cache format: {fmt}")
+
+    author_name = name_from_path(path)
+    live = author_name and cache_path(author_name, cache_dir=os.path.dirname(path))
+    if live and os.path.abspath(live) != os.path.abspath(path):
+        print(f"Note: {live} takes precedence over {path}; "
+              f"`python cache_format.py \"{author_name}\" --to {fmt}` makes the new file the live cache")
+
+
+# --- Readers ---
+
+class ColumnarCache:
+    """
+    Memory-mapped reader for the columnar cache
+
+    Arrays are views into the mapped file; nothing is parsed until a column
+    is accessed, and string columns decode one value at a time.
+    """
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = path
+        self._buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._buf[:len(MAGIC)].tobytes() != MAGIC:
+            raise ValueError(f"{path} is not a columnar cache file")
+
+        header_len = int.from_bytes(self._buf[len(MAGIC):len(MAGIC) + 8].tobytes(), "little")
+        header_end = len(MAGIC) + 8 + header_len
+        self.header = json.loads(self._buf[len(MAGIC) + 8:header_end].tobytes())
+        self._body_start = -(-header_end // ALIGN) * ALIGN
+        self.author_name = self.header.get("author_name")
+
+    def has(self, name):
+        return name in self.header["arrays"]
+
+    def array(self, name):
+        meta = self.header["arrays"][name]
+        dtype = np.dtype(meta["dtype"])
+        count = int(np.prod(meta["shape"])) if meta["shape"] else 1
+        start = self._body_start + meta["offset"]
+        return self._buf[start:start + count * dtype.itemsize].view(dtype).reshape(meta["shape"])
+
+    def strings(self, name):
+        null = self.array(name + ".null") if self.has(name + ".null") else None
+        return StringColumn(self.array(name + ".data"), self.array(name + ".offsets"), null)
+
+    @property
+    def n_works(self):
+        return len(self.array("work_year"))
+
+    def iter_works(self):
+        """Yield works one at a time in the cache's work schema"""
+        work_id, title = self.strings("work_id"), self.strings("work_title")
+        venue = self.strings("venue")
+        author_id, author_name = self.strings("author_id"), self.strings("author_name")
+        years, year_null = self.array("work_year"), self.array("work_year.null")
+        work_venue, ptr = self.array("work_venue"), self.array("authorship_ptr")
+        a_idx, n_idx = self.array("authorship_author"), self.array("authorship_name")
+
+        for i in range(self.n_works):
+            start, end = int(ptr[i]), int(ptr[i + 1])
+            yield {
+                "id": work_id[i],
+                "title": title[i],
+                "year": None if year_null[i] else int(years[i]),
+                "authors": [{"name": author_name[int(n_idx[k])], "id": author_id[int(a_idx[k])]}
+                            for k in range(start, end)],
+                "venue": None if work_venue[i] < 0 else venue[int(work_venue[i])],
+            }
+
+    def works_data(self):
+        return {work["id"]: work for work in self.iter_works()}
+
+    def author_data(self):
+        work_id = self.strings("work_id")
+        ptr, idx = self.array("cand_work_ptr"), self.array("cand_work_idx")
+        cols = {k: self.strings("cand_" + k) for k in ("id", "name", "first", "middle", "last")}
+        works_count = self.array("cand_works_count")
+
+        author_data = {}
+        for i in range(len(works_count)):
+            cid = cols["id"][i]
+            author_data[cid] = {
+                "id": cid,
+                "name": cols["name"][i],
+                "name_first": cols["first"][i],
+                "name_middle": cols["middle"][i],
+                "name_last": cols["last"][i],
+                "works_count": int(works_count[i]),
+                "works": [work_id[int(k)] for k in idx[int(ptr[i]):int(ptr[i + 1])]],
+            }
+        return author_data
+
+    def author_id_to_label(self):
+        cand_id, cand_label = self.strings("cand_id"), self.strings("cand_label")
+        return {cand_id[i]: cand_label[i] for i in range(len(cand_id)) if cand_label[i] is not None}
+
+    def to_dict(self):
+        return {
+            "author_name": self.author_name,
+            "author_data": self.author_data(),
+            "works_data": self.works_data(),
+            "author_id_to_label": self.author_id_to_label(),
+        }
+
+
+def read_cache(path):
+    """
+    Read a cache file of either format into the cache dict
+    {author_name, author_data, works_data, author_id_to_label}
+    """
+    fmt = detect_format(path)
+    if fmt == FORMAT_COLUMNAR:
+        return ColumnarCache(path).to_dict()
+    if fmt == FORMAT_STORE:
+        return works_store.load_name(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- Streaming readers ---
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class _JsonStream:
+    """
+    Minimal incremental JSON reader over a text file
+
+    Keeps only the unread tail of the file in memory; values are decoded with
+    json's raw_decode as soon as they are complete in the buffer.
+    """
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of file)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        ch = self.peek()
+        if ch not in chars:
+            raise ValueError(f"Malformed cache JSON: expected one of {chars!r}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Value is not complete yet; read more (growing reads for large values)
+            self._fill(size)
+            size *= 2
+
+    def members(self):
+        """Iterate (key, stream) over the members of the next object; caller consumes each value"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+def _iter_json_works(path, chunk_size=1 << 20):
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.members():
+            if key != "works_data":
+                stream.value()
+                continue
+            for _ in stream.members():
+                yield stream.value()
+
+
+def iter_works(path, chunk_size=1 << 20):
+    """
+    Yield the works of a cache file one at a time, in file order
+
+    Columnar caches are read from the memory map; JSON caches are parsed
+    incrementally, so only one work (plus a read buffer) is held at a time.
+    Store manifests look works up from the works store in chunks.
+    """
+    fmt = detect_format(path)
+    if fmt == FORMAT_COLUMNAR:
+        yield from ColumnarCache(path).iter_works()
+    elif fmt == FORMAT_STORE:
+        yield from works_store.iter_name_works(path)
+    else:
+        yield from _iter_json_works(path, chunk_size)
+
+
+def read_cache_metadata(path, chunk_size=1 << 20):
+    """
+    Read everything except works_data (author_name, author_data, author_id_to_label)
+    without materializing the works
+    """
+    fmt = detect_format(path)
+    if fmt == FORMAT_STORE:
+        return works_store.read_name_metadata(path)
+    if fmt == FORMAT_COLUMNAR:
+        cache = ColumnarCache(path)
+        return {
+            "author_name": cache.author_name,
+            "author_data": cache.author_data(),
+            "author_id_to_label": cache.author_id_to_label(),
+        }
+
+    metadata = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.members():
+            if key == "works_data":
+                for _ in stream.members():
+                    stream.value()
+            else:
+                metadata[key] = stream.value()
+    return metadata
+
+
+def name_from_path(path):
+    """Author name of a cache file path ("cache/David Nathan_data.json" -> "David Nathan"), or None"""
+    file = os.path.basename(path)
+    # Longest suffix first so "X_data.manifest.json" is not read as a JSON cache
+    for suffix in sorted(("_data" + ext for ext in EXTENSIONS.values()), key=len, reverse=True):
+        if file.endswith(suffix):
+            return file[:-len(suffix)]
+    return None
+
+
+def list_cached_names(cache_dir=CACHE_DIR):
+    """Names with a cache file of any format in `cache_dir`, sorted"""
+    if not os.path.isdir(cache_dir):
+        return []
+    names = {name_from_path(file) for file in os.listdir(cache_dir)}
+    names.discard(None)
+    return sorted(names)
+
+
+def convert_cache(author_name, fmt, cache_dir=CACHE_DIR):
+    """
+    Make `fmt` the name's live cache and return its path
+
+    The live cache is rewritten in `fmt` unless a cache in that format already exists (it is kept
+    as is); the name's caches in the other formats are then renamed to `*.superseded`
+    """
+    dst = cache_path(author_name, fmt, cache_dir=cache_dir)
+    src = cache_path(author_name, cache_dir=cache_dir)
+    if src is None:
+        raise FileNotFoundError(f"No cached data found for {author_name}")
+    if src == dst:
+        print(f"Cache for {author_name} is already {fmt}: {dst}")
+    elif not os.path.exists(dst):
+        write_cache(dst, read_cache(src), fmt)
+    supersede_other_formats(dst)
+    return dst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a cached name between JSON and the columnar format")
+    parser.add_argument("author_name", help="Name whose cache to convert (e.g., 'David Nathan')")
+    parser.add_argument("--to", choices=list(EXTENSIONS), default=FORMAT_COLUMNAR,
+                        help="Target format")
+    parser.add_argument("--cache_dir", default=CACHE_DIR, help="Cache directory")
+    args = parser.parse_args()
+
+    dst = convert_cache(args.author_name, args.to, args.cache_dir)
+    print(f"Cache written to: {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Unified command line for the workflow: fetch, import, cluster, export and HGCN files
+
+Purpose
+- One entry point instead of five scripts; every subcommand imports only the module that runs it,
+  so `python cli.py --help` and the light subcommands do not load scikit-learn, networkx, requests
+  or the neo4j driver (see import_bench.py)
+
+Usage
+- `python cli.py fetch "David Nathan" [--format columnar]`          neo4j_data.py (same options)
+- `python cli.py import "David Nathan" [--cotitle lsh]`             neo4j_import.main on the name's cache
+  (or a cache path); `--stream` fetches and imports concurrently instead (streaming_import.py)
+- `python cli.py cluster [--method leiden --resolution 0.05] [--merge_threshold 0.3] [--knn_k 10]`
+- `python cli.py export --out clusters.json [--format ndjson]`      cluster_export_to_json.py (same options)
+- `python cli.py hgcn --name "David Nathan" --create_files_only`    openAlex_to_HGCN.py (same options)
+- Neo4j settings come from --uri / --user / --password / --db or NEO4J_* / neo4j_config.json
+  (neo4j_connection.py)
+"""
+
+import argparse
+import importlib
+import sys
+
+import cache_format
+from neo4j_connection import add_connection_arguments, connection_from_args
+
+# Subcommands that hand their arguments to an existing script's main(argv)
+DELEGATED = {
+    "fetch": ("neo4j_data", "Fetch publications for author names from OpenAlex into cache/"),
+    "export": ("cluster_export_to_json", "Export PUBLICATION communities from Neo4j to JSON / NDJSON"),
+    "hgcn": ("openAlex_to_HGCN", "Create HGCN XML / pair / sparse files from OpenAlex or the cache"),
+}
+
+
+def run_import(args):
+    conn = connection_from_args(args)
+    if args.stream:
+        import streaming_import
+
+        report = streaming_import.stream_import(
+            conn.uri, *conn.auth, conn.database, args.name, fmt=args.format,
+            author_nodes=args.author_nodes, cotitle=args.cotitle, coauthor_payload=args.coauthor_payload,
+        )
+        print(f"fetch {report['fetch_s']:.2f}s | import {report['import_s']:.2f}s | total {report['total_s']:.2f}s")
+        return
+
+    import neo4j_import
+
+    path = cache_format.find_cache(args.name)
+    if path is None:
+        sys.exit(f"No cached data found for {args.name}; run `python cli.py fetch \"{args.name}\"` first")
+    neo4j_import.main(conn.uri, *conn.auth, conn.database, path,
+                      author_nodes=args.author_nodes, cotitle=args.cotitle,
+                      exclude_query_name=args.exclude_query_name, max_authors=args.max_authors,
+                      coauthor_payload=args.coauthor_payload)
+
+
+def run_cluster(args):
+    import community_detection as cd
+
+    conn = connection_from_args(args)
+    partition = cd.detect_communities(conn.uri, *conn.auth, conn.database, method=args.method,
+                                      resolution=args.resolution, merge_threshold=args.merge_threshold,
+                                      knn_k=args.knn_k, write=not args.no_write)
+    print(f"{args.method}: {len(set(partition.values()))} communities over {len(partition)} publications"
+          + ("" if args.no_write else " (written to PUBLICATION.community)"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Name disambiguation workflow: fetch, import, cluster, export, hgcn")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # Listed for --help only; main() hands their arguments over before parsing
+    for name, (module, help_text) in DELEGATED.items():
+        sub.add_parser(name, help=f"{help_text} (options of {module}.py)")
+
+    p = sub.add_parser("import", help="Import a cached name into Neo4j and build its edges")
+    p.add_argument("name", help="Author name with a cache in cache/, or a cache file path")
+    add_connection_arguments(p)
+    p.add_argument("--cotitle", choices=["tfidf", "lsh", "cached"], default="tfidf")
+    p.add_argument("--coauthor_payload", choices=["full", "ids", "none"], default="full")
+    p.add_argument("--author_nodes", action="store_true", help="Also create AUTHOR nodes (author_queries.py)")
+    p.add_argument("--exclude_query_name", action="store_true",
+                   help="Do not count the name's own candidate ids as shared coauthors")
+    p.add_argument("--max_authors", type=int, default=None, help="COAUTHOR hub cap (authors per work)")
+    p.add_argument("--stream", action="store_true", help="Fetch from OpenAlex and import concurrently")
+    p.add_argument("--format", choices=list(cache_format.EXTENSIONS), default=cache_format.FORMAT_JSON,
+                   help="Cache format written with --stream")
+
+    p = sub.add_parser("cluster", help="Detect communities on the imported graph")
+    add_connection_arguments(p)
+    p.add_argument("--method", choices=["louvain", "leiden"], default="louvain")
+    p.add_argument("--resolution", type=float, default=1.0)
+    p.add_argument("--merge_threshold", type=float, default=None, help="Merge over-split communities")
+    p.add_argument("--knn_k", type=int, default=None, help="Cluster a kNN-sparsified graph")
+    p.add_argument("--no_write", action="store_true", help="Do not write communities back to Neo4j")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        importlib.import_module(DELEGATED[argv[0]][0]).main(argv[1:])
+        return
+
+    args = build_parser().parse_args(argv)
+    if args.command == "import":
+        run_import(args)
+    else:
+        run_cluster(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,100 @@
-from neo4j import GraphDatabase
-import pandas as pd
+import argparse
 import json
 
-# Connect to your Neo4j instance
-URI = "bolt://localhost:7687"
-AUTH = ("neo4j", "and123$$")   # replace with your credentials
-driver = GraphDatabase.driver(URI, auth=AUTH)
+from neo4j_connection import add_connection_arguments, get_connection
 
-def export_clusters():
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+
+
+def _write_grouped_json(f, records):
+    """
+    Write records already ordered by community as {community: [records]} with indent=2,
+    one record at a time
+    """
+    current = None
+    for community, record in records:
+        if community != current:
+            f.write("{\n" if current is None else "\n  ],\n")
+            f.write(f"  {json.dumps(str(community))}: [\n")
+            current = community
+        else:
+            f.write(",\n")
+        f.write("\n".join("    " + line for line in json.dumps(record, indent=2).splitlines()))
+    f.write("{}" if current is None else "\n  ]\n}")
+
+
+def _write_ndjson(f, records):
+    """Write one JSON object per line, with the community alongside each record"""
+    for community, record in records:
+        f.write(json.dumps({"community": community, **record}))
+        f.write("\n")
+
+
+def export_clusters(uri=None, auth=None, db=None, out_path="clusters.json", fmt=FORMAT_JSON,
+                    fetch_size=None, communities=None):
+    """
+    Stream PUBLICATION nodes grouped by community to a file
+
+    Args
+        uri (str): Neo4j URI
+        auth (tuple): (user, password)
+        db (str): database name
+        out_path (str): output file
+        fmt (str): "json" for {community: [records]} or "ndjson" for one record per line
+        fetch_size (int): records pulled from the server per batch
+        (connection settings left as None come from neo4j_connection: environment / config file)
+        communities (list[int]): only export these communities (all when None)
+
+    Returns
+        number of records written
+    """
     query = """
     MATCH (p:PUBLICATION)
+    WHERE p.community IS NOT NULL
+      AND ($communities IS NULL OR p.community IN $communities)
     RETURN p.id AS pubId, p.title AS title, p.community AS community, p.authors AS coauthors
     ORDER BY community, pubId
     """
 
-    with driver.session() as session:
-        result = session.run(query)
-        records = [record.data() for record in result]
+    writer = _write_ndjson if fmt == FORMAT_NDJSON else _write_grouped_json
+    count = 0
+
+    def records(result):
+        nonlocal count
+        for record in result:
+            count += 1
+            yield record["community"], {
+                "pubId": record["pubId"],
+                "title": record["title"],
+                "coauthors": record["coauthors"],
+            }
+
+    user, password = auth or (None, None)
+    conn = get_connection(uri, user, password, db, fetch_size=fetch_size)
+    with conn.read_session() as session, open(out_path, "w") as f:
+        result = session.run(query, communities=communities)
+        writer(f, records(result))
+
+    print(f"Exported {count} publications to {out_path}")
+    return count
 
-    # Convert to DataFrame for easy handling
-    df = pd.DataFrame(records)
-    print(df.head())
 
-    # Group by community and dump as JSON
-    grouped = df.groupby("community").apply(
-        lambda x: x[["pubId", "title", "coauthors"]].to_dict("records")
-    ).to_dict()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PUBLICATION communities from Neo4j")
+    add_connection_arguments(parser)
+    parser.add_argument("--out", default="clusters.json", help="Output file")
+    parser.add_argument("--format", choices=[FORMAT_JSON, FORMAT_NDJSON], default=FORMAT_JSON,
+                        help="Grouped JSON or newline-delimited JSON")
+    parser.add_argument("--fetch_size", type=int, default=None,
+                        help="Records fetched per batch (default: NEO4J_FETCH_SIZE, then 10000)")
+    parser.add_argument("--community", type=int, action="append", dest="communities",
+                        help="Only export this community (repeatable)")
+    args = parser.parse_args(argv)
 
-    with open("clusters.json", "w") as f:
-        json.dump(grouped, f, indent=2)
+    export_clusters(args.uri, (args.user, args.password), args.db, args.out, args.format,
+                    args.fetch_size, args.communities)
 
-    print("Exported to clusters.json")
 
 if __name__ == "__main__":
-    export_clusters()
\ No newline at end of file
+    main()
@@ -1,21 +1,19 @@
-from neo4j import GraphDatabase
-import networkx as nx
-
-# Louvain (python-louvain)
-try:
-    import community as community_louvain  # pip install python-louvain
-except Exception:
-    community_louvain = None
-
-# Leiden (igraph + leidenalg)
-try:
-    import igraph as ig
-    import leidenalg as la
-except Exception:
-    ig = None
-    la = None
-
-def load_pub_graph_from_neo4j(uri, user, password, db,
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import cache_format
+from neo4j_connection import get_connection
+from community_merge import merge_communities
+
+# networkx, python-louvain and igraph / leidenalg are imported by the functions that use them
+if TYPE_CHECKING:
+    import networkx as nx
+
+def load_pub_graph_from_neo4j(uri=None, user=None, password=None, db=None,
                               coauthor_scale: float = 1.0,
                               covenue_scale: float = 1.0,
                               cotitle_scale: float = 1.2,
@@ -27,8 +25,11 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
       - COAUTHOR: coauthor_scale * (log(1 + weight) if use_log_coauthor else weight; defaults to 1.0 if missing)
       - COVENUE : covenue_scale * 1.0 (if r.weight is null or 0) else r.weight
       - COTITLE : cotitle_scale * coalesce(r.similarity, 0.0)
+
+    Connection settings left as None come from neo4j_connection (environment / config file);
+    the edges are streamed through a read session with its fetch size.
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    import networkx as nx
 
     q = """
     MATCH (p1:PUBLICATION)-[r:COAUTHOR|COVENUE|COTITLE]-(p2:PUBLICATION)
@@ -53,7 +54,7 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
     """
 
     G = nx.Graph()
-    with driver.session(database=db) as session:
+    with get_connection(uri, user, password, db).read_session() as session:
         for rec in session.run(q,
                                coauthorScale=coauthor_scale,
                                covenueScale=covenue_scale,
@@ -66,7 +67,6 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
                 G[a][b]["weight"] += w
             else:
                 G.add_edge(a, b, weight=w)
-    driver.close()
     return G
 
 def run_louvain(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
@@ -75,7 +75,9 @@ def run_louvain(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
     Returns:
       (partition_dict, modularity)
     """
-    if community_louvain is None:
+    try:
+        import community as community_louvain  # pip install python-louvain
+    except Exception:
         raise RuntimeError("python-louvain not installed. `pip install python-louvain`")
     part = community_louvain.best_partition(G, weight="weight",
                                             resolution=resolution,
@@ -89,7 +91,10 @@ def run_leiden(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
     Returns:
       (partition_dict, quality)
     """
-    if ig is None or la is None:
+    try:
+        import igraph as ig
+        import leidenalg as la
+    except Exception:
         raise RuntimeError("Leiden not installed. `pip install python-igraph leidenalg`")
 
     # Map NetworkX nodes -> indices
@@ -115,27 +120,291 @@ def run_leiden(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
     quality = part.quality()
     return partition, quality
 
+def sparsify_knn(G: nx.Graph, k: int = 10, min_weight: float = None, keep_ties: bool = False) -> nx.Graph:
+    """
+    Keep each node's k heaviest edges (an edge survives if either endpoint keeps it)
+
+    Selection is vectorized over the CSR adjacency: entries are sorted by (row, -weight, column)
+    once and each row keeps its first k, so equal weights (e.g. plain COVENUE edges) are broken
+    deterministically by node order and at most n * k edges survive. keep_ties instead keeps every
+    edge as heavy as a row's k-th (no bound on the edge count). With min_weight, lighter edges
+    are dropped first.
+    All nodes are kept, including ones left without edges.
+    """
+    import networkx as nx
+
+    nodes = list(G.nodes())
+    H = nx.Graph()
+    H.add_nodes_from(nodes)
+    if not nodes:
+        return H
+
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight="weight", format="csr")
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    cols, data = A.indices, A.data
+    if min_weight is not None:
+        keep = data >= min_weight
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+
+    # Rank of each entry within its row by descending weight, ties by column
+    order = np.lexsort((cols, -data, rows))
+    rows, cols, data = rows[order], cols[order], data[order]
+    row_start = np.searchsorted(rows, np.arange(A.shape[0]))
+    if keep_ties:
+        # k-th largest weight per row; ties with it are kept too
+        row_len = np.diff(np.append(row_start, len(rows)))
+        kth = np.full(A.shape[0], -np.inf)
+        full = row_len > k
+        kth[full] = data[row_start[full] + k - 1]
+        keep = data >= kth[rows]
+    else:
+        keep = np.arange(len(rows)) - row_start[rows] < k
+
+    # Undirected union: store each kept edge once as (min, max)
+    lo = np.minimum(rows[keep], cols[keep]).astype(np.int64)
+    hi = np.maximum(rows[keep], cols[keep]).astype(np.int64)
+    _, first = np.unique(lo * len(nodes) + hi, return_index=True)
+    H.add_weighted_edges_from(
+        (nodes[i], nodes[j], w)
+        for i, j, w in zip(lo[first].tolist(), hi[first].tolist(), data[keep][first].tolist()) if i != j
+    )
+    return H
+
+def cluster(G: nx.Graph, method: str = "louvain", resolution: float = 1.0, seed: int = 42):
+    """run_louvain or run_leiden by name; returns (partition_dict, score)"""
+    if method == "louvain":
+        return run_louvain(G, resolution, seed)
+    if method == "leiden":
+        return run_leiden(G, resolution, seed)
+    raise ValueError(f"Unknown method: {method}")
+
+def sparsification_report(G: nx.Graph, k: int = 10, min_weight: float = None,
+                          method: str = "louvain", labels=None, keep_ties: bool = False,
+                          resolution: float = 1.0, seed: int = 42):
+    """
+    Cluster G with and without kNN sparsification and compare
+
+    Modularity of both partitions is measured on the full graph G so the numbers are comparable.
+    Returns (H, partition on H, report dict with edges / seconds / communities / modularity / f1 per side)
+    """
+    import networkx as nx
+
+    start = time.perf_counter()
+    H = sparsify_knn(G, k, min_weight, keep_ties)
+    sparsify_s = time.perf_counter() - start
+
+    report = {"k": k, "min_weight": min_weight, "keep_ties": keep_ties, "sparsify_s": sparsify_s}
+    partitions = {}
+    for tag, graph in (("full", G), ("knn", H)):
+        start = time.perf_counter()
+        partition, _ = cluster(graph, method, resolution, seed)
+        seconds = time.perf_counter() - start
+        groups = {}
+        for node, comm in partition.items():
+            groups.setdefault(comm, set()).add(node)
+        report[tag] = {
+            "edges": graph.number_of_edges(),
+            "seconds": seconds,
+            "communities": len(groups),
+            "modularity": nx.algorithms.community.modularity(G, groups.values(), weight="weight"),
+        }
+        if labels is not None:
+            report[tag]["f1"] = pairwise_scores(partition, labels)["f1"]
+        partitions[tag] = partition
+    return H, partitions["knn"], report
+
+def work_labels_from_cache(data_path):
+    """
+    Ground-truth label per work from the cache: the label of the first candidate
+    author listing it (the same rule create_xml_file uses)
+    """
+    metadata = cache_format.read_cache_metadata(data_path)
+    labels = {}
+    for author_id, author in metadata["author_data"].items():
+        label = metadata["author_id_to_label"].get(author_id, "0")
+        for work_id in author["works"]:
+            labels.setdefault(work_id, label)
+    return labels
+
+def pairwise_scores(partition, labels):
+    """
+    Pairwise precision / recall / F1 of a partition against ground-truth labels
+
+    Only works present in both are scored. Returns dict {precision, recall, f1, n}.
+    """
+    ids = [n for n in partition if n in labels]
+    if not ids:
+        return {"precision": 0.0, "recall": 0.0, "f1": 0.0, "n": 0}
+
+    _, pred = np.unique([partition[n] for n in ids], return_inverse=True)
+    _, true = np.unique([labels[n] for n in ids], return_inverse=True)
+
+    def pairs(counts):
+        counts = counts.astype(np.float64)
+        return float((counts * (counts - 1) / 2).sum())
+
+    # Contingency table cells via a combined key
+    both = pairs(np.unique(pred * (true.max() + 1) + true, return_counts=True)[1])
+    pred_pairs = pairs(np.bincount(pred))
+    true_pairs = pairs(np.bincount(true))
+
+    precision = both / pred_pairs if pred_pairs else 1.0
+    recall = both / true_pairs if true_pairs else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1, "n": len(ids)}
+
+def graph_fingerprint(uri=None, user=None, password=None, db=None):
+    """
+    Cheap fingerprint of the imported graph: the PUBLICATION count plus the count and summed
+    weight / similarity of each relationship type (aggregates only; no edge is streamed)
+
+    Re-importing a name (new cache, other COTITLE threshold, hub options) changes it.
+    """
+    import hashlib
+    import json
+
+    records, _, _ = get_connection(uri, user, password, db).execute_query("""
+        MATCH (p:PUBLICATION)
+        WITH count(p) AS nodes
+        OPTIONAL MATCH (:PUBLICATION)-[r:COAUTHOR|COVENUE|COTITLE]->(:PUBLICATION)
+        RETURN nodes, type(r) AS t, count(r) AS edges,
+               sum(toFloat(coalesce(r.weight, r.similarity, 0.0))) AS total
+        """, routing="read")
+    summary = sorted((r["t"] or "", r["nodes"], r["edges"], round(float(r["total"] or 0.0), 6)) for r in records)
+    return hashlib.sha256(json.dumps(summary).encode("utf-8")).hexdigest()
+
+def write_partition(uri, user, password, db, partition, prop="community"):
+    """Write {publication id: community} back to PUBLICATION nodes, batched per community"""
+    updates = {}
+    for node_id, comm in partition.items():
+        updates.setdefault(comm, []).append(node_id)
+
+    with get_connection(uri, user, password, db).write_session() as session:
+        for comm, ids in updates.items():
+            session.run(
+                f"""
+                UNWIND $ids AS pid
+                MATCH (p:PUBLICATION {{id: pid}})
+                SET p.`{prop}` = $comm
+                """,
+                ids=ids, comm=int(comm)
+            )
+
+def detect_communities(uri=None, user=None, password=None, db=None, method="louvain", resolution=1.0,
+                       merge_threshold=None, knn_k=None, write=True):
+    """
+    Load the fused graph, cluster it and (with write) store `community` on PUBLICATION nodes
+
+    knn_k sparsifies the graph first (sparsify_knn); merge_threshold merges over-split communities
+    afterwards (community_merge.merge_communities). Returns {publication id: community}.
+    """
+    G = load_pub_graph_from_neo4j(uri, user, password, db)
+    if knn_k is not None:
+        G = sparsify_knn(G, knn_k)
+    if method == "leiden":
+        partition, _ = run_leiden(G, resolution=resolution)
+    elif method == "louvain":
+        partition, _ = run_louvain(G, resolution=resolution)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    if merge_threshold is not None:
+        partition, _ = merge_communities(G, partition, threshold=merge_threshold)
+    if write:
+        write_partition(uri, user, password, db, partition)
+    return partition
+
 def main():
-    # Example hardcoded parameters
-    uri = "bolt://localhost:7687"
-    user = "neo4j"
-    password = "and123$$"
-    db = "neo4j"
+    import networkx as nx
+    import snapshots
+
+    # Example hardcoded parameters (connection from NEO4J_* / neo4j_config.json, see neo4j_connection.py)
+    conn = get_connection()
+    uri, (user, password), db = conn.uri, conn.auth, conn.database
     method = "louvain"
+    resolution = 1.0
+    seed = 42
+    data_path = cache_format.cache_path("David Nathan")  # ground-truth labels for the merge / kNN reports
+    merge_threshold = 0.3                       # None to skip the post-clustering merge
+    knn_k = None                                # e.g. 10 to cluster a kNN-sparsified graph
+    knn_min_weight = None
+    knn_keep_ties = False                       # True keeps every edge tied with a node's k-th (unbounded)
+    snapshot_name = None                        # e.g. "David Nathan" to reuse / record snapshots (snapshots.py)
+    refresh_graph = False                       # True always reloads from Neo4j as a new graph version
+    write_back = False
 
-    # Load graph from Neo4j
-    G = load_pub_graph_from_neo4j(uri, user, password, db)
+    # Reuse the latest graph snapshot while Neo4j still holds the same import; otherwise load from
+    # Neo4j (saving a new graph version when a name is set)
+    graph_params, reuse = None, False
+    if snapshot_name is not None:
+        graph_params = {"uri": uri, "db": db, "fingerprint": graph_fingerprint(uri, user, password, db)}
+        graphs = snapshots.read_manifest(snapshot_name)["graphs"]
+        reuse = (bool(graphs) and not refresh_graph
+                 and graphs[-1]["params"].get("fingerprint") == graph_params["fingerprint"])
+    if reuse:
+        G = snapshots.load_graph(snapshot_name)
+        print(f"Loaded graph snapshot '{snapshot_name}': {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    else:
+        G = load_pub_graph_from_neo4j(uri, user, password, db)
+        if snapshot_name is not None:
+            version = snapshots.save_graph(snapshot_name, G, graph_params)
+            print(f"Saved graph snapshot '{snapshot_name}' v{version}")
+    G_loaded = G
 
-    if method == "louvain":
-        partition, modularity = run_louvain(G)
+    if knn_k is not None:
+        G, partition, report = sparsification_report(G, knn_k, knn_min_weight, method,
+                                                     work_labels_from_cache(data_path), knn_keep_ties,
+                                                     resolution, seed)
+        full, knn = report["full"], report["knn"]
+        print(f"kNN sparsification (k={knn_k}): {full['edges']} -> {knn['edges']} edges "
+              f"({1 - knn['edges'] / max(full['edges'], 1):.1%} fewer) in {report['sparsify_s']:.2f}s")
+        for tag, r in (("full", full), ("knn", knn)):
+            print(f"  {tag:>4}: {r['communities']} communities | modularity {r['modularity']:.4f} | "
+                  f"F1 {r['f1']:.4f} | clustered in {r['seconds']:.2f}s")
+        print(f"{method.capitalize()} partition size: {len(set(partition.values()))}")
+    elif method == "louvain":
+        partition, modularity = run_louvain(G, resolution, seed)
         print(f"Louvain partition size: {len(set(partition.values()))}")
         print(f"Louvain modularity: {modularity:.4f}")
     elif method == "leiden":
-        partition, quality = run_leiden(G)
+        partition, quality = run_leiden(G, resolution, seed)
         print(f"Leiden partition size: {len(set(partition.values()))}")
         print(f"Leiden quality: {quality:.4f}")
     else:
         print(f"Unknown method: {method}")
+        return
+
+    merges = []
+    if merge_threshold is not None:
+        merged, merges = merge_communities(G, partition, threshold=merge_threshold)
+        print(f"Merged {len(merges)} community pairs: "
+              f"{len(set(partition.values()))} -> {len(set(merged.values()))} communities")
+
+        labels = work_labels_from_cache(data_path)
+        for tag, part in (("before merge", partition), ("after merge", merged)):
+            scores = pairwise_scores(part, labels)
+            print(f"Pairwise {tag}: precision {scores['precision']:.4f} | "
+                  f"recall {scores['recall']:.4f} | F1 {scores['f1']:.4f}")
+        partition = merged
+
+    if snapshot_name is not None:
+        groups = {}
+        for node, comm in partition.items():
+            groups.setdefault(comm, set()).add(node)
+        metrics = {"modularity": nx.algorithms.community.modularity(G_loaded, groups.values(), weight="weight"),
+                   "merges": len(merges)}
+        metrics.update({k: v for k, v in pairwise_scores(partition, work_labels_from_cache(data_path)).items()
+                        if k in ("precision", "recall", "f1")})
+        params = {"resolution": resolution, "seed": seed, "merge_threshold": merge_threshold, "knn_k": knn_k,
+                  "knn_min_weight": knn_min_weight, "knn_keep_ties": knn_keep_ties}
+        version = snapshots.save_partition(snapshot_name, partition, method, params, metrics)
+        print(f"Saved partition snapshot v{version}")
+        if version > 1:
+            diff = snapshots.diff_partition_versions(snapshot_name, version - 1, version)
+            print(f"Against v{version - 1}: {diff['moved']} nodes moved, ARI {diff['ari']:.4f}")
+
+    if write_back:
+        write_partition(uri, user, password, db, partition)
+        print("Partition written to PUBLICATION.community")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Post-clustering merge of over-segmented communities
+
+Purpose
+- Louvain / Leiden often split one real author into several communities
+  (what over_segmentation.cql / over_segmentation.py investigate by hand)
+- Greedily merge community pairs whose normalized inter-community weight passes a threshold
+
+How it works
+- Aggregate the publication graph to communities once:
+      W[c][d] = total edge weight between communities c and d
+      vol[c]  = total edge weight incident to community c (weighted degree)
+- Normalized inter-community weight (fraction of the smaller side's weight that goes to the other):
+      score(c, d) = W[c][d] / min(vol[c], vol[d])
+- Repeatedly pop the best pair from a max-heap and merge the smaller community into the larger;
+  aggregates are updated incrementally and stale heap entries are skipped by version stamps,
+  so nothing is recomputed from scratch
+
+Usage
+    merged, merges = merge_communities(G, partition, threshold=0.3)
+"""
+
+import heapq
+from collections import defaultdict
+
+
+def aggregate_communities(G, partition):
+    """
+    Community-level aggregated graph
+
+    Returns (W, vol, size):
+      - W: {c: {d: weight}} between distinct communities (symmetric)
+      - vol: {c: weighted degree of community c}
+      - size: {c: number of nodes}
+    """
+    W = defaultdict(lambda: defaultdict(float))
+    vol = defaultdict(float)
+    size = defaultdict(int)
+    for node, comm in partition.items():
+        size[comm] += 1
+        vol[comm] += 0.0
+
+    for u, v, data in G.edges(data=True):
+        w = float(data.get("weight", 1.0))
+        cu, cv = partition[u], partition[v]
+        vol[cu] += w
+        vol[cv] += w
+        if cu != cv:
+            W[cu][cv] += w
+            W[cv][cu] += w
+    return W, vol, size
+
+
+def _score(W, vol, c, d):
+    smaller = min(vol[c], vol[d])
+    return W[c][d] / smaller if smaller > 0 else 0.0
+
+
+def merge_communities(G, partition, threshold=0.3, max_merges=None):
+    """
+    Greedy heap-based merge of communities whose normalized inter-community weight >= threshold
+
+    Args
+        G: weighted networkx.Graph the partition was computed on
+        partition: {node: community}
+        threshold: minimum W[c][d] / min(vol[c], vol[d]) to merge
+        max_merges: optional cap on the number of merges
+
+    Returns
+        (merged_partition, merges)
+        - merged_partition: {node: community}; surviving communities keep their ids
+        - merges: list of (kept, absorbed, score) in merge order
+    """
+    W, vol, size = aggregate_communities(G, partition)
+    version = defaultdict(int)
+
+    heap = []
+    for c, neighbors in W.items():
+        for d in neighbors:
+            if c < d:
+                s = _score(W, vol, c, d)
+                if s >= threshold:
+                    heap.append((-s, c, d, 0, 0))
+    heapq.heapify(heap)
+
+    parent = {}
+    merges = []
+    while heap and (max_merges is None or len(merges) < max_merges):
+        neg_s, c, d, vc, vd = heapq.heappop(heap)
+        # Skip entries for communities that were absorbed or changed since they were pushed
+        if c in parent or d in parent or version[c] != vc or version[d] != vd:
+            continue
+
+        keep, gone = (c, d) if size[c] >= size[d] else (d, c)
+        merges.append((keep, gone, -neg_s))
+        parent[gone] = keep
+
+        # Fold the absorbed community's aggregates into the kept one
+        for x, w in W.pop(gone).items():
+            del W[x][gone]
+            if x == keep:
+                continue
+            W[keep][x] += w
+            W[x][keep] += w
+        vol[keep] += vol.pop(gone)
+        size[keep] += size.pop(gone)
+        version[keep] += 1
+
+        # Only pairs touching the kept community changed
+        for x in W[keep]:
+            s = _score(W, vol, keep, x)
+            if s >= threshold:
+                a, b = (keep, x) if keep < x else (x, keep)
+                heapq.heappush(heap, (-s, a, b, version[a], version[b]))
+
+    def root(comm):
+        while comm in parent:
+            comm = parent[comm]
+        return comm
+
+    merged = {node: root(comm) for node, comm in partition.items()}
+    return merged, merges
@@ -0,0 +1,282 @@
+"""
+Compact in-memory corpus of works and authorships
+
+Purpose
+- Replace dicts keyed by OpenAlex string ids with interned int32 ids and flat arrays
+- Give the edge builders (`neo4j_import.py`) and the HGCN exporters (`openAlex_to_HGCN.py`)
+  one representation to work on
+
+Layout (mirrors the columnar cache in cache_format.py)
+- works      : work_ids (list), titles (list), years (int32 + year_null mask), work_venue (int32 -> venues)
+- authorships: CSR arrays authorship_ptr (int64, per work), authorship_author (int32 -> author_ids),
+               authorship_name (int32 -> author_names, the display name used on that work)
+- venues     : venues (list, may hold "" and None like the source data)
+
+Notes
+- Authors are interned by OpenAlex id; a shared author is a shared id
+- Pairwise shared-author counts come from the sparse work x author incidence matrix (X @ X.T),
+  so no per-pair Python set is built
+- Hub handling for hyper-authored works (shared_author_pairs / coauthor_volume): the query name's
+  candidate ids can be excluded from the shared count, and works above max_authors are dropped
+  ("cap") or scaled down ("downweight")
+"""
+
+import numpy as np
+
+import cache_format
+from cache_format import Interner
+
+
+def encode_author_id(author_id):
+    """OpenAlex author id ("A5113797452" or its URL form) as an int (5113797452)"""
+    short = author_id.rsplit("/", 1)[-1]
+    if not (short[:1] == "A" and short[1:].isdigit()):
+        raise ValueError(f"Not an OpenAlex author id: {author_id}")
+    return int(short[1:])
+
+
+def decode_author_id(code):
+    """Inverse of encode_author_id (short form, as stored in the cache)"""
+    return f"A{int(code)}"
+
+
+class Corpus:
+    def __init__(self, work_ids, titles, years, year_null, venues, work_venue,
+                 author_ids, author_names, authorship_ptr, authorship_author, authorship_name):
+        self.work_ids = work_ids
+        self.work_index = {wid: i for i, wid in enumerate(work_ids)}
+        self.titles = titles
+        self.years = np.asarray(years, dtype=np.int32)
+        self.year_null = np.asarray(year_null, dtype=bool)
+        self.venues = venues
+        self.work_venue = np.asarray(work_venue, dtype=np.int32)
+        self.author_ids = author_ids
+        self.author_index = {aid: i for i, aid in enumerate(author_ids)}
+        self.author_names = author_names
+        self.authorship_ptr = np.asarray(authorship_ptr, dtype=np.int64)
+        self.authorship_author = np.asarray(authorship_author, dtype=np.int32)
+        self.authorship_name = np.asarray(authorship_name, dtype=np.int32)
+
+    # --- Construction ---
+
+    @classmethod
+    def from_works(cls, works):
+        """Build a corpus from an iterable of works in the cache's work schema"""
+        venues, author_ids, author_names = Interner(), Interner(), Interner()
+        work_ids, titles, years, year_null, work_venue = [], [], [], [], []
+        authorship_ptr, authorship_author, authorship_name = [0], [], []
+
+        for work in works:
+            work_ids.append(work["id"])
+            titles.append(work.get("title"))
+            year = work.get("year")
+            years.append(0 if year is None else int(year))
+            year_null.append(year is None)
+            work_venue.append(venues(work.get("venue")))
+            for a in work.get("authors", []):
+                authorship_author.append(author_ids(a["id"]))
+                authorship_name.append(author_names(a["name"]))
+            authorship_ptr.append(len(authorship_author))
+
+        return cls(work_ids, titles, years, year_null, venues.values, work_venue,
+                   author_ids.values, author_names.values,
+                   authorship_ptr, authorship_author, authorship_name)
+
+    @classmethod
+    def from_works_data(cls, works_data):
+        """Build a corpus from a works_data dict {work_id: work}"""
+        return cls.from_works(works_data.values())
+
+    @classmethod
+    def from_columnar(cls, cache):
+        """Build a corpus from a cache_format.ColumnarCache, reusing its int arrays"""
+        venues = cache.strings("venue").tolist()
+        work_venue = np.array(cache.array("work_venue"), dtype=np.int32)
+        # The columnar format marks a None venue with -1; keep it as its own venue
+        if (work_venue < 0).any():
+            work_venue[work_venue < 0] = len(venues)
+            venues.append(None)
+
+        return cls(cache.strings("work_id").tolist(), cache.strings("work_title").tolist(),
+                   cache.array("work_year"), cache.array("work_year.null"), venues, work_venue,
+                   cache.strings("author_id").tolist(), cache.strings("author_name").tolist(),
+                   cache.array("authorship_ptr"), cache.array("authorship_author"),
+                   cache.array("authorship_name"))
+
+    @classmethod
+    def from_cache(cls, path):
+        """Build a corpus from a cache file of either format"""
+        if cache_format.detect_format(path) == cache_format.FORMAT_COLUMNAR:
+            return cls.from_columnar(cache_format.ColumnarCache(path))
+        return cls.from_works(cache_format.iter_works(path))
+
+    # --- Access ---
+
+    def __len__(self):
+        return len(self.work_ids)
+
+    @property
+    def n_works(self):
+        return len(self.work_ids)
+
+    @property
+    def n_authors(self):
+        return len(self.author_ids)
+
+    def authors_of(self, i):
+        """Interned author ids of work i"""
+        return self.authorship_author[self.authorship_ptr[i]:self.authorship_ptr[i + 1]]
+
+    def work(self, i):
+        """Work i in the cache's work schema"""
+        start, end = self.authorship_ptr[i], self.authorship_ptr[i + 1]
+        return {
+            "id": self.work_ids[i],
+            "title": self.titles[i],
+            "year": None if self.year_null[i] else int(self.years[i]),
+            "authors": [{"name": self.author_names[n], "id": self.author_ids[a]}
+                        for a, n in zip(self.authorship_author[start:end], self.authorship_name[start:end])],
+            "venue": self.venues[self.work_venue[i]],
+        }
+
+    def iter_works(self):
+        for i in range(self.n_works):
+            yield self.work(i)
+
+    # --- Incidence matrices and pairs ---
+
+    def _work_rows(self):
+        """Work index of every authorship entry"""
+        return np.repeat(np.arange(self.n_works, dtype=np.int32), np.diff(self.authorship_ptr))
+
+    def author_incidence(self, exclude=None):
+        """
+        Binary sparse work x author matrix (CSR)
+
+        `exclude`: OpenAlex author ids whose columns are left empty (e.g. the query name's candidates)
+        """
+        import scipy.sparse as sp
+
+        X = sp.csr_matrix(
+            (np.ones(len(self.authorship_author), dtype=np.float32),
+             (self._work_rows(), self.authorship_author)),
+            shape=(self.n_works, self.n_authors),
+        )
+        # An author listed twice on one work still counts once
+        X.data[:] = 1.0
+        if exclude:
+            drop = [self.author_index[a] for a in exclude if a in self.author_index]
+            X.data[np.isin(X.indices, drop)] = 0.0
+            X.eliminate_zeros()
+        return X
+
+    def author_counts(self):
+        """Number of authorships listed on each work"""
+        return np.diff(self.authorship_ptr)
+
+    def hub_weights(self, max_authors=None, hub_mode="cap"):
+        """
+        Per-work multiplier for hyper-authored works (more than max_authors authors)
+
+        hub_mode "cap": hubs get 0.0 (no coauthor links at all);
+        "downweight": hubs get max_authors / n_authors. Other works get 1.0.
+        """
+        counts = self.author_counts()
+        weights = np.ones(self.n_works, dtype=np.float32)
+        if max_authors is None:
+            return weights
+        hubs = counts > max_authors
+        if hub_mode == "cap":
+            weights[hubs] = 0.0
+        elif hub_mode == "downweight":
+            weights[hubs] = max_authors / counts[hubs]
+        else:
+            raise ValueError(f"Unknown hub_mode: {hub_mode}")
+        return weights
+
+    def venue_incidence(self):
+        """Binary sparse work x venue matrix (CSR)"""
+        import scipy.sparse as sp
+
+        return sp.csr_matrix(
+            (np.ones(self.n_works, dtype=np.float32),
+             (np.arange(self.n_works), self.work_venue)),
+            shape=(self.n_works, len(self.venues)),
+        )
+
+    def shared_author_pairs(self, exclude=None, max_authors=None, hub_mode="cap"):
+        """
+        Work pairs (i < j) sharing at least one author
+
+        Args
+            exclude: OpenAlex author ids not counted as shared (e.g. the query name's candidates,
+                     which otherwise link every pair of their works)
+            max_authors, hub_mode: hub handling, see hub_weights
+
+        Returns (rows, cols, counts), counts = number of shared authors
+        (int32; float32 scaled by both works' hub weights with hub_mode "downweight")
+        """
+        import scipy.sparse as sp
+
+        X = self.author_incidence(exclude)
+        if max_authors is not None:
+            X = (sp.diags(self.hub_weights(max_authors, hub_mode)) @ X).tocsr()
+            X.eliminate_zeros()
+        S = sp.triu(X @ X.T, k=1).tocoo()
+        dtype = np.float32 if max_authors is not None and hub_mode == "downweight" else np.int32
+        return S.row.astype(np.int32), S.col.astype(np.int32), S.data.astype(dtype)
+
+    def coauthor_volume(self, exclude=None, max_authors=None, hub_mode="cap"):
+        """
+        COAUTHOR edges and within-work author pairs with and without hub handling
+
+        Returns dict: edges_before, edges_after, author_pairs_before, author_pairs_after
+        (author pairs as expanded by the HGCN author pair file, skipping works above max_authors)
+        """
+        counts = self.author_counts().astype(np.int64)
+        pairs = counts * (counts - 1) // 2
+        kept = pairs if max_authors is None else pairs[counts <= max_authors]
+        return {
+            "edges_before": len(self.shared_author_pairs()[0]),
+            "edges_after": len(self.shared_author_pairs(exclude, max_authors, hub_mode)[0]),
+            "author_pairs_before": int(pairs.sum()),
+            "author_pairs_after": int(kept.sum()),
+        }
+
+    def shared_authors(self, i, j):
+        """Interned author ids shared by works i and j"""
+        return np.intersect1d(self.authors_of(i), self.authors_of(j))
+
+    def shared_author_records(self, i, j, exclude=None):
+        """Shared authors of works i and j as [{"id", "name"}], names as written on work i"""
+        start, end = self.authorship_ptr[i], self.authorship_ptr[i + 1]
+        authors = self.authorship_author[start:end]
+        keep = np.isin(authors, self.shared_authors(i, j))
+        names = dict(zip(authors[keep].tolist(), self.authorship_name[start:end][keep].tolist()))
+        return [{"id": self.author_ids[a], "name": self.author_names[n]} for a, n in names.items()
+                if not exclude or self.author_ids[a] not in exclude]
+
+    def venue_groups(self):
+        """
+        Works grouped by venue, venues in first-seen order and works in corpus order
+
+        Yields int arrays of work indices, one per venue.
+        """
+        order = np.argsort(self.work_venue, kind="stable")
+        bounds = np.flatnonzero(np.diff(self.work_venue[order])) + 1
+        for group in np.split(order, bounds):
+            if len(group):
+                yield group
+
+    def venue_pairs(self):
+        """Work pairs (i < j) with the same venue as (rows, cols) int arrays"""
+        rows, cols = [], []
+        for group in self.venue_groups():
+            if len(group) < 2:
+                continue
+            a, b = np.triu_indices(len(group), k=1)
+            rows.append(group[a])
+            cols.append(group[b])
+        if not rows:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        return np.concatenate(rows).astype(np.int32), np.concatenate(cols).astype(np.int32)
@@ -0,0 +1,196 @@
+"""
+Cached COTITLE similarity for threshold sweeps
+
+Purpose
+- Changing min_similarity / threshold for COTITLE edges used to refit the TfidfVectorizer,
+  recompute the similarity matrix and re-MERGE every pair one query at a time
+- Fit once per name and persist the fitted vocabulary / idf and the upper triangle of the
+  similarity matrix above a low floor; a new threshold only filters that triangle
+- Apply a new threshold to the graph as a diff: delete the COTITLE edges that fall below it
+  and MERGE the ones that newly pass, each in UNWIND batches
+
+Layout
+- `cache/cotitle/<Author>.npz`: key, floor, ids, rows, cols, sims (float64, i < j, sim >= floor),
+  vocabulary (terms by column) and idf
+- key = sha256 of the vectorizer settings and the (id, title) pairs in corpus order; a cache whose
+  key no longer matches (ids, titles or settings changed), or whose floor is above the requested
+  threshold, is recomputed
+
+Usage
+    sim = load_or_compute("David Nathan", ids, titles)
+    pairs = sim.pairs(0.7)                     # [(id_a, id_b, sim)] with id_a < id_b
+    apply_cotitle_pairs(driver, db, pairs)     # (added, removed)
+- Sweep from the command line: `python cotitle_cache.py "David Nathan" --thresholds 0.5 0.6 0.7`
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import cache_format
+from neo4j_import import _batched, title_vectorizer
+
+COTITLE_DIR = os.path.join(cache_format.CACHE_DIR, "cotitle")
+DEFAULT_FLOOR = 0.30
+
+# Vectorizer parameters that change the fitted model (and so the cache key)
+_KEY_PARAMS = ("lowercase", "stop_words", "ngram_range", "max_features", "norm", "use_idf",
+               "smooth_idf", "sublinear_tf", "token_pattern", "analyzer")
+
+
+def cache_key(ids, titles, max_features=10000):
+    """sha256 over the vectorizer settings and the (id, title) of every work (in order)"""
+    params = title_vectorizer(max_features).get_params()
+    settings = json.dumps({k: params.get(k) for k in _KEY_PARAMS}, sort_keys=True, default=str)
+    h = hashlib.sha256(settings.encode("utf-8"))
+    for work_id, title in zip(ids, titles):
+        h.update(b"\0")
+        h.update(f"{work_id}\0{title or ''}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class TitleSimilarity:
+    """Thresholded upper triangle of the title cosine matrix, with the fitted vocabulary"""
+
+    def __init__(self, key, floor, ids, rows, cols, sims, vocabulary, idf):
+        self.key = key
+        self.floor = float(floor)
+        self.ids = list(ids)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+        self.sims = np.asarray(sims, dtype=np.float64)
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float64)
+
+    @classmethod
+    def compute(cls, ids, titles, max_features=10000, floor=DEFAULT_FLOOR):
+        titles = [title or "" for title in titles]
+        vectorizer = title_vectorizer(max_features)
+        X = vectorizer.fit_transform(titles)
+        S = (X @ X.T).tocoo()   # TF-IDF rows are L2-normalized: dot product = cosine
+        keep = (S.row < S.col) & (S.data >= floor)
+
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        return cls(cache_key(ids, titles, max_features), floor, ids,
+                   S.row[keep], S.col[keep], S.data[keep], vocabulary, vectorizer.idf_)
+
+    def pairs(self, min_similarity=0.60):
+        """[(id_a, id_b, similarity)] with id_a < id_b, as add_cotitle_edge_from_pairs MERGEs them"""
+        if min_similarity < self.floor:
+            raise ValueError(f"min_similarity {min_similarity} is below the cached floor {self.floor}")
+        keep = self.sims >= min_similarity
+        pairs = []
+        for i, j, sim in zip(self.rows[keep].tolist(), self.cols[keep].tolist(), self.sims[keep].tolist()):
+            a, b = self.ids[i], self.ids[j]
+            pairs.append((a, b, sim) if a < b else (b, a, sim))
+        return pairs
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp, key=np.array(self.key), floor=np.array(self.floor), ids=np.array(self.ids, dtype=str),
+            rows=self.rows, cols=self.cols, sims=self.sims,
+            vocabulary=np.array(self.vocabulary, dtype=str), idf=self.idf,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            return cls(str(z["key"]), float(z["floor"]), z["ids"].tolist(), z["rows"], z["cols"],
+                       z["sims"], z["vocabulary"].tolist(), z["idf"])
+
+
+def cache_file(author_name, cache_dir=COTITLE_DIR):
+    return os.path.join(cache_dir, f"{author_name}.npz")
+
+
+def load_or_compute(author_name, ids, titles, min_similarity=None, max_features=10000,
+                    floor=DEFAULT_FLOOR, cache_dir=COTITLE_DIR):
+    """
+    Cached TitleSimilarity for a name, recomputed (and saved) when missing or stale
+
+    Stale means: different ids / titles / vectorizer settings (key), or a floor above min_similarity
+    """
+    path = cache_file(author_name, cache_dir)
+    key = cache_key(ids, titles, max_features)
+    needed = floor if min_similarity is None else min(floor, min_similarity)
+
+    if os.path.exists(path):
+        cached = TitleSimilarity.load(path)
+        if cached.key == key and cached.floor <= needed:
+            return cached
+
+    sim = TitleSimilarity.compute(ids, titles, max_features, needed)
+    sim.save(path)
+    return sim
+
+
+def apply_cotitle_pairs(driver, db, pairs, batch_size=1000, tolerance=1e-9):
+    """
+    Make the graph's COTITLE edges equal to `pairs`, touching only the difference
+
+    Edges not in `pairs` are deleted; new pairs (or pairs whose similarity changed) are MERGEd.
+    Returns (added, removed)
+    """
+    records, _, _ = driver.execute_query(
+        """
+        MATCH (p1:PUBLICATION)-[r:COTITLE]->(p2:PUBLICATION)
+        RETURN p1.id AS a, p2.id AS b, r.similarity AS similarity
+        """,
+        database_=db,
+    )
+    current = {(r["a"], r["b"]): r["similarity"] for r in records}
+    wanted = {(a, b): sim for a, b, sim in pairs}
+
+    remove = [{"a": a, "b": b} for (a, b) in current if (a, b) not in wanted]
+    add = [{"a": a, "b": b, "similarity": float(sim)} for (a, b), sim in wanted.items()
+           if current.get((a, b)) is None or abs(current[(a, b)] - sim) > tolerance]
+
+    for batch in _batched(remove, batch_size):
+        driver.execute_query("""
+            UNWIND $rows AS row
+            MATCH (:PUBLICATION {id: row.a})-[r:COTITLE]->(:PUBLICATION {id: row.b})
+            DELETE r
+            """,
+            rows=batch, database_=db,
+        )
+    for batch in _batched(add, batch_size):
+        driver.execute_query("""
+            UNWIND $rows AS row
+            MATCH (p1:PUBLICATION {id: row.a}), (p2:PUBLICATION {id: row.b})
+            MERGE (p1)-[r:COTITLE]->(p2)
+            SET r.similarity = row.similarity
+            """,
+            rows=batch, database_=db,
+        )
+    return len(add), len(remove)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="COTITLE edge counts per threshold from the cached similarity")
+    parser.add_argument("name", help="Author name with a cache in cache/")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--max_features", type=int, default=10000)
+    args = parser.parse_args()
+
+    path = cache_format.cache_path(args.name)
+    if path is None:
+        raise SystemExit(f"No cached data found for {args.name}")
+    ids, titles = [], []
+    for work in cache_format.iter_works(path):
+        ids.append(work["id"])
+        titles.append(work.get("title"))
+
+    sim = load_or_compute(args.name, ids, titles, min(args.thresholds), args.max_features)
+    print(f"{len(sim.sims)} pairs with cosine >= {sim.floor} cached in {cache_file(args.name)}")
+    for t in args.thresholds:
+        print(f"cosine >= {t:.2f}: {len(sim.pairs(t))} COTITLE edges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Load generator for disambiguation_service.py
+
+Purpose
+- Measure latency (p50 / p95 / p99) and throughput of single-work queries
+
+Modes
+- In-process (default): index a cache with a held-out fraction of its works removed, then query
+  the held-out works directly against DisambiguationIndex; the cache's ground-truth labels
+  (work_labels_from_cache) stand in for the clustering, so top-1 accuracy is reported too.
+  The labels are the name's candidate author ids, so those ids are removed from each query work
+  first; otherwise the author lookup would return the label itself
+- HTTP: `--url http://127.0.0.1:8008` sends the cache's works to a running service from
+  `--concurrency` threads
+
+Usage
+- `python disambiguation_bench.py --data "David Nathan" --requests 5000` (a name or a cache file path)
+- `python disambiguation_bench.py --data "David Nathan" --url http://127.0.0.1:8008 --concurrency 8`
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import cache_format
+from community_detection import work_labels_from_cache
+from disambiguation_service import DisambiguationIndex
+
+
+def latency_report(latencies, elapsed):
+    """Summary dict of per-request latencies (seconds) over a wall-clock run of `elapsed` seconds"""
+    ms = np.asarray(latencies) * 1000.0
+    return {
+        "requests": len(ms),
+        "throughput": len(ms) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def without_authors(work, author_ids):
+    """Copy of a work without the authors whose id is in `author_ids`"""
+    return {**work, "authors": [a for a in work.get("authors", []) if a["id"] not in author_ids]}
+
+
+def bench_in_process(data_path, requests=2000, holdout=0.1, seed=42):
+    """Held-out queries against an index built from the rest of the cache"""
+    works = list(cache_format.iter_works(data_path))
+    labels = work_labels_from_cache(data_path)
+    _, codes = np.unique([labels.get(w["id"], "0") for w in works], return_inverse=True)
+
+    rng = np.random.default_rng(seed)
+    held = rng.random(len(works)) < holdout
+    partition = {w["id"]: int(c) for w, c, h in zip(works, codes, held) if not h}
+    queries = [(w, int(c)) for w, c, h in zip(works, codes, held) if h] or [(w, int(c)) for w, c in zip(works, codes)]
+
+    # The label is the candidate author id, which every query work carries and by_author maps
+    # straight to its community; strip the name's candidate ids so accuracy is not a lookup
+    candidates = set(cache_format.read_cache_metadata(data_path)["author_data"])
+    queries = [(without_authors(w, candidates), truth) for w, truth in queries]
+
+    start = time.perf_counter()
+    index = DisambiguationIndex(works, partition)
+    build = time.perf_counter() - start
+
+    latencies, correct = [], 0
+    start = time.perf_counter()
+    for k in range(requests):
+        work, truth = queries[k % len(queries)]
+        t = time.perf_counter()
+        candidates = index.query(work)
+        latencies.append(time.perf_counter() - t)
+        correct += bool(candidates) and candidates[0]["community"] == truth
+    report = latency_report(latencies, time.perf_counter() - start)
+    report["build_s"] = build
+    report["top1_accuracy"] = correct / requests if requests else 0.0
+    report.update(index.stats())
+    return report
+
+
+def bench_http(data_path, url, requests=2000, concurrency=8):
+    """Concurrent POST /query requests against a running service"""
+    works = list(cache_format.iter_works(data_path))
+    bodies = [json.dumps({"work": w}).encode("utf-8") for w in works]
+    endpoint = url.rstrip("/") + "/query"
+
+    def one(k):
+        req = urllib.request.Request(endpoint, data=bodies[k % len(bodies)],
+                                     headers={"Content-Type": "application/json"})
+        t = time.perf_counter()
+        with urllib.request.urlopen(req) as resp:
+            resp.read()
+        return time.perf_counter() - t
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return latency_report(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency / throughput benchmark for the disambiguation service")
+    parser.add_argument("--data", default="David Nathan",
+                        help="Cache file providing the query works, or a cached author name")
+    parser.add_argument("--url", help="Benchmark a running service over HTTP instead of in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (HTTP mode)")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction of works held out of the index (in-process)")
+    args = parser.parse_args()
+    data_path = cache_format.find_cache(args.data)
+    if data_path is None:
+        parser.error(f"No cached data found for {args.data}")
+
+    if args.url:
+        report = bench_http(data_path, args.url, args.requests, args.concurrency)
+    else:
+        report = bench_in_process(data_path, args.requests, args.holdout)
+
+    for key, value in report.items():
+        print(f"{key:>15}: {value:.3f}" if isinstance(value, float) else f"{key:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+In-memory disambiguation service for single new works
+
+Purpose
+- Attribute an incoming paper to a disambiguated author (a community of the clustered graph)
+  within milliseconds, instead of re-importing and re-clustering
+- Built once from a clustered graph, then answers queries from memory only
+
+Indexes
+- author id -> {community: works of that community listing the author}
+- venue     -> {community: works of that community in the venue}
+- one TF-IDF centroid per community (L2-normalized mean of its title vectors),
+  vectorizer settings as in cotitle_pairs_tfidf (neo4j_import.title_vectorizer)
+
+Scoring (per community, mirroring the clustering edge weights)
+      score = coauthor_scale * log(1 + shared authorships)
+            + covenue_scale  * log(1 + works in the same venue)
+            + cotitle_scale  * cosine(title, community centroid)
+
+Usage
+- `python disambiguation_service.py --port 8008` (reads PUBLICATION nodes with a `community` from Neo4j)
+- POST /query with one work in the cache's work schema ({"id", "title", "venue", "authors": [{"id", "name"}]})
+  returns {"candidates": [{"community", "score", "coauthor", "covenue", "cotitle"}, ...]} best first
+- GET /health returns index sizes
+- Load generator: `python disambiguation_bench.py`
+"""
+
+import argparse
+import json
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import cache_format
+from neo4j_connection import ACCESS, add_connection_arguments, connection_from_args
+from neo4j_import import title_vectorizer
+
+
+class DisambiguationIndex:
+    def __init__(self, works, partition, max_features=10000,
+                 coauthor_scale=1.0, covenue_scale=1.0, cotitle_scale=1.2):
+        """
+        Build the in-memory indexes
+
+        Args
+            works: iterable of works in the cache's work schema
+            partition: {work id: community}; works without a community are ignored
+            max_features: TF-IDF vocabulary size (cotitle_pairs_tfidf default)
+            coauthor_scale, covenue_scale, cotitle_scale: signal weights (load_pub_graph_from_neo4j defaults)
+        """
+        self.coauthor_scale = coauthor_scale
+        self.covenue_scale = covenue_scale
+        self.cotitle_scale = cotitle_scale
+
+        by_author = defaultdict(Counter)
+        by_venue = defaultdict(Counter)
+        titles, comms = [], []
+        for work in works:
+            comm = partition.get(work["id"])
+            if comm is None:
+                continue
+            for author_id in {a["id"] for a in work.get("authors", [])}:
+                by_author[author_id][comm] += 1
+            by_venue[work.get("venue")][comm] += 1
+            titles.append(work.get("title") or "")
+            comms.append(comm)
+
+        self.communities, rows = np.unique(np.array(comms, dtype=np.int64), return_inverse=True)
+        self.row_of = {int(c): i for i, c in enumerate(self.communities)}
+        self.sizes = np.bincount(rows, minlength=len(self.communities))
+        self.n_works = len(titles)
+
+        # Postings as (community rows, counts) arrays so a query is a few np.add.at calls
+        def postings(index):
+            return {key: (np.array([self.row_of[c] for c in counts], dtype=np.int64),
+                          np.array(list(counts.values()), dtype=np.float64))
+                    for key, counts in index.items()}
+        self.by_author = postings(by_author)
+        self.by_venue = postings(by_venue)
+
+        self.vectorizer = title_vectorizer(max_features)
+        if titles:
+            import scipy.sparse as sp
+
+            X = self.vectorizer.fit_transform(titles)
+            membership = sp.csr_matrix((np.ones(len(rows)), (rows, np.arange(len(rows)))),
+                                       shape=(len(self.communities), len(rows)))
+            centroids = (membership @ X).tocsr()
+            norms = np.sqrt(np.asarray(centroids.multiply(centroids).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            self.centroids = sp.diags(1.0 / norms) @ centroids
+            self.centroids_t = self.centroids.T.tocsr()
+        else:
+            self.centroids = self.centroids_t = None
+
+    @classmethod
+    def from_cache(cls, data_path, partition, **kwargs):
+        """Index a cache file (any format) with a partition such as run_louvain's"""
+        return cls(cache_format.iter_works(data_path), partition, **kwargs)
+
+    @classmethod
+    def from_neo4j(cls, driver, db, fetch_size=10000, **kwargs):
+        """Index the PUBLICATION nodes of a clustered graph (uses their `community` property)"""
+        works, partition = [], {}
+        with driver.session(database=db, fetch_size=fetch_size, default_access_mode=ACCESS["read"]) as session:
+            for rec in session.run("""
+                MATCH (p:PUBLICATION) WHERE p.community IS NOT NULL
+                RETURN p.id AS id, p.title AS title, p.venue AS venue, p.authors AS authors, p.community AS community
+            """):
+                works.append({
+                    "id": rec["id"],
+                    "title": rec["title"],
+                    "venue": rec["venue"],
+                    "authors": json.loads(rec["authors"] or "[]"),
+                })
+                partition[rec["id"]] = int(rec["community"])
+        return cls(works, partition, **kwargs)
+
+    def stats(self):
+        return {
+            "works": self.n_works,
+            "communities": len(self.communities),
+            "authors": len(self.by_author),
+            "venues": len(self.by_venue),
+        }
+
+    def query(self, work, top=5):
+        """
+        Ranked candidate communities for one work in the cache's work schema
+
+        Returns [{community, score, coauthor, covenue, cotitle}] for the `top` best communities
+        with any signal; coauthor / covenue are raw counts, cotitle the centroid cosine
+        """
+        k = len(self.communities)
+        coauthor = np.zeros(k)
+        covenue = np.zeros(k)
+        cotitle = np.zeros(k)
+
+        for author_id in {a["id"] for a in work.get("authors", [])}:
+            hit = self.by_author.get(author_id)
+            if hit is not None:
+                np.add.at(coauthor, hit[0], hit[1])
+        hit = self.by_venue.get(work.get("venue"))
+        if hit is not None:
+            np.add.at(covenue, hit[0], hit[1])
+        title = work.get("title")
+        if title and self.centroids_t is not None:
+            x = self.vectorizer.transform([title])
+            cotitle = (x @ self.centroids_t).toarray().ravel()
+
+        scores = (self.coauthor_scale * np.log1p(coauthor)
+                  + self.covenue_scale * np.log1p(covenue)
+                  + self.cotitle_scale * cotitle)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top:
+            candidates = candidates[np.argpartition(-scores[candidates], top - 1)[:top]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [{
+            "community": int(self.communities[i]),
+            "score": float(scores[i]),
+            "coauthor": int(coauthor[i]),
+            "covenue": int(covenue[i]),
+            "cotitle": float(cotitle[i]),
+        } for i in candidates]
+
+
+def make_handler(index):
+    """HTTP request handler class serving one DisambiguationIndex"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, index.stats())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path.split("?")[0] != "/query":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                work = body.get("work", body)
+                top = int(body.get("top", 5))
+                self._send(200, {"candidates": index.query(work, top)})
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._send(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass  # keep per-request logging out of latency measurements
+
+    return Handler
+
+
+def serve(index, host="127.0.0.1", port=8008):
+    """Serve the index over HTTP until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(index))
+    print(f"Serving {index.stats()} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve community candidates for single new works")
+    add_connection_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    args = parser.parse_args()
+
+    conn = connection_from_args(args)
+    index = DisambiguationIndex.from_neo4j(conn.driver, conn.database, conn.fetch_size)
+    serve(index, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
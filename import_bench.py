@@ -0,0 +1,81 @@
+"""
+Import-time benchmark with a budget
+
+Purpose
+- Catch startup regressions: every module is imported in a fresh interpreter (best of --repeat runs)
+  and its import time is compared with the budget
+- Also checks that heavy dependencies stay lazy: importing a module must not load any of LAZY
+  (they belong inside the functions that use them)
+- Exits with status 1 when a module is over budget or loads a lazy dependency, so it can gate CI
+
+Usage
+- `python import_bench.py` (all MODULES, DEFAULT_BUDGET_MS each)
+- `python import_bench.py cli neo4j_import --budget_ms 100 --repeat 5`
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = (
+    "cli", "neo4j_connection", "cache_format", "corpus", "neo4j_data", "neo4j_import",
+    "community_detection", "cluster_export_to_json", "openAlex_to_HGCN", "pipeline",
+    "incremental_clustering", "streaming_import", "snapshots", "disambiguation_service", "over_segmentation",
+)
+
+# Packages that no module may import at import time
+LAZY = ("sklearn", "networkx", "igraph", "leidenalg", "community", "scipy", "requests", "nameparser", "neo4j")
+
+DEFAULT_BUDGET_MS = 200.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=3):
+    """Best-of-`repeat` import time (ms) of a module in fresh interpreters, and the lazy packages it loaded"""
+    best, loaded = None, []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, lazy=LAZY)],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["ms"] < best:
+            best = result["ms"]
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against a budget")
+    parser.add_argument("modules", nargs="*", default=list(MODULES), help="Modules to import (default: MODULES)")
+    parser.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS, help="Import-time budget per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (best time kept)")
+    args = parser.parse_args()
+
+    failures = 0
+    width = max(len(m) for m in args.modules)
+    print(f"{'Module':<{width}}  {'Import (ms)':>11}  Status")
+    for module in args.modules:
+        ms, loaded = measure(module, args.repeat)
+        problems = []
+        if ms > args.budget_ms:
+            problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+        if loaded:
+            problems.append("loads " + ", ".join(loaded))
+        failures += bool(problems)
+        print(f"{module:<{width}}  {ms:>11.1f}  {'; '.join(problems) or 'ok'}")
+
+    if failures:
+        print(f"{failures} of {len(args.modules)} modules failed the import budget")
+        sys.exit(1)
+    print(f"All {len(args.modules)} modules within {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,557 @@
+"""
+Incremental clustering of new works into an existing partition
+
+Purpose
+- Place a few new publications after a refresh without rerunning run_louvain on the whole graph
+  (which also reshuffles every community id)
+- Only the new works' COAUTHOR / COVENUE / COTITLE edges are computed, against the works already imported
+
+How it works
+1) EdgeIndex keeps author -> works and venue -> works buckets; only the imported works that share an
+   author (AUTHOR index) or the venue (PUBLICATION.venue index) with a new work are loaded into it,
+   and adding a new work returns its edges to everything indexed so far, then indexes it
+2) Each new work joins the community with the highest attached weight (weights as in
+   load_pub_graph_from_neo4j), or a new community (max id + 1) when nothing exceeds min_weight
+3) Bounded local refinement: for at most `rounds` passes, each touched node (new works and their
+   direct neighbors) moves to the neighboring community with the highest attached weight when it
+   beats its current community by more than `margin`; nodes outside the neighborhood never move,
+   so existing community ids stay stable
+4) New nodes, their edges (and AUTHOR nodes) and the changed community ids are written back in UNWIND batches
+
+Usage
+- `python incremental_clustering.py --data "cache/David Nathan_data.json"`
+  adds the works of that cache that are not in the graph yet
+- `--dry_run` reports the assignment without writing anything
+
+Notes
+- COTITLE similarities of the new works are computed with a vectorizer fitted on all titles
+  (existing + new), so they can differ slightly from a full re-import's; reading the titles is the
+  only step that grows with the corpus (`--no_cotitle` skips it)
+- Graphs imported with COAUTHOR hub handling need the same options here (`--exclude_query_name`,
+  `--max_authors`, `--hub_mode`), or the new works' COAUTHOR edges are built unfiltered
+"""
+
+import argparse
+import json
+import math
+from collections import Counter, defaultdict
+
+import cache_format
+from neo4j_connection import ACCESS, ROUTING, add_connection_arguments, connection_from_args
+from neo4j_import import (AUTHORED_QUERY, PAYLOAD_FULL, COAUTHOR_PAYLOADS, _batched, coauthor_query,
+                          coauthor_row, title_vectorizer)
+
+REL_TYPES = ("COAUTHOR", "COVENUE", "COTITLE")
+
+
+def edge_weight(rel_type, props, coauthor_scale=1.0, covenue_scale=1.0, cotitle_scale=1.2,
+                use_log_coauthor=True):
+    """Clustering weight of one relationship, the same formula as load_pub_graph_from_neo4j's query"""
+    if rel_type == "COAUTHOR":
+        w = props.get("weight")
+        if w is None:
+            return coauthor_scale * 1.0
+        return coauthor_scale * (math.log(1 + float(w)) if use_log_coauthor else float(w))
+    if rel_type == "COVENUE":
+        w = props.get("weight")
+        return covenue_scale * (1.0 if w is None or float(w) == 0 else float(w))
+    if rel_type == "COTITLE":
+        return cotitle_scale * float(props.get("similarity") or 0.0)
+    return 0.0
+
+
+class EdgeIndex:
+    """
+    Author / venue buckets of the works indexed so far
+
+    `add(work)` computes one work's COAUTHOR and COVENUE edges by looking up only the buckets
+    of its own authors and venue, so the cost is proportional to its neighbors, not to the corpus.
+
+    Hub handling matches Neo4jImportData.add_coauthor_edge / Corpus.shared_author_pairs:
+        exclude: author ids not counted as shared (e.g. the query name's candidate ids)
+        max_authors: works with more authorships are hubs
+        hub_mode: "cap" gives hubs no COAUTHOR edges, "downweight" scales a pair's shared count
+                  by both works' max_authors / n_authors
+    """
+
+    def __init__(self, exclude=None, max_authors=None, hub_mode="cap"):
+        if hub_mode not in ("cap", "downweight"):
+            raise ValueError(f"Unknown hub_mode: {hub_mode}")
+        self.exclude = set(exclude or ())
+        self.max_authors = max_authors
+        self.hub_mode = hub_mode
+        self.ids = []
+        self.index_of = {}
+        self.authors = []                    # per work: {author id: name as written on that work}
+        self.hub = []                        # per work: COAUTHOR multiplier (1.0 unless a hub)
+        self.by_author = defaultdict(list)   # author id -> work indices
+        self.by_venue = defaultdict(list)    # venue -> work indices
+
+    @classmethod
+    def from_works(cls, works, **hub_options):
+        index = cls(**hub_options)
+        for work in works:
+            index.add(work)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, work_id):
+        return work_id in self.index_of
+
+    def _hub_weight(self, n_authors):
+        if self.max_authors is None or n_authors <= self.max_authors:
+            return 1.0
+        return 0.0 if self.hub_mode == "cap" else self.max_authors / n_authors
+
+    def add(self, work):
+        """
+        Index a work and return its edges to the works indexed before it
+
+        Returns list of (other_id, rel_type, props); COAUTHOR props are {"shared": [{"id", "name"}], "weight"},
+        the others as stored on the relationship. A work that is already indexed returns no edges
+        """
+        if work["id"] in self.index_of:
+            return []
+
+        authors = {}
+        for a in work.get("authors", []):
+            authors.setdefault(a["id"], a["name"])
+        hub = self._hub_weight(len(work.get("authors", [])))
+        venue = work.get("venue")
+
+        shared = Counter()
+        if hub > 0.0:
+            for author_id in authors:
+                if author_id in self.exclude:
+                    continue
+                for j in self.by_author.get(author_id, ()):
+                    shared[j] += 1
+
+        edges = []
+        for j, count in shared.items():
+            # Shared authors named as on the earlier work, like Corpus.shared_author_records
+            records = [{"id": aid, "name": name} for aid, name in self.authors[j].items()
+                       if aid in authors and aid not in self.exclude]
+            weight = count if self.hub_mode == "cap" or self.max_authors is None else count * hub * self.hub[j]
+            edges.append((self.ids[j], "COAUTHOR", {"shared": records, "weight": weight}))
+        for j in self.by_venue.get(venue, ()):
+            edges.append((self.ids[j], "COVENUE", {"venue": venue, "weight": 1.0}))
+
+        self.insert(work, authors, hub)
+        return edges
+
+    def insert(self, work, authors=None, hub=None):
+        """Index a work without computing its edges (for works whose edges already exist)"""
+        if work["id"] in self.index_of:
+            return
+        if authors is None:
+            authors = {}
+            for a in work.get("authors", []):
+                authors.setdefault(a["id"], a["name"])
+        if hub is None:
+            hub = self._hub_weight(len(work.get("authors", [])))
+
+        i = len(self.ids)
+        self.ids.append(work["id"])
+        self.index_of[work["id"]] = i
+        self.authors.append(authors)
+        self.hub.append(hub)
+        if hub > 0.0:
+            for author_id in authors:
+                if author_id not in self.exclude:
+                    self.by_author[author_id].append(i)
+        self.by_venue[work.get("venue")].append(i)
+
+
+def cotitle_edges(ids, titles, new_ids, min_similarity=0.60, max_features=10000):
+    """
+    COTITLE pairs between the works `new_ids` and every work of `ids` / `titles`
+
+    The vectorizer is fitted on all titles; only the rows of `new_ids` are multiplied against
+    the title matrix. Returns [(a, b, similarity)] with a < b, as add_cotitle_edge_from_pairs expects.
+    """
+    index_of = {w: i for i, w in enumerate(ids)}
+    rows = [index_of[w] for w in new_ids if w in index_of]
+    if not rows or len(ids) < 2:
+        return []
+    X = title_vectorizer(max_features).fit_transform([title or "" for title in titles])
+    S = (X[rows] @ X.T).tocoo()   # TF-IDF rows are L2-normalized: dot product = cosine
+
+    new = set(rows)
+    pairs = []
+    for r, j, sim in zip(S.row.tolist(), S.col.tolist(), S.data.tolist()):
+        i = rows[r]
+        # Pairs of two new works appear twice; keep one
+        if i == j or sim < min_similarity or (j in new and j < i):
+            continue
+        a, b = sorted((ids[i], ids[j]))
+        pairs.append((a, b, float(sim)))
+    return pairs
+
+
+def assign_new_works(G, partition, new_ids, min_weight=0.0, next_id=None):
+    """
+    Give each new work the community with the highest attached weight in G
+
+    New works are placed in order, so a later work sees the earlier ones' assignment.
+    Works whose best weight is not above min_weight open a new community (`next_id`, then
+    next_id + 1, ...; by default max id in `partition` + 1).
+
+    Returns (partition, new_communities): an updated copy and the ids that were opened
+    """
+    partition = dict(partition)
+    if next_id is None:
+        next_id = max(partition.values(), default=-1) + 1
+    new_communities = []
+
+    for node in new_ids:
+        weights = _community_weights(G, partition, node)
+        best = max(weights, key=weights.get) if weights else None
+        if best is None or weights[best] <= min_weight:
+            best = next_id
+            next_id += 1
+            new_communities.append(best)
+        partition[node] = best
+    return partition, new_communities
+
+
+def refine_local(G, partition, nodes, rounds=3, margin=0.0):
+    """
+    Bounded local moving on `nodes` only
+
+    Each pass moves a node to the neighboring community with the highest attached weight
+    when that beats its current community's weight by more than margin; stops after
+    `rounds` passes or when a pass moves nothing.
+
+    Returns (partition, moved): an updated copy and {node: (old, new)} for nodes that ended elsewhere
+    """
+    partition = dict(partition)
+    start = {n: partition.get(n) for n in nodes}
+
+    for _ in range(rounds):
+        changed = 0
+        for node in nodes:
+            weights = _community_weights(G, partition, node)
+            if not weights:
+                continue
+            current = partition.get(node)
+            best = max(weights, key=weights.get)
+            if best != current and weights[best] > weights.get(current, 0.0) + margin:
+                partition[node] = best
+                changed += 1
+        if not changed:
+            break
+
+    moved = {n: (start[n], partition[n]) for n in nodes if partition.get(n) != start[n]}
+    return partition, moved
+
+
+def _community_weights(G, partition, node):
+    """{community: total edge weight from node to its neighbors in that community}"""
+    weights = defaultdict(float)
+    if node in G:
+        for other, data in G[node].items():
+            comm = partition.get(other)
+            if comm is not None and other != node:
+                weights[comm] += data.get("weight", 1.0)
+    return weights
+
+
+def _add_weighted_edge(G, a, b, w):
+    if a == b or w <= 0.0:
+        return
+    if G.has_edge(a, b):
+        G[a][b]["weight"] += w
+    else:
+        G.add_edge(a, b, weight=w)
+
+
+def has_author_nodes(driver, db):
+    """Whether the graph was imported with AUTHOR nodes (neo4j_import.main(author_nodes=True))"""
+    records, _, _ = driver.execute_query("MATCH (a:AUTHOR) RETURN a.id LIMIT 1",
+                                         database_=db, routing_=ROUTING["read"])
+    return bool(records)
+
+
+_BUCKET_RETURN = " RETURN DISTINCT p.id AS id, p.venue AS venue, p.authors AS authors"
+
+
+def load_buckets(driver, db, works, fetch_size=10000, **hub_options):
+    """
+    EdgeIndex over the imported works that share an author or the venue with `works`
+
+    Authors are looked up through the AUTHOR index (a server-side scan of p.authors for the
+    JSON-quoted ids when the graph has no AUTHOR nodes) and venues through the PUBLICATION.venue index, so only the new works'
+    buckets are read, not the whole corpus. `hub_options` go to EdgeIndex.
+    """
+    author_ids = sorted({a["id"] for w in works for a in w.get("authors", [])})
+    venues = sorted({w.get("venue") for w in works if w.get("venue") is not None})
+
+    queries = []
+    index = EdgeIndex(**hub_options)
+    with driver.session(database=db, fetch_size=fetch_size, default_access_mode=ACCESS["read"]) as session:
+        if author_ids:
+            if has_author_nodes(driver, db):
+                queries.append("UNWIND $author_ids AS aid MATCH (:AUTHOR {id: aid})-[:AUTHORED]->(p:PUBLICATION)")
+            else:
+                # Match the JSON-quoted id so that "A12" does not also match "A123"
+                queries.append("MATCH (p:PUBLICATION) WHERE any(key IN $author_keys WHERE p.authors CONTAINS key)")
+        if venues:
+            queries.append("UNWIND $venues AS v MATCH (p:PUBLICATION {venue: v})")
+        # Works without a venue share the null venue, as in the full import
+        if any(w.get("venue") is None for w in works):
+            queries.append("MATCH (p:PUBLICATION) WHERE p.venue IS NULL")
+
+        for q in queries:
+            for rec in session.run(q + _BUCKET_RETURN, author_ids=author_ids, venues=venues,
+                                   author_keys=[f'"id": {json.dumps(aid)}' for aid in author_ids]):
+                index.insert({"id": rec["id"], "venue": rec["venue"], "authors": json.loads(rec["authors"] or "[]")})
+    return index
+
+
+def existing_ids(driver, db, ids, batch_size=1000):
+    """The ids among `ids` that are already PUBLICATION nodes"""
+    found = set()
+    for batch in _batched(ids, batch_size):
+        records, _, _ = driver.execute_query(
+            "UNWIND $ids AS pid MATCH (p:PUBLICATION {id: pid}) RETURN p.id AS id",
+            ids=batch, database_=db, routing_=ROUTING["read"],
+        )
+        found.update(rec["id"] for rec in records)
+    return found
+
+
+def load_titles(driver, db, fetch_size=10000):
+    """(ids, titles) of every imported work, the one corpus-wide read (COTITLE needs all titles)"""
+    ids, titles = [], []
+    with driver.session(database=db, fetch_size=fetch_size, default_access_mode=ACCESS["read"]) as session:
+        for rec in session.run("MATCH (p:PUBLICATION) RETURN p.id AS id, p.title AS title"):
+            ids.append(rec["id"])
+            titles.append(rec["title"] or "")
+    return ids, titles
+
+
+def load_partition(driver, db, ids, batch_size=1000):
+    """({id: community} of the given works, largest community id in the graph or -1)"""
+    partition = {}
+    for batch in _batched(ids, batch_size):
+        records, _, _ = driver.execute_query(
+            "UNWIND $ids AS pid MATCH (p:PUBLICATION {id: pid}) WHERE p.community IS NOT NULL "
+            "RETURN p.id AS id, p.community AS community",
+            ids=batch, database_=db, routing_=ROUTING["read"],
+        )
+        partition.update((rec["id"], int(rec["community"])) for rec in records)
+    records, _, _ = driver.execute_query(
+        "MATCH (p:PUBLICATION) RETURN max(p.community) AS top", database_=db, routing_=ROUTING["read"],
+    )
+    top = records[0]["top"] if records else None
+    return partition, -1 if top is None else int(top)
+
+
+def load_neighborhood(driver, db, ids, weights=None, batch_size=1000):
+    """Weighted networkx graph of every existing edge touching `ids`"""
+    import networkx as nx
+
+    weights = weights or {}
+    G = nx.Graph()
+    seen = set()
+    for batch in _batched(ids, batch_size):
+        records, _, _ = driver.execute_query("""
+            UNWIND $ids AS pid
+            MATCH (p:PUBLICATION {id: pid})-[r:COAUTHOR|COVENUE|COTITLE]-(q:PUBLICATION)
+            RETURN elementId(r) AS rid, p.id AS a, q.id AS b, type(r) AS t,
+                   r.weight AS weight, r.similarity AS similarity
+            """,
+            ids=batch, database_=db, routing_=ROUTING["read"],
+        )
+        for rec in records:
+            if rec["rid"] in seen:
+                continue
+            seen.add(rec["rid"])
+            _add_weighted_edge(G, rec["a"], rec["b"], edge_weight(rec["t"], rec.data(), **weights))
+    return G
+
+
+def write_works(driver, db, works, partition=None, author_nodes=True, batch_size=1000):
+    """Create PUBLICATION nodes (with their community from `partition`, if given) and AUTHOR nodes"""
+    partition = partition or {}
+    node_rows = [{
+        "pub_id": w["id"], "pub_title": w.get("title"), "pub_year": w.get("year"),
+        "pub_authors": json.dumps(w.get("authors", [])), "pub_venue": w.get("venue"),
+        "community": partition.get(w["id"]),
+    } for w in works]
+    for batch in _batched(node_rows, batch_size):
+        driver.execute_query("""
+            UNWIND $rows AS row
+            CREATE (n:PUBLICATION {id: row.pub_id, title: row.pub_title, year: row.pub_year,
+                                   authors: row.pub_authors, venue: row.pub_venue, community: row.community})
+            """,
+            rows=batch, database_=db,
+        )
+
+    if author_nodes:
+        author_rows = [{"pub_id": w["id"], "authors": [{"id": a["id"], "name": a["name"]} for a in w.get("authors", [])]}
+                       for w in works]
+        for batch in _batched(author_rows, batch_size):
+            driver.execute_query(AUTHORED_QUERY, rows=batch, database_=db)
+
+
+def write_edges(driver, db, edges, coauthor_payload=PAYLOAD_FULL, batch_size=1000):
+    """Create (a, b, rel_type, props) edges as returned by EdgeIndex.add / cotitle_edges"""
+    match = "UNWIND $rows AS row\nMATCH (p1:PUBLICATION {id: row.a}), (p2:PUBLICATION {id: row.b})\n"
+    queries = {
+        "COAUTHOR": coauthor_query(coauthor_payload),
+        "COVENUE": match + "CREATE (p1)-[:COVENUE {venue: row.venue, weight: row.weight}]->(p2)",
+        "COTITLE": match + "MERGE (p1)-[r:COTITLE]->(p2) SET r.similarity = row.similarity",
+    }
+    for rel_type in REL_TYPES:
+        if rel_type == "COAUTHOR":
+            rows = [coauthor_row(a, b, props["weight"], props["shared"], coauthor_payload)
+                    for a, b, t, props in edges if t == rel_type]
+        else:
+            rows = [{"a": a, "b": b, **props} for a, b, t, props in edges if t == rel_type]
+        for batch in _batched(rows, batch_size):
+            driver.execute_query(queries[rel_type], rows=batch, database_=db)
+
+
+def write_increment(driver, db, works, edges, partition, moved, author_nodes=True,
+                    coauthor_payload=PAYLOAD_FULL, batch_size=1000):
+    """
+    Create the new PUBLICATION nodes (with their community), their edges and AUTHOR nodes,
+    and update the community of moved existing nodes
+    """
+    write_works(driver, db, works, partition, author_nodes, batch_size)
+    write_edges(driver, db, edges, coauthor_payload, batch_size)
+
+    changes = [{"id": node, "community": new} for node, (_, new) in moved.items()]
+    for batch in _batched(changes, batch_size):
+        driver.execute_query("""
+            UNWIND $rows AS row
+            MATCH (p:PUBLICATION {id: row.id})
+            SET p.community = row.community
+            """,
+            rows=batch, database_=db,
+        )
+
+
+def add_works_incrementally(driver, db, works, min_weight=0.0, rounds=3, margin=0.0,
+                            min_similarity=0.60, author_nodes=None, write=True, weights=None,
+                            coauthor_payload=PAYLOAD_FULL, cotitle=True, exclude=None,
+                            max_authors=None, hub_mode="cap"):
+    """
+    Import new works and cluster them into the existing partition
+
+    Args
+        driver: neo4j driver
+        db (str): database name
+        works: iterable of works in the cache's work schema; ids already imported are skipped
+        min_weight (float): a work needs more attached weight than this to join an existing community
+        rounds (int): local refinement passes over the touched nodes
+        margin (float): weight a move must gain over the current community
+        min_similarity (float): COTITLE cosine threshold (same default as neo4j_import.py)
+        author_nodes (bool): also create AUTHOR nodes / AUTHORED relationships for the new works
+                             (None: when the graph already has AUTHOR nodes)
+        write (bool): write nodes, edges and community changes to Neo4j
+        weights (dict): optional edge_weight keyword overrides (coauthor_scale, ...)
+        coauthor_payload (str): COAUTHOR payload mode, see neo4j_import.add_coauthor_edge
+        cotitle (bool): compute COTITLE edges (reads every title; the rest reads only the new works' buckets)
+        exclude, max_authors, hub_mode: COAUTHOR hub handling, the options the graph was imported with
+                                         (see EdgeIndex and neo4j_import.add_coauthor_edge)
+
+    Returns dict: works, edges (count per type), assigned {id: community}, new_communities,
+                  moved {id: (old, new)} for existing nodes, touched (nodes refined)
+    """
+    weights = weights or {}
+    works = list(works)
+    known = existing_ids(driver, db, [w["id"] for w in works])
+
+    new_works, new_set = [], set()
+    for work in works:
+        if work["id"] in known or work["id"] in new_set:
+            continue
+        new_works.append(work)
+        new_set.add(work["id"])
+    new_ids = [w["id"] for w in new_works]
+
+    if author_nodes is None:
+        author_nodes = has_author_nodes(driver, db)
+    index = load_buckets(driver, db, new_works, exclude=exclude, max_authors=max_authors, hub_mode=hub_mode)
+    edges = []
+    for work in new_works:
+        edges.extend((other, work["id"], t, props) for other, t, props in index.add(work))
+    if cotitle and new_works:
+        ids, titles = load_titles(driver, db)
+        edges.extend((a, b, "COTITLE", {"similarity": sim})
+                     for a, b, sim in cotitle_edges(ids + new_ids, titles + [w.get("title") or "" for w in new_works],
+                                                    new_ids, min_similarity))
+
+    # Local graph: the new edges plus every existing edge of the nodes they reach
+    neighbors = {x for a, b, _, _ in edges for x in (a, b) if x not in new_set}
+    G = load_neighborhood(driver, db, sorted(neighbors), weights)
+    for a, b, t, props in edges:
+        _add_weighted_edge(G, a, b, edge_weight(t, props, **weights))
+
+    partition, top = load_partition(driver, db, [n for n in G if n not in new_set])
+    partition, new_communities = assign_new_works(G, partition, new_ids, min_weight, next_id=top + 1)
+    touched = new_ids + sorted(neighbors)
+    partition, moved = refine_local(G, partition, touched, rounds, margin)
+
+    assigned = {n: partition[n] for n in new_ids}
+    moved_existing = {n: change for n, change in moved.items() if n not in new_set}
+    if write:
+        write_increment(driver, db, new_works, edges, partition, moved_existing, author_nodes,
+                        coauthor_payload)
+
+    return {
+        "works": len(new_works),
+        "edges": dict(Counter(t for _, _, t, _ in edges)),
+        "assigned": assigned,
+        "new_communities": sorted(set(new_communities) & set(assigned.values())),
+        "moved": moved_existing,
+        "touched": len(touched),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add new works to the graph and its existing communities")
+    add_connection_arguments(parser)
+    parser.add_argument("--data", required=True, help="Cache file (any format) holding the new works")
+    parser.add_argument("--min_weight", type=float, default=0.0, help="Attached weight needed to join a community")
+    parser.add_argument("--rounds", type=int, default=3, help="Local refinement passes")
+    parser.add_argument("--margin", type=float, default=0.0, help="Weight gain required to move a node")
+    parser.add_argument("--coauthor_payload", choices=COAUTHOR_PAYLOADS, default=PAYLOAD_FULL,
+                        help="What COAUTHOR relationships store besides their weight")
+    parser.add_argument("--no_author_nodes", action="store_true",
+                        help="Skip AUTHOR nodes for the new works (default: add them when the graph has them)")
+    parser.add_argument("--no_cotitle", action="store_true", help="Skip COTITLE edges (no corpus-wide title read)")
+    parser.add_argument("--exclude_query_name", action="store_true",
+                        help="Do not count the --data cache's candidate ids as shared coauthors")
+    parser.add_argument("--max_authors", type=int, default=None, help="COAUTHOR hub cap (authors per work)")
+    parser.add_argument("--hub_mode", choices=["cap", "downweight"], default="cap", help="How hubs are handled")
+    parser.add_argument("--dry_run", action="store_true", help="Report the assignment without writing")
+    args = parser.parse_args()
+
+    conn = connection_from_args(args)
+    exclude = None
+    if args.exclude_query_name:
+        exclude = set(cache_format.read_cache_metadata(args.data)["author_data"])
+    report = add_works_incrementally(
+        conn.driver, conn.database, cache_format.iter_works(args.data),
+        min_weight=args.min_weight, rounds=args.rounds, margin=args.margin,
+        author_nodes=False if args.no_author_nodes else None, write=not args.dry_run,
+        coauthor_payload=args.coauthor_payload, cotitle=not args.no_cotitle,
+        exclude=exclude, max_authors=args.max_authors, hub_mode=args.hub_mode,
+    )
+
+    edges = ", ".join(f"{t}: {report['edges'].get(t, 0)}" for t in REL_TYPES)
+    print(f"{report['works']} new works | {edges}")
+    print(f"{len(report['new_communities'])} new communities, "
+          f"{len(report['moved'])} existing works moved ({report['touched']} touched)")
+    for work_id, comm in report["assigned"].items():
+        print(f"{work_id}\t{comm}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,12 @@
-from neo4j import GraphDatabase
 import networkx as nx
 from community import community_louvain
 
-URI = "neo4j://127.0.0.1:7687"
-USER = "neo4j"
-PASSWORD = "and123$$"
-DB = "neo4j"
+from neo4j_connection import get_connection
+
+# Connection: NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD / NEO4J_DATABASE or neo4j_config.json
 PATH = "/Users/gracewang/Documents/UROP_Summer_2025/neo4j_and/cache/David Nathan_data.json"
 
-def load_pub_graph_from_neo4j(uri, user, password, db):
+def load_pub_graph_from_neo4j(uri=None, user=None, password=None, db=None):
     """
     Build an undirected NetworkX graph from Neo4j by combining:
       - COAUTHOR.weight
@@ -16,7 +14,6 @@ def load_pub_graph_from_neo4j(uri, user, password, db):
       - COTITLE.similarity
     into a single edge weight = sum of available weights.
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
     G = nx.Graph()
 
     # Coauthor relationship is weighted by # of shared co-authors, cotitle is weighted by similarity score
@@ -31,7 +28,7 @@ def load_pub_graph_from_neo4j(uri, user, password, db):
       END AS w
     RETURN a,b,w
     """
-    with driver.session(database=db) as session:
+    with get_connection(uri, user, password, db).read_session() as session:
         for rec in session.run(q):
             a, b, w = rec["a"], rec["b"], float(rec["w"])
             if a == b:
@@ -41,10 +38,9 @@ def load_pub_graph_from_neo4j(uri, user, password, db):
                 G[a][b]["weight"] += w
             else:
                 G.add_edge(a, b, weight=w)
-    driver.close()
     return G
 
-def run_louvain_and_write(uri, user, password, db, resolution=1.0, seed=42):
+def run_louvain_and_write(uri=None, user=None, password=None, db=None, resolution=1.0, seed=42):
     G = load_pub_graph_from_neo4j(uri, user, password, db)
     if G.number_of_nodes() == 0:
         print("Graph is empty; nothing to cluster.")
@@ -56,13 +52,12 @@ def run_louvain_and_write(uri, user, password, db, resolution=1.0, seed=42):
     Q = community_louvain.modularity(partition, G, weight="weight")
     print(f"Louvain modularity: {Q:.4f} | nodes: {G.number_of_nodes()} | edges: {G.number_of_edges()}")
 
-    driver = GraphDatabase.driver(uri, auth=(user, password))
     # Batch updates for speed
     updates = {}
     for node_id, comm in partition.items():
         updates.setdefault(comm, []).append(node_id)
 
-    with driver.session(database=db) as session:
+    with get_connection(uri, user, password, db).write_session() as session:
         for comm, ids in updates.items():
             # write community for a batch of ids
             session.run(
@@ -73,7 +68,6 @@ def run_louvain_and_write(uri, user, password, db, resolution=1.0, seed=42):
                 """,
                 ids=ids, comm=int(comm)
             )
-    driver.close()
 
     # Optional: print sizes
     from collections import Counter
@@ -82,4 +76,4 @@ def run_louvain_and_write(uri, user, password, db, resolution=1.0, seed=42):
         print(f"Community {comm}: {sz} nodes")
 
 if __name__ == "__main__":
-    run_louvain_and_write(URI, USER, PASSWORD, DB, resolution=1.0)
\ No newline at end of file
+    run_louvain_and_write(resolution=1.0)
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Shared, pooled Neo4j connection
+
+Purpose
+- Every script used to open (and close) its own driver with hardcoded credentials and default
+  pool / fetch settings, so a pipeline run paid the connection setup once per stage and call
+- One driver per (uri, user, pool size) is created lazily on first use and reused by every
+  module for the rest of the process; bulk reads run in read sessions with a large fetch size
+
+Configuration (first match wins per setting)
+1) arguments passed to get_connection (None means "not given")
+2) environment: NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, NEO4J_MAX_POOL_SIZE, NEO4J_FETCH_SIZE
+3) JSON file named by NEO4J_CONFIG (default `neo4j_config.json` in the working directory), e.g.
+   {"uri": "neo4j://127.0.0.1:7687", "user": "neo4j", "password": "...", "database": "neo4j",
+    "max_pool_size": 50, "fetch_size": 10000}
+4) DEFAULTS below (the values the scripts used to hardcode)
+
+Usage
+    from neo4j_connection import get_connection
+    conn = get_connection()                        # or get_connection(uri, user, password)
+    with conn.read_session(db) as session:         # fetch_size from the config
+        for rec in session.run(query): ...
+    conn.execute_query(query, rows=batch, database_=db)            # write routing
+    conn.execute_query(query, database_=db, routing="read")        # routed to a reader
+    driver = conn.driver                           # for helpers that take a driver
+- Scripts: add_connection_arguments(parser) adds --uri / --user / --password / --db, and
+  connection_from_args(args) resolves them like get_connection
+
+Notes
+- Drivers are closed at interpreter exit (close_all); after an explicit close the next use reconnects
+"""
+
+import atexit
+import json
+import os
+import threading
+
+
+CONFIG_PATH = "neo4j_config.json"
+
+DEFAULTS = {
+    "uri": "neo4j://127.0.0.1:7687",
+    "user": "neo4j",
+    "password": "and123$$",
+    "database": "neo4j",
+    "max_pool_size": 100,
+    "fetch_size": 10000,
+}
+
+ENV = {
+    "uri": "NEO4J_URI",
+    "user": "NEO4J_USER",
+    "password": "NEO4J_PASSWORD",
+    "database": "NEO4J_DATABASE",
+    "max_pool_size": "NEO4J_MAX_POOL_SIZE",
+    "fetch_size": "NEO4J_FETCH_SIZE",
+}
+
+_INT_SETTINGS = ("max_pool_size", "fetch_size")
+
+# Values of neo4j.RoutingControl and neo4j.READ_ACCESS / WRITE_ACCESS, so importing this module
+# does not load the driver package
+ROUTING = {"read": "r", "write": "w"}
+ACCESS = {"read": "READ", "write": "WRITE"}
+
+
+def load_config(config_path=None, **overrides):
+    """Resolved settings: overrides (non-None) > environment > config file > DEFAULTS"""
+    config_path = config_path or os.environ.get("NEO4J_CONFIG", CONFIG_PATH)
+    config = dict(DEFAULTS)
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config.update({k: v for k, v in json.load(f).items() if k in DEFAULTS})
+    for key, var in ENV.items():
+        if os.environ.get(var):
+            config[key] = os.environ[var]
+    config.update({k: v for k, v in overrides.items() if v is not None and k in DEFAULTS})
+    for key in _INT_SETTINGS:
+        config[key] = int(config[key])
+    return config
+
+
+_drivers = {}
+_drivers_lock = threading.Lock()
+
+
+def _pooled_driver(uri, auth, max_pool_size):
+    """One driver per (uri, auth, pool size) for the whole process, created on first use"""
+    key = (uri, auth, max_pool_size)
+    with _drivers_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            from neo4j import GraphDatabase
+
+            driver = GraphDatabase.driver(uri, auth=auth, max_connection_pool_size=max_pool_size)
+            _drivers[key] = driver
+    return driver
+
+
+class Neo4jConnection:
+    """Resolved settings plus session helpers; the driver itself is pooled per process"""
+
+    def __init__(self, uri, user, password, database="neo4j", max_pool_size=100, fetch_size=10000):
+        self.uri = uri
+        self.auth = (user, password)
+        self.database = database
+        self.max_pool_size = max_pool_size
+        self.fetch_size = fetch_size
+
+    @property
+    def driver(self):
+        """The shared pooled neo4j driver"""
+        return _pooled_driver(self.uri, self.auth, self.max_pool_size)
+
+    def session(self, database=None, mode="write", fetch_size=None):
+        """
+        Session on `database` (the configured one when None)
+
+        Args
+            mode (str): "read" or "write" access (routes to readers / the leader on a cluster)
+            fetch_size (int): records per pull (the configured fetch size when None)
+        """
+        return self.driver.session(database=database or self.database,
+                                   default_access_mode=ACCESS[mode],
+                                   fetch_size=fetch_size or self.fetch_size)
+
+    def read_session(self, database=None, fetch_size=None):
+        return self.session(database, "read", fetch_size)
+
+    def write_session(self, database=None, fetch_size=None):
+        return self.session(database, "write", fetch_size)
+
+    def execute_query(self, query, parameters=None, routing="write", **kwargs):
+        """driver.execute_query with routing "read" / "write" and the configured database by default"""
+        kwargs.setdefault("database_", self.database)
+        return self.driver.execute_query(query, parameters, routing_=ROUTING[routing], **kwargs)
+
+    def verify_connectivity(self):
+        self.driver.verify_connectivity()
+
+    def close(self):
+        """Close the pooled driver (the next use creates a new one)"""
+        with _drivers_lock:
+            driver = _drivers.pop((self.uri, self.auth, self.max_pool_size), None)
+        if driver is not None:
+            driver.close()
+
+
+def get_connection(uri=None, user=None, password=None, database=None, max_pool_size=None,
+                   fetch_size=None, config_path=None):
+    """
+    Neo4jConnection for the resolved configuration (see the module docstring)
+
+    Connections with the same uri, credentials and pool size share one driver
+    """
+    config = load_config(config_path, uri=uri, user=user, password=password, database=database,
+                         max_pool_size=max_pool_size, fetch_size=fetch_size)
+    return Neo4jConnection(config["uri"], config["user"], config["password"], config["database"],
+                           config["max_pool_size"], config["fetch_size"])
+
+
+def add_connection_arguments(parser):
+    """--uri / --user / --password / --db options; the ones left unset come from the environment or config file"""
+    parser.add_argument("--uri", help="Neo4j URI (default: NEO4J_URI, neo4j_config.json, then neo4j://127.0.0.1:7687)")
+    parser.add_argument("--user", help="Neo4j user (default: NEO4J_USER)")
+    parser.add_argument("--password", help="Neo4j password (default: NEO4J_PASSWORD)")
+    parser.add_argument("--db", help="Database name (default: NEO4J_DATABASE, then neo4j)")
+
+
+def connection_from_args(args):
+    """get_connection for the options added by add_connection_arguments (and --fetch_size, if any)"""
+    return get_connection(args.uri, args.user, args.password, args.db, fetch_size=getattr(args, "fetch_size", None))
+
+
+def close_all():
+    """Close every pooled driver (registered at exit)"""
+    with _drivers_lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    for driver in drivers:
+        driver.close()
+
+
+atexit.register(close_all)
@@ -6,7 +6,8 @@ Purpose
 - Materialize a compact JSON cache that the Neo4j importer can consume
 
 What it creates
-- cache/<Author Name>_data.json
+- cache/<Author Name>_data.json (or cache/<Author Name>_data.cols with `--format columnar`, see cache_format.py,
+  or a manifest in the shared works store with `--format store`, see works_store.py)
   {
     "author_name": str,
     "author_data": {<openalex_author_id>: {...}},
@@ -15,7 +16,8 @@ What it creates
   }
 
 How to run
-- Adjust `author_name` below (default: "David Nathan")
+- Pass one or more names, e.g. `python neo4j_data.py "David Nathan" "Russell Bowler"`
+  Several names are resolved together via `fetch_author_data_batch`
 - Ensure Python can import `name_disambiguation/openAlex_to_HGCN.py` as `openAlex_to_HGCN`
   If needed, run from repo root and set PYTHONPATH: `PYTHONPATH=. python neo4j_data.py`
 - This script does not require a running Neo4j instance; it only creates the cache JSON
@@ -26,11 +28,13 @@ Notes
 """
 
 import openAlex_to_HGCN as oth
+import cache_format
 import argparse
 
-def fetch_data(name):
-    #1. Fetch author data from OpenAlex
-    author_data = oth.fetch_author_data(name)
+def fetch_data(name, author_data=None, fmt=cache_format.FORMAT_JSON):
+    #1. Fetch author data from OpenAlex (unless already resolved in a batch)
+    if author_data is None:
+        author_data = oth.fetch_author_data(name)
 
     #2. Mapping author ID to lable (0,1,2,...)
     author_id_to_label = {}
@@ -46,21 +50,39 @@ def fetch_data(name):
         for work in author_works:
             works_data[work["id"]] = work
 
-    #4. Save to JSON (consumed later by neo4j_import.py)
-    oth.save_data_to_json(name, author_data, works_data, author_id_to_label)
+    #4. Save to the cache (consumed later by neo4j_import.py)
+    oth.save_data_to_json(name, author_data, works_data, author_id_to_label, fmt)
 
 
-def main():
+def fetch_data_batch(names, fmt=cache_format.FORMAT_JSON):
+    """
+    Fetch and cache several names, resolving their candidates concurrently
+    """
+    batch_author_data = oth.fetch_author_data_batch(names)
+    for name, author_data in batch_author_data.items():
+        fetch_data(name, author_data, fmt)
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Fetch publications for an ambiguous author name from OpenAlex")
-    parser.add_argument("author_name", help="Author name to fetch data for (e.g., 'David Nathan')")
-    args = parser.parse_args()
-    author_name = args.author_name
+    parser.add_argument("author_names", nargs="+", help="Author name(s) to fetch data for (e.g., 'David Nathan')")
+    parser.add_argument("--format", choices=list(cache_format.EXTENSIONS),
+                        default=cache_format.FORMAT_JSON, help="Cache format to write")
+    args = parser.parse_args(argv)
+
+    if len(args.author_names) == 1:
+        author_name = args.author_names[0]
+        print(f"Retrieving publication data from {author_name}\n")
+        fetch_data(author_name, fmt=args.format)
+        print(f"\nData is imported to {cache_format.cache_path(author_name, args.format)}")
+        return
 
-    print(f"Retrieving publication data from {author_name}\n")
+    print(f"Retrieving publication data for {len(args.author_names)} names\n")
 
-    fetch_data(author_name)
+    fetch_data_batch(args.author_names, args.format)
 
-    print(f"\nData is imported to cache/{author_name}_data.json")
+    for author_name in args.author_names:
+        print(f"Data is imported to {cache_format.cache_path(author_name, args.format)}")
 
 
 if __name__ == "__main__":
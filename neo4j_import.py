@@ -2,18 +2,22 @@
 Neo4j import script (step 2 of 2)
 
 Purpose
-- Read the cached JSON produced by `neo4j_data.py`
+- Stream the cache produced by `neo4j_data.py` (JSON or columnar, see cache_format.py)
 - Create publication nodes and similarity edges in Neo4j for disambiguation experiments
 
 Current capabilities
-- PUBLICATION nodes with properties: id, title, year, authors (JSON string), venue
+- PUBLICATION nodes with properties: id, title, year, authors (JSON string), venue (and author_ids with AUTHOR nodes)
+- Optional AUTHOR nodes {id, name} with AUTHORED relationships to their publications, and one
+  AUTHOR_NAME {name} node per spelling linked by SPELLING_OF (main(author_nodes=True); indexed,
+  see author_queries.py)
 - COAUTHOR edges: connect publications that share at least one author
 - COVENUE edges: connect publications that share the same venue
 - COTITLE edges: connect publications with similar
 
 Usage
 1) Ensure a Neo4j instance is running and accessible
-2) Set connection variables in the main block (URI, USER, PASSWORD, DB, PATH)
+2) Set NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD / NEO4J_DATABASE (or neo4j_config.json, see
+   neo4j_connection.py) and PATH in the main block
 3) Run from repo root, e.g. `PYTHONPATH=. python neo4j_import.py`
 
 Outputs (example counts from "David Nathan")
@@ -28,37 +32,29 @@ Outputs (example counts from "David Nathan")
     Total relationships: 23060
 
 Notes
+- Memory: nodes are ingested from the streamed cache; the edge builders share one compact Corpus
+  of the name (int32 arrays + titles), the only structure that grows with the name's works
 - Relationships are currently modeled as directional in code, but clustering can treat the graph as undirected
 - Consider converting to undirected by creating a single relationship with `MERGE` or by normalizing during analysis
+- scikit-learn, networkx, python-louvain, igraph / leidenalg and the neo4j driver are imported by the
+  functions that use them, so modules that only need title_vectorizer or the COAUTHOR helpers start fast
 """
 
-from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable, Neo4jError
-import json
-from typing import List, Dict, Tuple
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from __future__ import annotations
 
-# --- Graph clustering helpers (Louvain / Leiden) ---
-import networkx as nx
+import json
+import os
+from typing import TYPE_CHECKING, List, Dict, Tuple
 
-# Louvain (python-louvain)
-try:
-    import community as community_louvain  # pip install python-louvain
-except Exception:
-    community_louvain = None
+import cache_format
+from corpus import Corpus, encode_author_id
+from neo4j_connection import get_connection
 
-# Leiden (igraph + leidenalg)
-try:
-    import igraph as ig
-    import leidenalg as la  # pip install python-igraph leidenalg
-except Exception:
-    ig = None
-    la = None
+if TYPE_CHECKING:
+    import networkx as nx
 
 
-def load_pub_graph_from_neo4j(uri, user, password, db,
+def load_pub_graph_from_neo4j(uri=None, user=None, password=None, db=None,
                               coauthor_scale: float = 1.0,
                               covenue_scale: float = 1.0,
                               cotitle_scale: float = 1.2,
@@ -71,10 +67,13 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
       - COVENUE : covenue_scale * 1.0 (if r.weight is null or 0) else r.weight
       - COTITLE : cotitle_scale * coalesce(r.similarity, 0.0)
 
+    Connection settings left as None come from neo4j_connection (environment / config file);
+    the edges are streamed through a read session with its fetch size.
+
     Returns:
       networkx.Graph with 'weight' on each edge.
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    import networkx as nx
 
     q = """
     MATCH (p1:PUBLICATION)-[r:COAUTHOR|COVENUE|COTITLE]-(p2:PUBLICATION)
@@ -99,7 +98,7 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
     """
 
     G = nx.Graph()
-    with driver.session(database=db) as sess:
+    with get_connection(uri, user, password, db).read_session() as sess:
         for rec in sess.run(q,
                             coauthorScale=coauthor_scale,
                             covenueScale=covenue_scale,
@@ -113,7 +112,6 @@ def load_pub_graph_from_neo4j(uri, user, password, db,
             else:
                 G.add_edge(a, b, weight=w)
 
-    driver.close()
     return G
 
 
@@ -126,7 +124,9 @@ def run_louvain(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
       - partition_dict: {node_id: community_id}
       - modularity: Louvain modularity score
     """
-    if community_louvain is None:
+    try:
+        import community as community_louvain  # pip install python-louvain
+    except Exception:
         raise RuntimeError("python-louvain not installed. `pip install python-louvain`")
     part = community_louvain.best_partition(G, weight="weight",
                                             resolution=resolution,
@@ -144,7 +144,10 @@ def run_leiden(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
       - partition_dict: {node_id: community_id}
       - quality: CPM objective value (not modularity)
     """
-    if ig is None or la is None:
+    try:
+        import igraph as ig
+        import leidenalg as la  # pip install python-igraph leidenalg
+    except Exception:
         raise RuntimeError("Leiden not installed. `pip install python-igraph leidenalg`")
 
     # Map NetworkX nodes -> indices
@@ -172,76 +175,207 @@ def run_leiden(G: nx.Graph, resolution: float = 1.0, seed: int = 42):
     return partition, quality
 
 
+def title_vectorizer(max_features=10000):
+    """TF-IDF vectorizer used for COTITLE similarity (shared by every title-based component)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        lowercase=True,
+        stop_words="english",
+        ngram_range=(1, 2),
+        max_features=max_features
+    )
+
+
+# What each COAUTHOR relationship stores besides its weight
+PAYLOAD_FULL = "full"   # coauthor: JSON string of the shared authors [{"id", "name"}]
+PAYLOAD_IDS = "ids"     # shared_ids: int-encoded shared author ids (corpus.encode_author_id)
+PAYLOAD_NONE = "none"   # weight only
+COAUTHOR_PAYLOADS = (PAYLOAD_FULL, PAYLOAD_IDS, PAYLOAD_NONE)
+
+_COAUTHOR_CREATE = {
+    PAYLOAD_FULL: "CREATE (p1)-[:COAUTHOR {coauthor: row.coauthor, weight: row.weight}]->(p2)",
+    PAYLOAD_IDS: "CREATE (p1)-[:COAUTHOR {shared_ids: row.shared_ids, weight: row.weight}]->(p2)",
+    PAYLOAD_NONE: "CREATE (p1)-[:COAUTHOR {weight: row.weight}]->(p2)",
+}
+
+
+def coauthor_query(payload=PAYLOAD_FULL):
+    """UNWIND statement creating COAUTHOR relationships from rows made by coauthor_row"""
+    if payload not in _COAUTHOR_CREATE:
+        raise ValueError(f"Unknown COAUTHOR payload: {payload} (expected one of {COAUTHOR_PAYLOADS})")
+    return ("UNWIND $rows AS row\n"
+            "MATCH (p1:PUBLICATION {id: row.a}), (p2:PUBLICATION {id: row.b})\n"
+            + _COAUTHOR_CREATE[payload])
+
+
+def coauthor_row(a, b, weight, shared, payload=PAYLOAD_FULL):
+    """One COAUTHOR row; `shared` is the shared-author list [{"id", "name"}]"""
+    row = {"a": a, "b": b, "weight": weight}
+    if payload == PAYLOAD_FULL:
+        row["coauthor"] = json.dumps(shared)
+    elif payload == PAYLOAD_IDS:
+        row["shared_ids"] = [encode_author_id(author["id"]) for author in shared]
+    return row
+
+
+# AUTHORED rows {pub_id, authors: [{id, name}]}: links each publication to its AUTHOR nodes and
+# every spelling seen per author id to its AUTHOR through an AUTHOR_NAME node (`name` is the first one)
+AUTHORED_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:PUBLICATION {id: row.pub_id})
+    SET p.author_ids = [a IN row.authors | a.id]
+    WITH p, row
+    UNWIND row.authors AS author
+    MERGE (a:AUTHOR {id: author.id})
+      ON CREATE SET a.name = author.name
+    MERGE (a)-[:AUTHORED]->(p)
+    FOREACH (spelling IN [n IN [author.name] WHERE n IS NOT NULL] |
+        MERGE (s:AUTHOR_NAME {name: spelling})
+        MERGE (s)-[:SPELLING_OF]->(a))
+    """
+
+
+def _batched(iterable, n):
+    """Yield lists of up to n items from an iterable without materializing it"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 class Neo4jImportData:
     def __init__(self, uri, user, password, db, data_path):
         """
-        Initialize a Neo4j driver and load the cached data
+        Bind the shared pooled Neo4j driver (neo4j_connection) to the cached data
+
+        The cache is never held as parsed JSON: node ingestion (publication_as_nodes,
+        add_author_nodes) streams works from the file one batch at a time. The COVENUE /
+        COAUTHOR / COTITLE builders compare every work with every other, so they use a
+        Corpus (corpus.py) built on first use; it is the one structure that stays O(works
+        + authorships) for the name, as interned int32 arrays plus the titles rather than
+        parsed work dicts.
 
         Args
-            uri (str): Neo4j URI (e.g. bolt://localhost:7687)
-            user (str): instance username
-            password (str): instance password
-            db (str): database name
-            data_path (str): Path to JSON created by neo4j_data.py (cache/<Author>_data.json)
+            uri (str): Neo4j URI (e.g. bolt://localhost:7687); None for NEO4J_URI / the config file
+            user (str): instance username (likewise)
+            password (str): instance password (likewise)
+            db (str): database name (likewise)
+            data_path (str): Path to the cache created by neo4j_data.py
+                             (cache/<Author>_data.json or cache/<Author>_data.cols, detected automatically)
         """
+        from neo4j.exceptions import ServiceUnavailable
+
+        self.conn = get_connection(uri, user, password, db)
+        self.driver = self.conn.driver
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(user,password))
             self.driver.verify_connectivity()
             print("Connection to Neo4j database successful!")
         except ServiceUnavailable as e:
             print(f"Connection failed: {e}")
 
-        self.db = db
+        self.db = self.conn.database
 
-        with open(data_path,'r', encoding='utf-8') as file:
-            self.data = json.load(file)
+        self.data_path = data_path
+        self._corpus = None
 
     def close(self):
-        self.driver.close()
+        """Release this importer; the pooled driver stays open for the rest of the process"""
+        self.driver = None
+
+    @property
+    def corpus(self):
+        """
+        Compact per-author / per-venue bucketing of the works for the edge builders
+
+        Built once from the streamed cache (or the columnar cache's arrays); O(works +
+        authorships) memory, the remaining whole-name structure of the import
+        """
+        if self._corpus is None:
+            self._corpus = Corpus.from_cache(self.data_path)
+        return self._corpus
+
+    def iter_works(self):
+        """Stream works from the cache file one at a time"""
+        return cache_format.iter_works(self.data_path)
 
     
-    def publication_as_nodes(self):
+    def publication_as_nodes(self, batch_size=1000):
         """
         Create PUBLICATION nodes with properties id, title, year, authors (JSON string), venue
+
+        Works are streamed from the cache and written in UNWIND batches of `batch_size`;
+        a batch that fails for any reason is retried one work at a time, so a bad record
+        is reported alone and the rest of the batch is still ingested (as the per-work
+        loop did).
         """
-        for work in self.data['works_data']:
-            pub_id, title, year, authors, venue = (
-                self.data['works_data'][work][k] for k in ['id', 'title', 'year', 'authors', 'venue']
-            )
+        for batch in _batched(self._node_rows(), batch_size):
+            try:
+                self.driver.execute_query("""
+                    UNWIND $rows AS row
+                    CREATE (n:PUBLICATION {id: row.pub_id, title: row.pub_title, year: row.pub_year, authors: row.pub_authors, venue: row.pub_venue})
+                    """,
+                    rows = batch,
+                    database_=self.db,
+                )
+            except Exception:  # Keep broad catch to continue bulk ingestion
+                for row in batch:
+                    self._create_publication_node(row)
 
-            # Must convert authors data to json string
-            author_string = json.dumps(authors)
+        print("All nodes were successfully added.")
 
+    def _node_rows(self):
+        """Stream node property rows; works that cannot be converted are reported and skipped"""
+        for work in self.iter_works():
             try:
-                summary = self.driver.execute_query("""
-                    CREATE (n:PUBLICATION {id: $pub_id, title: $pub_title, year: $pub_year, authors: $pub_authors, venue: $pub_venue})
-                    """,
-                    pub_id = pub_id, 
-                    pub_title = title, 
-                    pub_year = year, 
-                    pub_authors = author_string, 
-                    pub_venue = venue,
-                    database = self.db,
+                pub_id, title, year, authors, venue = (
+                    work[k] for k in ['id', 'title', 'year', 'authors', 'venue']
                 )
 
+                # Must convert authors data to json string
+                row = {
+                    "pub_id": pub_id,
+                    "pub_title": title,
+                    "pub_year": year,
+                    "pub_authors": json.dumps(authors),
+                    "pub_venue": venue,
+                }
             except KeyError as ke:
                 print(f"Missing key in work data: {ke}")
-            except Neo4jError as ne:
-                print(f"Neo4j error while inserting '{title}': {ne}")
+                continue
             except Exception as e:  # Keep broad catch to continue bulk ingestion
                 print(f"Unexpected error creating PUBLICATION node: {e}")
+                continue
+            yield row
 
-        print("All nodes were successfully added.")
+    def _create_publication_node(self, row):
+        from neo4j.exceptions import Neo4jError
+
+        try:
+            self.driver.execute_query("""
+                CREATE (n:PUBLICATION {id: $pub_id, title: $pub_title, year: $pub_year, authors: $pub_authors, venue: $pub_venue})
+                """,
+                **row,
+                database_=self.db,
+            )
+        except Neo4jError as ne:
+            print(f"Neo4j error while inserting '{row['pub_title']}': {ne}")
+        except Exception as e:  # Keep broad catch to continue bulk ingestion
+            print(f"Unexpected error creating PUBLICATION node: {e}")
 
 
     def node_count(self):
         """
         Print total node count
         """
-        result = self.driver.execute_query("""
+        result = self.conn.execute_query("""
             MATCH (n) RETURN count(n) AS node_count
         """,
-        database = self.db)
+        database_=self.db, routing="read")
         count = result.records[0]["node_count"]
         print(f"Number of nodes: {count}")
 
@@ -249,11 +383,11 @@ class Neo4jImportData:
         """
         Print total relationship count
         """
-        result = self.driver.execute_query(
+        result = self.conn.execute_query(
             """
             MATCH ()-[r]->() RETURN COUNT(r) AS totalRelationships
             """,
-            database=self.db
+            database_=self.db, routing="read"
         )
         count = result.records[0]["totalRelationships"]
         print(f"Total relationships: {count}")
@@ -266,92 +400,132 @@ class Neo4jImportData:
         self.driver.execute_query("""
             MATCH (n) DETACH DELETE n
         """,
-        database = self.db)
+        database_=self.db)
         print("All nodes were successfully deleted.")
         self.node_count()
 
 
+    def create_indexes(self):
+        """
+        Create the constraints / indexes used for id lookups and author queries
+
+        - PUBLICATION.id and AUTHOR.id are unique (also speeds up every MATCH by id)
+        - AUTHOR_NAME.name is unique, so author_queries.py looks spellings up by equality
+        - AUTHOR.name and PUBLICATION.community are indexed for author_queries.py
+        - The former author_names index (on a list property, which no lookup can use) is dropped
+        - PUBLICATION.venue is indexed for the venue lookups of incremental_clustering.py
+        """
+        for statement in (
+            "CREATE CONSTRAINT publication_id IF NOT EXISTS FOR (p:PUBLICATION) REQUIRE p.id IS UNIQUE",
+            "CREATE CONSTRAINT author_id IF NOT EXISTS FOR (a:AUTHOR) REQUIRE a.id IS UNIQUE",
+            "CREATE INDEX author_name IF NOT EXISTS FOR (a:AUTHOR) ON (a.name)",
+            "CREATE CONSTRAINT author_name_spelling IF NOT EXISTS FOR (s:AUTHOR_NAME) REQUIRE s.name IS UNIQUE",
+            "DROP INDEX author_names IF EXISTS",
+            "CREATE INDEX publication_community IF NOT EXISTS FOR (p:PUBLICATION) ON (p.community)",
+            "CREATE INDEX publication_venue IF NOT EXISTS FOR (p:PUBLICATION) ON (p.venue)",
+        ):
+            self.driver.execute_query(statement, database_=self.db)
+        print("Indexes and constraints are in place.")
+
+
+    def add_author_nodes(self, batch_size=1000):
+        """
+        Create AUTHOR {id, name} nodes and (AUTHOR)-[:AUTHORED]->(PUBLICATION) relationships,
+        and store the author ids on each publication as `author_ids`
+
+        An author id can appear under several display names; each one is an indexed
+        (:AUTHOR_NAME {name})-[:SPELLING_OF]->(:AUTHOR) (author_queries.py looks names up there)
+        and `name` is the first one seen.
+
+        Lets queries find a person through the AUTHOR index instead of scanning
+        the `authors` JSON string with CONTAINS. Run after publication_as_nodes.
+        """
+        def rows():
+            for work in self.iter_works():
+                yield {
+                    "pub_id": work["id"],
+                    "authors": [{"id": a["id"], "name": a["name"]} for a in work["authors"]],
+                }
+
+        created = 0
+        for batch in _batched(rows(), batch_size):
+            self.driver.execute_query(AUTHORED_QUERY, rows = batch, database_=self.db)
+            created += sum(len(row["authors"]) for row in batch)
+
+        print(f" Created {created} AUTHORED relationships")
+
+
     def add_covenue_edge(self):
         """
         Create COVENUE edges between publications that share the same venue
         Currently directional; community detection can treat as undirected
         """
-        id_venue = {}
-        for work_data in self.data['works_data'].values():
-            pub_id = work_data['id']
-            venue = work_data['venue']
-            id_venue[pub_id] = venue
+        corpus = self.corpus
+        rows, cols = corpus.venue_pairs()
 
         created_edges = 0
 
-        pub_keys = list(id_venue.keys())
-        for i, pub1 in enumerate(pub_keys):
-            for pub2 in pub_keys[i+1:]:
-                if id_venue[pub1] == id_venue[pub2]:
-                    #print(f"Trying edge between {pub1} and {pub2}, venue: {id_venue[pub1]}")
-                    self.driver.execute_query("""
-                        MATCH (p1:PUBLICATION {id: $pub_name1}), (p2:PUBLICATION {id: $pub_name2})
-                        CREATE (p1) - [:COVENUE {venue: $pub_venue, weight: 1.0}] -> (p2)
-                    """,
-                    pub_name1 = pub1, 
-                    pub_name2 = pub2, 
-                    pub_venue = id_venue[pub1],
-                    database = self.db
-                    )
-                    created_edges += 1
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            self.driver.execute_query("""
+                MATCH (p1:PUBLICATION {id: $pub_name1}), (p2:PUBLICATION {id: $pub_name2})
+                CREATE (p1) - [:COVENUE {venue: $pub_venue, weight: 1.0}] -> (p2)
+            """,
+            pub_name1 = corpus.work_ids[i], 
+            pub_name2 = corpus.work_ids[j], 
+            pub_venue = corpus.venues[corpus.work_venue[i]],
+            database_=self.db
+            )
+            created_edges += 1
         
         print(f" Created {created_edges} CoVenue relationships")
 
 
-    def add_coauthor_edge(self):
+    def add_coauthor_edge(self, exclude_query_name=False, max_authors=None, hub_mode="cap",
+                          payload=PAYLOAD_FULL, batch_size=1000):
         """
         Create COAUTHOR edges between publications that share at least one author
         Adds a `weight` equal to the number of shared authors
         Currently directional; community detection can treat as undirected
-        """
 
-        works_data = self.data['works_data']
+        Hub handling (off by default)
+            exclude_query_name: do not count the ambiguous name's candidate author ids
+                                (author_data of the cache) as shared authors
+            max_authors: works with more authors are hubs
+            hub_mode: "cap" gives hubs no COAUTHOR edges, "downweight" scales their weights
+                      by max_authors / n_authors
+
+        Payload
+            "full" stores the shared authors as a JSON string (`coauthor`), "ids" only their
+            int-encoded ids (`shared_ids`), "none" just the weight. The clustering loaders read
+            only `weight`; shared-author details can be rebuilt on demand with
+            author_queries.shared_authors (AUTHOR nodes) or Corpus.shared_author_records (cache).
+        """
+        corpus = self.corpus
+        exclude = None
+        if exclude_query_name:
+            exclude = set(cache_format.read_cache_metadata(self.data_path)["author_data"])
 
-        #print(works_data)
-        created_edges = 0
+        # Shared author counts for every pair at once (includes the ambiguous name unless excluded)
+        rows, cols, counts = corpus.shared_author_pairs(exclude, max_authors, hub_mode)
 
-        pub_keys = list(works_data.keys())
-        # Creates a set of pub1 authors
-        for i, pub1 in enumerate(pub_keys):
-            authors1 = works_data[pub1]['authors']
-            set1 = {(a['id'], a['name']) for a in authors1}
+        def edge_rows():
+            for i, j, weight in zip(rows.tolist(), cols.tolist(), counts.tolist()):
+                #### FUTURE: may need to create metric for number of shared authors for weighted edge
+                shared = corpus.shared_author_records(i, j, exclude) if payload != PAYLOAD_NONE else None
+                yield coauthor_row(corpus.work_ids[i], corpus.work_ids[j], weight, shared, payload)
 
-            # Set of pub2 authors
-            for pub2 in pub_keys[i+1:]:
-                authors2 = works_data[pub2]['authors']
-                set2 = {(a['id'], a['name']) for a in authors2}
+        query = coauthor_query(payload)
+        created_edges = 0
 
-                # Shared authors between two publications, including ambiguous name
-                shared_authors = set1 & set2
+        for batch in _batched(edge_rows(), batch_size):
+            self.driver.execute_query(query, rows=batch, database_=self.db)
+            created_edges += len(batch)
 
-                #### FUTURE: may need to create metric for number of shared authors for weighted edge
-                if shared_authors:
-                    shared_authors_json = [{"id": aid, "name": name} for (aid, name) in shared_authors]
-                    json_string = json.dumps(shared_authors_json)
-
-                    # Add weight for COAUTHOR (# of shared authors)
-                    weight = len(shared_authors)
-
-                    self.driver.execute_query(
-                        """
-                        MATCH (p1:PUBLICATION {id: $pub_name1}), (p2:PUBLICATION {id: $pub_name2})
-                        CREATE (p1)-[:COAUTHOR {coauthor: $pub_coauthor, weight: $weight}]->(p2)
-                        """,
-                        pub_name1=pub1,
-                        pub_name2=pub2,
-                        pub_coauthor=json_string,
-                        weight = weight,
-                        database=self.db
-                    )
-                    created_edges += 1
-                    #print(f" Created {created_edges} relationships.")
-            
         print(f" Created {created_edges} CoAuthor relationships")
+        if exclude or max_authors is not None:
+            volume = corpus.coauthor_volume(exclude, max_authors, hub_mode)
+            print(f" Hub handling saved {volume['edges_before'] - volume['edges_after']} "
+                  f"of {volume['edges_before']} CoAuthor relationships")
 
     def cotitle_pairs_tfidf(self, min_similarity=0.60, max_features=10000):
         """
@@ -364,17 +538,12 @@ class Neo4jImportData:
         Requirements
             scikit-learn must be installed (see requirements.txt)
         """
-        works_data = self.data["works_data"]
-        pub_ids = list(works_data.keys())
-        titles = [works_data[pid].get("title") or "" for pid in pub_ids]
-
-        vec = TfidfVectorizer(
-            lowercase=True,
-            stop_words="english",
-            ngram_range=(1, 2),
-            max_features=max_features
-        )
-        X = vec.fit_transform(titles)
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        pub_ids = self.corpus.work_ids
+        titles = [title or "" for title in self.corpus.titles]
+
+        X = title_vectorizer(max_features).fit_transform(titles)
 
         # sparse cosine sim
         S = cosine_similarity(X, dense_output=False).tocsr()
@@ -387,27 +556,66 @@ class Neo4jImportData:
                 pairs.append((pub_ids[i], pub_ids[j], float(sim)))
         return pairs
 
-    def add_cotitle_edge_from_pairs(self, pairs, threshold=0.60):
-        created = 0
+    def cotitle_pairs_lsh(self, min_similarity=0.60, max_features=10000, bands=16, rows=2):
+        """
+        COTITLE pairs from MinHash/LSH candidates, verified with the same TF-IDF cosine
+        as cotitle_pairs_tfidf (see title_lsh.py for the recall / speed trade-off)
+        """
+        from title_lsh import cotitle_pairs_lsh
+
+        return cotitle_pairs_lsh(self.corpus.work_ids, self.corpus.titles, min_similarity,
+                                 max_features, bands=bands, rows=rows)
+
+    def cotitle_pairs_cached(self, min_similarity=0.60, max_features=10000):
+        """
+        COTITLE pairs from the per-name similarity cache (cotitle_cache.py)
+
+        The vectorizer is fitted and the similarity matrix computed only when the titles or
+        settings changed; other thresholds just filter the cached upper triangle.
+        """
+        from cotitle_cache import load_or_compute
+
+        name = cache_format.name_from_path(self.data_path) or os.path.splitext(os.path.basename(self.data_path))[0]
+        sim = load_or_compute(name, self.corpus.work_ids, self.corpus.titles, min_similarity, max_features)
+        return sim.pairs(min_similarity)
+
+    def apply_cotitle_threshold(self, min_similarity=0.60, max_features=10000):
+        """
+        Re-threshold COTITLE edges already in the graph: only the edges that cross the new
+        threshold are deleted or added (see cotitle_cache.apply_cotitle_pairs)
+        """
+        from cotitle_cache import apply_cotitle_pairs
+
+        added, removed = apply_cotitle_pairs(self.driver, self.db,
+                                             self.cotitle_pairs_cached(min_similarity, max_features))
+        print(f"Added {added} and removed {removed} cotitle relationships (cosine ≥ {min_similarity})")
+
+    def add_cotitle_edge_from_pairs(self, pairs, threshold=0.60, batch_size=1000):
+        rows = []
         for id1, id2, sim in pairs:
             if id1 == id2 or sim < threshold:
                 continue
             a, b = (id1, id2) if id1 < id2 else (id2, id1)
+            rows.append({"a": a, "b": b, "sim": float(sim)})
+
+        for batch in _batched(rows, batch_size):
             self.driver.execute_query(
                 """
-                MATCH (p1:PUBLICATION {id: $a}), (p2:PUBLICATION {id: $b})
+                UNWIND $rows AS row
+                MATCH (p1:PUBLICATION {id: row.a}), (p2:PUBLICATION {id: row.b})
                 MERGE (p1)-[r:COTITLE]->(p2)
-                SET r.similarity = $sim
+                SET r.similarity = row.sim
                 """,
-                a=a, b=b, sim=float(sim), database=self.db
+                rows=batch, database_=self.db
             )
-            created += 1
-        print(f"Created {created} cotitle relationships (cosine ≥ {threshold})")
+        print(f"Created {len(rows)} cotitle relationships (cosine ≥ {threshold})")
 
 
-def main(URI, USER, PASSWORD, DB, PATH):
+def main(URI, USER, PASSWORD, DB, PATH, author_nodes=False, cotitle="tfidf",
+         exclude_query_name=False, max_authors=None, coauthor_payload=PAYLOAD_FULL):
     """
     Creates neo4j graph in database with publication node and coauthor, cotitle, covenue relationships
+    (and, with author_nodes, indexed AUTHOR nodes linked by AUTHORED)
 
     Args
         uri (str): Neo4j URI (e.g. bolt://localhost:7687)
@@ -415,33 +623,45 @@ def main(URI, USER, PASSWORD, DB, PATH):
         password (str): instance password
         db (str): database name
         data_path (str): Path to JSON created by neo4j_data.py (cache/<Author>_data.json)
+        author_nodes (bool): also create AUTHOR nodes and AUTHORED relationships (off by default;
+                             they add one node per author and one relationship per authorship)
+        cotitle (str): "tfidf" scores every title pair, "lsh" only MinHash/LSH candidates,
+                       "cached" reuses the per-name similarity cache (cotitle_cache.py)
+        exclude_query_name, max_authors: COAUTHOR hub handling (see add_coauthor_edge)
+        coauthor_payload (str): "full", "ids" or "none" (see add_coauthor_edge)
     """
 
     imp = Neo4jImportData(URI, USER, PASSWORD, DB, PATH)
 
     imp.delete_all_nodes()
+    imp.create_indexes()
 
     # Add all publications
     imp.publication_as_nodes()
+    if author_nodes:
+        imp.add_author_nodes()
 
     # Add covenue, coauthor, cotitle
     imp.add_covenue_edge()
-    imp.add_coauthor_edge()
-
-    pairs = imp.cotitle_pairs_tfidf()
+    imp.add_coauthor_edge(exclude_query_name, max_authors, payload=coauthor_payload)
+
+    if cotitle == "lsh":
+        pairs = imp.cotitle_pairs_lsh()
+    elif cotitle == "cached":
+        pairs = imp.cotitle_pairs_cached()
+    else:
+        pairs = imp.cotitle_pairs_tfidf()
     imp.add_cotitle_edge_from_pairs(pairs)
 
     # Metrics
     imp.node_count()
     imp.edge_count()
+    imp.close()
 
 
 if __name__ == "__main__":
 
-    URI = "neo4j://127.0.0.1:7687"
-    USER = "neo4j"
-    PASSWORD = "and123$$"
-    DB = "neo4j"
+    conn = get_connection()   # NEO4J_* environment / neo4j_config.json (see neo4j_connection.py)
     PATH = "/Users/gracewang/Documents/UROP_Summer_2025/neo4j_and/cache/David Nathan_data.json"
 
-    main(URI, USER, PASSWORD, DB, PATH)
\ No newline at end of file
+    main(conn.uri, *conn.auth, conn.database, PATH)
\ No newline at end of file
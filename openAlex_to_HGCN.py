@@ -1,130 +1,211 @@
 import os
 import json
+import gzip
 import argparse
 import xml.etree.ElementTree as ET
-from nameparser import HumanName
-import requests
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
 import sys
+import time
+import contextlib
 
-print("Python version:", sys.executable)
+import cache_format
+import works_store
+
+# requests, nameparser, scipy and corpus (numpy / scipy) are imported by the functions that
+# use them, so the HGCN file builders and the CLI start without the network and parsing stack
 
 def ensure_directory(path):
     """Ensure that a directory exists."""
     os.makedirs(path, exist_ok=True)
 
-def fetch_author_data(author_name, max_results=200):
+def _query_name_parts(author_name):
     """
-    Fetch author data from OpenAlex API
-    Args:
-        author_name: Name of the author to disambiguate
-        max_results: Maximum number of results to return
-    
-    Returns:
-        dict with author IDs as keys and author data as values
+    Normalize a query name into its (first, last) matching key.
+
+    The query's first name part must match the candidate's first name and the
+    query's last name part must match the candidate's last name. This handles
+    cases where query is "First Last" and candidate is "First Middle Last".
+    A one-word query only sets `first`, so a query like "Terry" matches on the
+    candidate's first name alone.
     """
-    print(f"Fetching author data for {author_name}...")
+    target_name_parts = author_name.lower().split()
+
+    query_first = ""
+    query_last = ""  # Default to empty string
+
+    if len(target_name_parts) > 0:
+        query_first = target_name_parts[0]
+    # Use the last part of the query as the last name component
+    if len(target_name_parts) > 1:
+        query_last = target_name_parts[-1]
+
+    return query_first, query_last
+
+
+@lru_cache(maxsize=65536)
+def _parse_candidate_name(display_name):
+    """
+    Parse a candidate display name once and memoize the result (bounded, so long batches do not grow it).
+
+    Returns (first, middle, last, first_normalized, last_normalized).
+    """
+    from nameparser import HumanName
+
+    name = HumanName(display_name)
+    return name.first, name.middle, name.last, name.first.lower(), name.last.lower()
+
+
+def _name_matches(query_first, query_last, candidate_first, candidate_last):
+    """Stricter first/last name matching between a query and a candidate (both lowercased)."""
+    if query_first and query_last:  # Query like "Terry Fry"
+        return candidate_first == query_first and candidate_last == query_last
+    if query_first:  # Query like "Terry" (and query_last is empty)
+        return candidate_first == query_first
+    if query_last:  # Query like "Fry" (and query_first is empty)
+        return candidate_last == query_last
+    return False
+
+
+def _author_entry(author):
+    """Extract the fields we keep for a matched OpenAlex author record."""
+    first, middle, last, _, _ = _parse_candidate_name(author.get("display_name", "") or "")
+    author_id = author["id"].replace("https://openalex.org/", "")
+    return {
+        "id": author_id,
+        "name": author.get("display_name", ""),
+        "name_first": first,
+        "name_middle": middle,
+        "name_last": last,
+        "works_count": author.get("works_count", 0),
+        "works": []
+    }
+
+
+def _fetch_author_candidates(author_name, max_results=200):
+    """
+    Fetch raw candidate author records for a search string from OpenAlex
+
+    Follows the cursor until results run out or `max_results` candidates match
+    the query itself (the stopping rule of fetch_author_data).
+    Returns a list of raw OpenAlex author records, unfiltered.
+    """
+    import requests
+
+    query_first, query_last = _query_name_parts(author_name)
     cursor = "*"
-    authors_data = {}
+    candidates = []
     result_count = 0
-    
-    while True and result_count < max_results:
+
+    while cursor and result_count < max_results:
         query_url = f'https://api.openalex.org/authors?search={author_name}&per_page=100&cursor={cursor}'
-        
+
         try:
             response = requests.get(query_url)
             if response.status_code != 200:
                 print(f"Error fetching data: {response.status_code}")
                 break
-                
+
             data = response.json()
             authors = data["results"]
-            
+
             if not authors:
                 break
-                
-            # Process authors
+
+            candidates.extend(authors)
             for author in authors:
-                name = HumanName(author.get("display_name", ""))
-                
-                # Skip if the name doesn't match
-                first_name = name.first.lower()
-                last_name = name.last.lower()
-                target_name_parts = author_name.lower().split()
-                
-                # Stricter name matching
-                # The query's first name part must match the candidate's first name
-                # The query's last name part must match the candidate's last name
-                # This handles cases where query is "First Last" and candidate is "First Middle Last"
-                
-                query_first = ""
-                query_last = "" # Default to empty string
-
-                if len(target_name_parts) > 0:
-                    query_first = target_name_parts[0]
-                # Use the last part of the query as the last name component
-                if len(target_name_parts) > 1: 
-                    query_last = target_name_parts[-1]
-                elif len(target_name_parts) == 1: # If only one name part in query, assume it could be first or last
-                    # If we only have one query part, we can't enforce first AND last match
-                    # For now, let's stick to the logic that if query_last is not set, it's not checked strictly
-                    # This means a query like "Fry" would rely on query_last matching candidate_last_normalized
-                    pass
-
-
-                candidate_first_normalized = name.first.lower()
-                candidate_last_normalized = name.last.lower()
-                
-                match = False
-                if query_first and query_last: # Query like "Terry Fry"
-                    if candidate_first_normalized == query_first and candidate_last_normalized == query_last:
-                        match = True
-                elif query_first: # Query like "Terry" (and query_last is empty)
-                    if candidate_first_normalized == query_first:
-                        # This could be "Terry Smith" for a query "Terry".
-                        # To be stricter for single name queries, one might want to check if candidate_last_normalized is empty or also matches.
-                        # For now, this allows matching on first name if query is just one word.
-                        match = True 
-                elif query_last: # Query like "Fry" (and query_first is empty, implies single word query "Fry")
-                    if candidate_last_normalized == query_last:
-                        match = True
-                
-                if not match:
-                    continue
-                
-                # Extract needed data
-                author_id = author["id"].replace("https://openalex.org/", "")
-                print(author_id)
-                authors_data[author_id] = {
-                    "id": author_id,
-                    "name": author.get("display_name", ""),
-                    "name_first": name.first,
-                    "name_middle": name.middle,
-                    "name_last": name.last,
-                    "works_count": author.get("works_count", 0),
-                    "works": []
-                }
-                
-                result_count += 1
-                if result_count >= max_results:
-                    break
-            
+                _, _, _, candidate_first, candidate_last = _parse_candidate_name(author.get("display_name", "") or "")
+                if _name_matches(query_first, query_last, candidate_first, candidate_last):
+                    result_count += 1
+
             # Update cursor for next page
             cursor = data["meta"].get("next_cursor")
-            if not cursor:
-                break
-                
+
         except Exception as e:
             print(f"Error fetching author data: {e}")
             break
+
+    return candidates
+
+
+def _match_candidates(author_name, candidates, max_results=200, verbose=False):
+    """
+    Keep the candidates whose parsed name matches the query, in OpenAlex result order
+
+    Returns dict with author IDs as keys and author data as values (at most `max_results`)
+    """
+    query_first, query_last = _query_name_parts(author_name)
+    authors_data = {}
+    for author in candidates:
+        _, _, _, candidate_first, candidate_last = _parse_candidate_name(author.get("display_name", "") or "")
+
+        # Skip if the name doesn't match
+        if not _name_matches(query_first, query_last, candidate_first, candidate_last):
+            continue
+
+        # Extract needed data
+        entry = _author_entry(author)
+        if verbose:
+            print(entry["id"])
+        authors_data[entry["id"]] = entry
+        if len(authors_data) >= max_results:
+            break
+    return authors_data
+
+
+def fetch_author_data(author_name, max_results=200):
+    """
+    Fetch author data from OpenAlex API
+    Args:
+        author_name: Name of the author to disambiguate
+        max_results: Maximum number of results to return
     
+    Returns:
+        dict with author IDs as keys and author data as values
+    """
+    print(f"Fetching author data for {author_name}...")
+    candidates = _fetch_author_candidates(author_name, max_results)
+    authors_data = _match_candidates(author_name, candidates, max_results, verbose=True)
     print(f"Found {len(authors_data)} authors matching {author_name}")
     return authors_data
 
+def fetch_author_data_batch(author_names, max_results=200, max_workers=8):
+    """
+    Resolve many query names against OpenAlex concurrently
+
+    Candidate pages are cursor-chained per name, so the names are fetched in
+    parallel. Each name keeps only its own candidates, in its own OpenAlex
+    result order, so its author data (and the labels neo4j_data.fetch_data
+    assigns from it) is the same as fetch_author_data(name) would return.
+    Candidate display names are parsed once across all names (memoized).
+
+    Args:
+        author_names: Iterable of names to disambiguate
+        max_results: Maximum number of matched authors kept per name
+        max_workers: Number of concurrent OpenAlex requests
+
+    Returns:
+        dict {author_name: author_data}, where each author_data has the same
+        shape as the return value of fetch_author_data
+    """
+    author_names = list(dict.fromkeys(author_names))
+    print(f"Fetching author data for {len(author_names)} names...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        candidate_lists = list(pool.map(lambda n: _fetch_author_candidates(n, max_results), author_names))
+
+    results = {}
+    for author_name, candidates in zip(author_names, candidate_lists):
+        results[author_name] = _match_candidates(author_name, candidates, max_results)
+        print(f"Found {len(results[author_name])} authors matching {author_name}")
+    return results
+
 def fetch_works_for_author(author_id, max_works=100):
     """
     Fetch works (publications) for a specific author ID from OpenAlex API
     """
+    import requests
+
     print(f"Fetching works for author ID {author_id}...")
     cursor = "*"
     works = []
@@ -193,9 +274,51 @@ def fetch_works_for_author(author_id, max_works=100):
     print(f"Found {len(works)} works for author ID {author_id}")
     return works
 
-def create_xml_file(author_name, author_data, works_data, author_id_to_label=None):
+# Single-pass XML escaping: special characters become entities and control
+# characters that would break XML are dropped, all in one str.translate
+_XML_ESCAPES = {
+    ord("&"): "&amp;",
+    ord("<"): "&lt;",
+    ord(">"): "&gt;",
+    ord("\""): "&quot;",
+    ord("'"): "&apos;",
+}
+_XML_ESCAPES.update({c: None for c in range(32) if chr(c) not in "\t\n\r"})
+
+def escape_xml(text):
+    """Escape XML special characters and remove control characters"""
+    if text is None:
+        return ""
+    return str(text).translate(_XML_ESCAPES)
+
+def _publication_xml(work_id, work, label):
+    """One <publication> element, formatted to match the existing HGCN files"""
+    # Ensure title is never None or empty
+    title_text = work["title"] if work["title"] else "Untitled publication"
+    # Join authors
+    authors_text = ", ".join([a["name"] for a in work["authors"]])
+    venue_text = work["venue"] if work["venue"] else "Unknown"
+
+    # Label: which author ID this publication belongs to. Organization uses
+    # OpenAlex author institution if available, otherwise "null"
+    return (
+        '\t<publication>\n'
+        f'\t\t<title>{escape_xml(title_text)}</title>\n'
+        f'\t\t<year>{escape_xml(work["year"])}</year>\n'
+        f'\t\t<authors>{escape_xml(authors_text)}</authors>\n'
+        f'\t\t<jconf>{escape_xml(venue_text)}</jconf>\n'
+        f'\t\t<id>{escape_xml(work_id)}</id>\n'
+        f'\t\t<label>{escape_xml(label)}</label>\n'
+        f'\t\t<organization>{escape_xml("null")}</organization>\n'
+        '\t</publication>\n'
+    )
+
+def create_xml_file(author_name, author_data, works_data, author_id_to_label=None, buffer_size=1 << 20):
     """
     Create XML file in the format expected by HGCN name disambiguation
+
+    Publications are streamed to a buffered file as they are generated, so the
+    document is never assembled in memory.
     """
     print(f"Creating XML file for {author_name}...")
     
@@ -205,164 +328,235 @@ def create_xml_file(author_name, author_data, works_data, author_id_to_label=Non
         for i, author_id in enumerate(author_data.keys()):
             author_id_to_label[author_id] = str(i)
     
-    # Helper function to escape XML special characters
-    def escape_xml(text):
-        if text is None:
-            return ""
-        # Replace XML special characters
-        text = str(text)
-        text = text.replace("&", "&amp;")
-        text = text.replace("<", "&lt;")
-        text = text.replace(">", "&gt;")
-        text = text.replace("\"", "&quot;")
-        text = text.replace("'", "&apos;")
-        # Remove any control characters that would break XML
-        text = ''.join(char for char in text if ord(char) >= 32 or char in '\t\n\r')
-        return text
-    
-    # Format the XML with proper indentation to match existing files
-    # Create the XML content as a string with manual formatting
-    xml_str = '<?xml version="1.0" encoding="utf-8"?>\n'
-    xml_str += '<person>\n'
-    
-    # Use the first author ID as the personID
-    first_author_id = next(iter(author_data.keys()))
-    xml_str += f'\t<personID>{escape_xml(first_author_id)}</personID>\n'
-    
-    xml_str += f'\t<FullName>{escape_xml(author_name)}</FullName>\n'
-    xml_str += f'\t<FirstName>{escape_xml(author_name.split()[0])}</FirstName>\n'
-    xml_str += f'\t<LastName>{escape_xml(author_name.split()[-1])}</LastName>\n'
+    # Create directory if it doesn't exist
+    ensure_directory("raw-data-temp")
     
     # Track unique works to avoid duplicates
     unique_works = {}
     
-    # Add publications
-    for author_id, author in author_data.items():
-        for work_id in author["works"]:
-            if work_id in works_data and work_id not in unique_works:
-                work = works_data[work_id]
-                unique_works[work_id] = work
-                
-                # Ensure title is never None or empty
-                title_text = work["title"] if work["title"] else "Untitled publication"
-                
-                # Add publication element
-                xml_str += '\t<publication>\n'
-                xml_str += f'\t\t<title>{escape_xml(title_text)}</title>\n'
-                xml_str += f'\t\t<year>{escape_xml(work["year"])}</year>\n'
-                
-                # Join authors
-                authors_text = ", ".join([a["name"] for a in work["authors"]])
-                xml_str += f'\t\t<authors>{escape_xml(authors_text)}</authors>\n'
-                
-                # Add venue
-                venue_text = work["venue"] if work["venue"] else "Unknown"
-                xml_str += f'\t\t<jconf>{escape_xml(venue_text)}</jconf>\n'
-                
-                # Add ID
-                xml_str += f'\t\t<id>{escape_xml(work_id)}</id>\n'
-                
-                # Add label (which author ID this publication belongs to)
-                # We'll map each unique author ID to a unique integer for the label
-                xml_str += f'\t\t<label>{escape_xml(author_id_to_label.get(author_id, "0"))}</label>\n'
-                
-                # Add organization (use OpenAlex author institution if available, otherwise "null")
-                xml_str += f'\t\t<organization>{escape_xml("null")}</organization>\n'
-                
-                xml_str += '\t</publication>\n'
-    
-    xml_str += '</person>'
-    
-    # Create directory if it doesn't exist
-    ensure_directory("raw-data-temp")
-    
-    # Write XML file
     file_path = os.path.join("raw-data-temp", f"{author_name}.xml")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(xml_str)
+    with open(file_path, 'w', encoding='utf-8', buffering=buffer_size) as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<person>\n')
+        
+        # Use the first author ID as the personID
+        first_author_id = next(iter(author_data.keys()))
+        f.write(f'\t<personID>{escape_xml(first_author_id)}</personID>\n')
+        
+        f.write(f'\t<FullName>{escape_xml(author_name)}</FullName>\n')
+        f.write(f'\t<FirstName>{escape_xml(author_name.split()[0])}</FirstName>\n')
+        f.write(f'\t<LastName>{escape_xml(author_name.split()[-1])}</LastName>\n')
+        
+        # Add publications
+        for author_id, author in author_data.items():
+            label = author_id_to_label.get(author_id, "0")
+            for work_id in author["works"]:
+                if work_id in works_data and work_id not in unique_works:
+                    work = works_data[work_id]
+                    unique_works[work_id] = work
+                    f.write(_publication_xml(work_id, work, label))
+        
+        f.write('</person>')
     
     print(f"XML file created: {file_path}")
     return unique_works
 
-def create_author_pair_file(author_name, works_data):
+def _create_xml_file_from_cache(author_name):
+    """Worker for create_xml_files: load one name's cache and write its XML"""
+    author_data, works_data, author_id_to_label = load_data_from_json(author_name)
+    if not author_data or not works_data:
+        print(f"No cached data found for {author_name}")
+        return author_name, None
+    unique_works = create_xml_file(author_name, author_data, works_data, author_id_to_label)
+    return author_name, len(unique_works)
+
+def create_xml_files(author_names, max_workers=None):
+    """
+    Write the HGCN XML for many cached names in parallel (one process per name)
+
+    Returns {author_name: number of publications written, or None if the name has no cache}
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(_create_xml_file_from_cache, author_names))
+
+def _as_corpus(works):
+    """Accept either a works_data dict or a Corpus"""
+    from corpus import Corpus
+
+    return works if isinstance(works, Corpus) else Corpus.from_works_data(works)
+
+def iter_author_pairs(works_data, max_authors=None):
+    """
+    Generate (pub_idx, pub_idx, author_i, author_j) for every pair of authors within a publication
+
+    `works_data` may be a works_data dict or a Corpus; publication indices follow its order.
+    With `max_authors`, hyper-authored publications (more authors than that) are not expanded.
+    """
+    corpus = _as_corpus(works_data)
+    names = corpus.author_names
+    for pub_idx in range(corpus.n_works):
+        start, end = corpus.authorship_ptr[pub_idx], corpus.authorship_ptr[pub_idx + 1]
+        if max_authors is not None and end - start > max_authors:
+            continue
+        pub_names = [names[n] for n in corpus.authorship_name[start:end].tolist()]
+        for i in range(len(pub_names)):
+            for j in range(i+1, len(pub_names)):
+                yield pub_idx, pub_idx, pub_names[i], pub_names[j]
+
+def iter_venue_pairs(works_data):
+    """
+    Generate (idx_i, idx_j, venue, venue) for every pair of publications sharing a venue
+
+    Venues come in first-seen order; `works_data` may be a works_data dict or a Corpus
+    """
+    corpus = _as_corpus(works_data)
+    for group in corpus.venue_groups():
+        venue = corpus.venues[corpus.work_venue[group[0]]]
+        pubs = group.tolist()
+        for i in range(len(pubs)):
+            for j in range(i+1, len(pubs)):
+                yield pubs[i], pubs[j], venue, venue
+
+def _open_pair_output(file_path, compress=False, buffer_size=1 << 20):
+    """Open a pair file for writing: buffered text, or gzip-compressed text when `compress`"""
+    if compress:
+        return gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=6)
+    return open(file_path, 'w', encoding='utf-8', buffering=buffer_size)
+
+def write_pair_file(file_path, pairs, compress=False):
+    """Write (a, b, c, d) tuples as tab-separated lines; returns the number of lines written"""
+    count = 0
+    with _open_pair_output(file_path, compress) as f:
+        for pair in pairs:
+            f.write(f"{pair[0]}\t{pair[1]}\t{pair[2]}\t{pair[3]}\n")
+            count += 1
+    return count
+
+def read_pair_file(file_path):
+    """
+    Stream (int, int, str, str) tuples from an author or venue pair file
+
+    Plain and gzip-compressed files are detected automatically.
+    """
+    with open(file_path, 'rb') as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    with opener(file_path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            a, b, c, d = line.rstrip("\n").split("\t", 3)
+            yield int(a), int(b), c, d
+
+def _pair_file_path(file_path, compress):
+    return file_path + ".gz" if compress else file_path
+
+def create_author_pair_file(author_name, works_data, compress=False, max_authors=None):
     """
     Create author pair file in the format expected by HGCN name disambiguation
+
+    Pairs are generated lazily and streamed to disk; with `compress` the file is
+    gzip-compressed and gets a .gz suffix. Publications with more than `max_authors`
+    authors are skipped and the number of pairs saved is reported.
     """
     print(f"Creating author pair file for {author_name}...")
     
-    # Map from publication ID to index
-    pub_to_idx = {}
-    for i, (pub_id, _) in enumerate(works_data.items()):
-        pub_to_idx[pub_id] = i
-    
-    # Track co-author relationships
-    co_author_pairs = []
-    
-    # For each publication
-    for pub_id, pub in works_data.items():
-        pub_idx = pub_to_idx[pub_id]
-        
-        # For each author in the publication
-        for i in range(len(pub["authors"])):
-            for j in range(i+1, len(pub["authors"])):
-                author_i = pub["authors"][i]
-                author_j = pub["authors"][j]
-                
-                co_author_pairs.append((pub_idx, pub_idx, author_i["name"], author_j["name"]))
-    
     # Create directory if it doesn't exist
     ensure_directory(os.path.join("experimental-results", "authors"))
     
     # Write author pair file
-    file_path = os.path.join("experimental-results", "authors", f"{author_name}_authorlist.txt")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        for pair in co_author_pairs:
-            f.write(f"{pair[0]}\t{pair[1]}\t{pair[2]}\t{pair[3]}\n")
+    file_path = _pair_file_path(os.path.join("experimental-results", "authors", f"{author_name}_authorlist.txt"), compress)
+    corpus = _as_corpus(works_data)
+    written = write_pair_file(file_path, iter_author_pairs(corpus, max_authors), compress)
     
     print(f"Author pair file created: {file_path}")
+    if max_authors is not None:
+        volume = corpus.coauthor_volume(max_authors=max_authors)
+        hubs = int((corpus.author_counts() > max_authors).sum())
+        print(f"Skipped {hubs} publications with more than {max_authors} authors: "
+              f"{written} of {volume['author_pairs_before']} author pairs written")
 
-def create_venue_pair_file(author_name, works_data):
+def create_venue_pair_file(author_name, works_data, compress=False):
     """
     Create venue pair file in the format expected by HGCN name disambiguation
+
+    Pairs are generated lazily and streamed to disk; with `compress` the file is
+    gzip-compressed and gets a .gz suffix
     """
     print(f"Creating venue pair file for {author_name}...")
     
-    # Map from publication ID to index
-    pub_to_idx = {}
-    for i, (pub_id, _) in enumerate(works_data.items()):
-        pub_to_idx[pub_id] = i
-    
-    # Group publications by venue
-    venues = defaultdict(list)
-    for pub_id, pub in works_data.items():
-        venue = pub["venue"]
-        venues[venue].append(pub_id)
-    
-    # Create venue pairs
-    venue_pairs = []
-    for venue, pubs in venues.items():
-        for i in range(len(pubs)):
-            for j in range(i+1, len(pubs)):
-                pub_i = pubs[i]
-                pub_j = pubs[j]
-                idx_i = pub_to_idx[pub_i]
-                idx_j = pub_to_idx[pub_j]
-                venue_pairs.append((idx_i, idx_j, venue, venue))
-    
     # Create directory if it doesn't exist
     ensure_directory("experimental-results")
     
     # Write venue pair file
-    file_path = os.path.join("experimental-results", f"{author_name}_jconfpair.txt")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        for pair in venue_pairs:
-            f.write(f"{pair[0]}\t{pair[1]}\t{pair[2]}\t{pair[3]}\n")
+    file_path = _pair_file_path(os.path.join("experimental-results", f"{author_name}_jconfpair.txt"), compress)
+    write_pair_file(file_path, iter_venue_pairs(works_data), compress)
     
     print(f"Venue pair file created: {file_path}")
 
-def save_data_to_json(author_name, author_data, works_data, author_id_to_label):
-    """Save the fetched data to JSON for future use"""
-    print(f"Saving data for {author_name} to JSON...")
+def _sparse_relation_paths(author_name):
+    directory = os.path.join("experimental-results", "sparse")
+    paths = {
+        name: os.path.join(directory, f"{author_name}_{name}.npz")
+        for name in ("pub_author", "pub_venue", "pub_pub_author", "pub_pub_venue")
+    }
+    paths["index"] = os.path.join(directory, f"{author_name}_index.json")
+    return paths
+
+def create_sparse_relation_files(author_name, works_data):
+    """
+    Save the HGCN relations of a name as compressed sparse matrices (.npz)
+
+    - pub_author     : publication x author incidence
+    - pub_venue      : publication x venue incidence
+    - pub_pub_author : publication x publication, number of shared authors (zero diagonal)
+    - pub_pub_venue  : publication x publication, 1 where the venue is shared (zero diagonal)
+    plus <name>_index.json mapping matrix rows to work ids (and columns to author ids / venues).
+    Rows use the same publication indices as the text pair files.
+    """
+    import scipy.sparse as sp
+
+    print(f"Creating sparse relation files for {author_name}...")
+
+    corpus = _as_corpus(works_data)
+    paths = _sparse_relation_paths(author_name)
+    ensure_directory(os.path.dirname(paths["index"]))
+
+    pub_author = corpus.author_incidence()
+    pub_venue = corpus.venue_incidence()
+    relations = {
+        "pub_author": pub_author,
+        "pub_venue": pub_venue,
+        "pub_pub_author": pub_author @ pub_author.T,
+        "pub_pub_venue": pub_venue @ pub_venue.T,
+    }
+    for name, matrix in relations.items():
+        matrix = matrix.tocsr()
+        if name.startswith("pub_pub"):
+            matrix.setdiag(0)
+            matrix.eliminate_zeros()
+        sp.save_npz(paths[name], matrix, compressed=True)
+
+    index = {
+        "works": corpus.work_ids,
+        "authors": corpus.author_ids,
+        "venues": corpus.venues,
+    }
+    with open(paths["index"], 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    print(f"Sparse relation files created in: {os.path.dirname(paths['index'])}")
+
+def load_sparse_relations(author_name):
+    """Load the matrices written by create_sparse_relation_files as ({name: csr_matrix}, index)"""
+    import scipy.sparse as sp
+
+    paths = _sparse_relation_paths(author_name)
+    with open(paths.pop("index"), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return {name: sp.load_npz(path) for name, path in paths.items()}, index
+
+def save_data_to_json(author_name, author_data, works_data, author_id_to_label, fmt=cache_format.FORMAT_JSON):
+    """Save the fetched data to the cache (JSON by default, or the columnar format) for future use"""
+    print(f"Saving data for {author_name} to {fmt}...")
     
     data = {
         "author_name": author_name,
@@ -374,21 +568,19 @@ def save_data_to_json(author_name, author_data, works_data, author_id_to_label):
     # Create directory if it doesn't exist
     ensure_directory("cache")
     
-    # Write JSON file
-    file_path = os.path.join("cache", f"{author_name}_data.json")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    # Write cache file
+    file_path = cache_format.cache_path(author_name, fmt)
+    cache_format.write_cache(file_path, data, fmt)
     
     print(f"Data saved to: {file_path}")
 
 def load_data_from_json(author_name):
-    """Load data from JSON if available"""
-    file_path = os.path.join("cache", f"{author_name}_data.json")
+    """Load data from the cache if available (format is detected automatically)"""
+    file_path = cache_format.cache_path(author_name)
     
-    if os.path.exists(file_path):
+    if file_path is not None:
         print(f"Loading cached data for {author_name}...")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = cache_format.read_cache(file_path)
         
         return data["author_data"], data["works_data"], data["author_id_to_label"]
     
@@ -398,45 +590,57 @@ def fetch_works_only(author_id, author_name, max_works=100):
     """Function to fetch works only for a specific author ID"""
     works = fetch_works_for_author(author_id, max_works)
     
-    # Save to cache
-    cache_dir = os.path.join("cache", "works")
-    ensure_directory(cache_dir)
-    
-    file_path = os.path.join(cache_dir, f"{author_name}_{author_id}_works.json")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(works, f, indent=2)
+    main_cache = cache_format.cache_path(author_name)
+    if main_cache is not None and cache_format.detect_format(main_cache) == cache_format.FORMAT_STORE:
+        # Migrated name: save to the shared works store and record the ids in its manifest
+        file_path = works_store.add_author_works(author_name, author_id, works)
+    else:
+        # Otherwise keep the name's cache as it is (works_store.py --migrate folds these files in)
+        cache_dir = os.path.join("cache", "works")
+        ensure_directory(cache_dir)
+        file_path = os.path.join(cache_dir, f"{author_name}_{author_id}_works.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(works, f, indent=2)
     
     print(f"Works for author {author_id} saved to: {file_path}")
     return works
 
-def create_files_from_cache(author_name):
-    """Create XML and pair files from cached data"""
+def _legacy_works(author_name, cache_dir=os.path.join("cache", "works")):
+    """Yield (author_id, works) from a name's cache/works/<name>_<author_id>_works.json files"""
+    if not os.path.exists(cache_dir):
+        return
+    for file in sorted(os.listdir(cache_dir)):
+        if file.startswith(f"{author_name}_") and file.endswith("_works.json"):
+            author_id = file[len(author_name) + 1:-len("_works.json")]
+            with open(os.path.join(cache_dir, file), 'r', encoding='utf-8') as f:
+                yield author_id, json.load(f)
+
+def create_files_from_cache(author_name, compress_pairs=False, sparse=False, max_pair_authors=None):
+    """Create XML and pair files from cached data (see create_author_pair_file for max_pair_authors)"""
     # Load author data
     author_data = {}
     works_data = {}
     author_id_to_label = {}
     
-    # Check if we have the main cache file
-    main_cache = os.path.join("cache", f"{author_name}_data.json")
-    if os.path.exists(main_cache):
-        with open(main_cache, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    # Check if we have a cache file (JSON, columnar, or works-store manifest)
+    main_cache = cache_format.cache_path(author_name)
+    if main_cache is not None:
+        data = cache_format.read_cache(main_cache)
         
         author_data = data["author_data"]
         works_data = data.get("works_data", {})
         author_id_to_label = data["author_id_to_label"]
     
-    # Check for individual works cache files
-    works_cache_dir = os.path.join("cache", "works")
-    if os.path.exists(works_cache_dir):
-        for file in os.listdir(works_cache_dir):
-            if file.startswith(f"{author_name}_") and file.endswith("_works.json"):
-                with open(os.path.join(works_cache_dir, file), 'r', encoding='utf-8') as f:
-                    author_works = json.load(f)
-                
-                # Add works to the works_data dictionary
-                for work in author_works:
-                    works_data[work["id"]] = work
+    # Individual works files from fetch_works_only (a store manifest already holds its name's works)
+    if main_cache is None or cache_format.detect_format(main_cache) != cache_format.FORMAT_STORE:
+        for author_id, author_works in _legacy_works(author_name):
+            for work in author_works:
+                works_data[work["id"]] = work
+            # As works_store.migrate does: the candidate's work list gains the new ids
+            author = author_data.get(author_id)
+            if author is not None:
+                known = set(author["works"])
+                author["works"] = author["works"] + [w["id"] for w in author_works if w["id"] not in known]
     
     if not author_data or not works_data:
         print(f"No cached data found for {author_name}")
@@ -444,24 +648,113 @@ def create_files_from_cache(author_name):
     
     # Create files
     unique_works = create_xml_file(author_name, author_data, works_data, author_id_to_label)
-    create_author_pair_file(author_name, unique_works)
-    create_venue_pair_file(author_name, unique_works)
+    create_author_pair_file(author_name, unique_works, compress_pairs, max_pair_authors)
+    create_venue_pair_file(author_name, unique_works, compress_pairs)
+    if sparse:
+        create_sparse_relation_files(author_name, unique_works)
+
+    # Record the options the outputs were built with (checked by _outputs_are_current)
+    with open(_params_path(author_name), 'w', encoding='utf-8') as f:
+        json.dump(_output_params(max_pair_authors), f)
     
     return True
 
-if __name__ == "__main__":
+def _params_path(author_name):
+    """Stamp with the options a name's HGCN outputs were built with"""
+    return os.path.join("experimental-results", f"{author_name}_hgcn_params.json")
+
+def _output_params(max_pair_authors=None):
+    """Options that change the outputs' content (compress_pairs / sparse change their paths instead)"""
+    return {"max_pair_authors": max_pair_authors}
+
+def _output_paths(author_name, compress_pairs=False, sparse=False):
+    """Files create_files_from_cache writes for a name"""
+    paths = [
+        os.path.join("raw-data-temp", f"{author_name}.xml"),
+        _pair_file_path(os.path.join("experimental-results", "authors", f"{author_name}_authorlist.txt"), compress_pairs),
+        _pair_file_path(os.path.join("experimental-results", f"{author_name}_jconfpair.txt"), compress_pairs),
+    ]
+    if sparse:
+        paths.extend(_sparse_relation_paths(author_name).values())
+    return paths
+
+def _outputs_are_current(author_name, compress_pairs=False, sparse=False, max_pair_authors=None):
+    """
+    True when every output exists, is newer than the name's cache file, and was built with
+    the same options (params stamp written by create_files_from_cache)
+    """
+    cache_file = cache_format.cache_path(author_name)
+    if cache_file is None or not os.path.exists(_params_path(author_name)):
+        return False
+    with open(_params_path(author_name), 'r', encoding='utf-8') as f:
+        if json.load(f) != _output_params(max_pair_authors):
+            return False
+    cache_mtime = os.path.getmtime(cache_file)
+    return all(os.path.exists(p) and os.path.getmtime(p) >= cache_mtime
+               for p in _output_paths(author_name, compress_pairs, sparse))
+
+def _create_files_task(task):
+    """Worker for create_files_for_all_cached; returns (name, status, seconds, output bytes)"""
+    author_name, compress_pairs, sparse, max_pair_authors = task
+    start = time.perf_counter()
+    # Keep per-name progress lines out of the batch summary
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        success = create_files_from_cache(author_name, compress_pairs, sparse, max_pair_authors)
+    seconds = time.perf_counter() - start
+    size = sum(os.path.getsize(p) for p in _output_paths(author_name, compress_pairs, sparse) if os.path.exists(p))
+    return author_name, "created" if success else "no data", seconds, size
+
+def create_files_for_all_cached(compress_pairs=False, sparse=False, max_workers=None, force=False,
+                                max_pair_authors=None):
+    """
+    Create XML and pair files for every name in cache/ using a process pool
+
+    Names whose outputs are all newer than their cache and were built with the same
+    max_pair_authors are skipped unless `force`.
+    Prints a per-name summary of status, time, and output size; returns the rows.
+    """
+    names = cache_format.list_cached_names()
+    todo = [n for n in names if force or not _outputs_are_current(n, compress_pairs, sparse, max_pair_authors)]
+    rows = [(n, "up to date", 0.0, sum(os.path.getsize(p) for p in _output_paths(n, compress_pairs, sparse)))
+            for n in names if n not in todo]
+
+    print(f"Found {len(names)} cached names, {len(todo)} to process")
+    start = time.perf_counter()
+    if todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows.extend(pool.map(_create_files_task, [(n, compress_pairs, sparse, max_pair_authors) for n in todo]))
+    elapsed = time.perf_counter() - start
+
+    width = max([len(r[0]) for r in rows] + [4])
+    print(f"\n{'Name':<{width}}  {'Status':<10}  {'Time (s)':>8}  {'Size (MB)':>9}")
+    for name, status, seconds, size in sorted(rows):
+        print(f"{name:<{width}}  {status:<10}  {seconds:>8.2f}  {size / 1e6:>9.2f}")
+    print(f"Processed {len(todo)} names in {elapsed:.2f}s "
+          f"(total output {sum(r[3] for r in rows) / 1e6:.2f} MB)")
+    return rows
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Extract OpenAlex data for HGCN name disambiguation')
     parser.add_argument('--name', type=str, help='Name to disambiguate (e.g., "John Smith")')
     parser.add_argument('--max_authors', type=int, default=30, help='Maximum number of authors to fetch')
     parser.add_argument('--max_works', type=int, default=100, help='Maximum number of works per author')
     parser.add_argument('--use_cache', action='store_true', help='Use cached data if available')
+    parser.add_argument('--cache_format', choices=list(cache_format.EXTENSIONS),
+                        default=cache_format.FORMAT_JSON, help='Format used when writing the cache')
     
     # New arguments for batch processing
     parser.add_argument('--fetch_works_only', action='store_true', help='Only fetch works for a specific author ID')
     parser.add_argument('--author_id', type=str, help='Author ID to fetch works for (use with --fetch_works_only)')
     parser.add_argument('--create_files_only', action='store_true', help='Create XML and pair files from cached data')
+    parser.add_argument('--max_pair_authors', type=int, default=None,
+                        help='Skip author-pair expansion for publications with more authors than this')
+    parser.add_argument('--compress_pairs', action='store_true', help='Write gzip-compressed author/venue pair files (.txt.gz)')
+    parser.add_argument('--sparse', action='store_true', help='Also write sparse .npz relation matrices with a row index')
+    parser.add_argument('--all_cached', action='store_true', help='Create files for every name in cache/ in parallel')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --all_cached (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='With --all_cached, rebuild outputs even if they are newer than the cache')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Check for required arguments
     if args.fetch_works_only:
@@ -471,11 +764,16 @@ if __name__ == "__main__":
         fetch_works_only(args.author_id, args.name, args.max_works)
         sys.exit(0)
     
+    if args.all_cached:
+        create_files_for_all_cached(args.compress_pairs, args.sparse, args.workers, args.force,
+                                    args.max_pair_authors)
+        sys.exit(0)
+    
     if args.create_files_only:
         if not args.name:
             print("Error: --name is required with --create_files_only")
             sys.exit(1)
-        success = create_files_from_cache(args.name)
+        success = create_files_from_cache(args.name, args.compress_pairs, args.sparse, args.max_pair_authors)
         sys.exit(0 if success else 1)
     
     if not args.name:
@@ -488,8 +786,10 @@ if __name__ == "__main__":
         if author_data and works_data and author_id_to_label:
             # Create files from cached data
             unique_works = create_xml_file(args.name, author_data, works_data, author_id_to_label)
-            create_author_pair_file(args.name, unique_works)
-            create_venue_pair_file(args.name, unique_works)
+            create_author_pair_file(args.name, unique_works, args.compress_pairs, args.max_pair_authors)
+            create_venue_pair_file(args.name, unique_works, args.compress_pairs)
+            if args.sparse:
+                create_sparse_relation_files(args.name, unique_works)
             print(f"Data extraction and formatting complete for {args.name} (using cached data)")
             print(f"Found {len(author_data)} authors and {len(unique_works)} unique publications")
             print(f"Run name_disambiguation.py to perform disambiguation")
@@ -514,17 +814,25 @@ if __name__ == "__main__":
             works_data[work["id"]] = work
     
     # Save data to JSON for future use
-    save_data_to_json(args.name, author_data, works_data, author_id_to_label)
+    save_data_to_json(args.name, author_data, works_data, author_id_to_label, args.cache_format)
     
     # 3. Create XML file
     unique_works = create_xml_file(args.name, author_data, works_data, author_id_to_label)
     
     # 4. Create author pair file
-    create_author_pair_file(args.name, unique_works)
+    create_author_pair_file(args.name, unique_works, args.compress_pairs, args.max_pair_authors)
     
     # 5. Create venue pair file
-    create_venue_pair_file(args.name, unique_works)
+    create_venue_pair_file(args.name, unique_works, args.compress_pairs)
+    
+    # 6. Optionally, sparse relation matrices
+    if args.sparse:
+        create_sparse_relation_files(args.name, unique_works)
     
     print(f"Data extraction and formatting complete for {args.name}")
     print(f"Found {len(author_data)} authors and {len(unique_works)} unique publications")
-    print(f"Run name_disambiguation.py to perform disambiguation") 
\ No newline at end of file
+    print(f"Run name_disambiguation.py to perform disambiguation") 
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Over-segmentation analysis over all community pairs
+
+Purpose
+- Generalize over_segmentation.cql (hand-picked communities 0 and 9) to every community pair
+- In one vectorized pass, build sparse community x community matrices of edge counts, weight
+  sums and means per relationship type, restricted to works of a target author
+- Rank the community pairs most likely to be the same person
+
+How it works
+- Edges are loaded once per relationship (directed match, so each edge is counted once;
+  the .cql's undirected patterns count every edge twice)
+- Weight per edge is coalesce(r.weight, r.similarity, 0.0), as in over_segmentation.cql
+- A pair (c, d) is scored by its weighted inter-community density between the author's works:
+      score(c, d) = sum of edge weights between target works in c and d / (n_c * n_d)
+  where n_c is the number of target works in community c
+
+Usage
+- `python over_segmentation.py --name "David M. Nathan" --top 20`
+- Requires AUTHOR nodes (neo4j_import.py, add_author_nodes) and a `community` property on PUBLICATION
+"""
+
+import argparse
+
+import numpy as np
+
+from neo4j_connection import add_connection_arguments, get_connection
+
+REL_TYPES = ("COAUTHOR", "COVENUE", "COTITLE")
+
+
+def load_typed_edges(uri=None, user=None, password=None, db=None, author_id=None, name=None):
+    """
+    Load the publication graph with relationship types kept apart
+
+    Returns dict:
+      - ids: list of publication ids (node index -> id)
+      - community: int array of p.community per node (-1 if missing)
+      - target: bool array, True for works of the target author (all True if no author given)
+      - src, dst: int arrays of node indices per edge
+      - rel: int array of REL_TYPES index per edge
+      - weight: float array per edge
+
+    Connection settings left as None come from neo4j_connection (environment / config file)
+    """
+    with get_connection(uri, user, password, db).read_session() as session:
+        ids, community = [], []
+        for rec in session.run("MATCH (p:PUBLICATION) RETURN p.id AS id, p.community AS community"):
+            ids.append(rec["id"])
+            community.append(-1 if rec["community"] is None else int(rec["community"]))
+        index_of = {pid: i for i, pid in enumerate(ids)}
+
+        target = np.ones(len(ids), dtype=bool)
+        if author_id is not None or name is not None:
+            target[:] = False
+            q = ("MATCH (a:AUTHOR {id: $author_id})" if author_id is not None
+                 else "MATCH (:AUTHOR_NAME {name: $name})-[:SPELLING_OF]->(a:AUTHOR)")
+            for rec in session.run(q + " MATCH (a)-[:AUTHORED]->(p:PUBLICATION) RETURN DISTINCT p.id AS id",
+                                   author_id=author_id, name=name):
+                target[index_of[rec["id"]]] = True
+
+        src, dst, rel, weight = [], [], [], []
+        rel_index = {t: i for i, t in enumerate(REL_TYPES)}
+        for rec in session.run("""
+            MATCH (p1:PUBLICATION)-[r:COAUTHOR|COVENUE|COTITLE]->(p2:PUBLICATION)
+            RETURN p1.id AS a, p2.id AS b, type(r) AS t,
+                   toFloat(coalesce(r.weight, r.similarity, 0.0)) AS w
+        """):
+            src.append(index_of[rec["a"]])
+            dst.append(index_of[rec["b"]])
+            rel.append(rel_index[rec["t"]])
+            weight.append(rec["w"])
+
+    return {
+        "ids": ids,
+        "community": np.array(community, dtype=np.int64),
+        "target": target,
+        "src": np.array(src, dtype=np.int64),
+        "dst": np.array(dst, dtype=np.int64),
+        "rel": np.array(rel, dtype=np.int64),
+        "weight": np.array(weight, dtype=np.float64),
+    }
+
+
+def community_pair_stats(graph, partition=None):
+    """
+    Sparse community x community statistics per relationship type
+
+    Args
+        graph: dict from load_typed_edges
+        partition: optional {publication id: community} overriding p.community
+                   (e.g. straight from run_louvain / run_leiden)
+
+    Returns dict:
+      - n_communities, target_sizes (target works per community)
+      - count[type], sum[type], mean[type]: upper-triangular CSR matrices (diagonal = intra-community)
+    """
+    import scipy.sparse as sp
+
+    community = graph["community"]
+    if partition is not None:
+        community = np.array([partition.get(pid, -1) for pid in graph["ids"]], dtype=np.int64)
+
+    n_communities = int(community.max()) + 1 if len(community) else 0
+    valid = community >= 0
+    target_sizes = np.bincount(community[graph["target"] & valid], minlength=n_communities)
+
+    src, dst = graph["src"], graph["dst"]
+    keep = graph["target"][src] & graph["target"][dst] & valid[src] & valid[dst]
+    ci, cj = community[src[keep]], community[dst[keep]]
+    lo, hi = np.minimum(ci, cj), np.maximum(ci, cj)
+    rel, weight = graph["rel"][keep], graph["weight"][keep]
+
+    stats = {"n_communities": n_communities, "target_sizes": target_sizes, "count": {}, "sum": {}, "mean": {}}
+    shape = (n_communities, n_communities)
+    for t, rel_type in enumerate(REL_TYPES):
+        m = rel == t
+        count = sp.csr_matrix((np.ones(m.sum()), (lo[m], hi[m])), shape=shape)
+        total = sp.csr_matrix((weight[m], (lo[m], hi[m])), shape=shape)
+        mean = total.multiply(count.power(-1)).tocsr()
+        stats["count"][rel_type] = count
+        stats["sum"][rel_type] = total
+        stats["mean"][rel_type] = mean
+    return stats
+
+
+def rank_merge_candidates(stats, top=20, rel_weights=None):
+    """
+    Rank community pairs (c < d) by weighted inter-community density between target works
+
+    Args
+        stats: dict from community_pair_stats
+        top: number of pairs to return
+        rel_weights: optional {type: multiplier} applied to each type's weight sum
+
+    Returns list of dicts {a, b, score, n_a, n_b, <type>_edges, <type>_sum} sorted by score
+    """
+    import scipy.sparse as sp
+
+    rel_weights = rel_weights or {}
+    n = stats["n_communities"]
+    combined = sp.csr_matrix((n, n))
+    for rel_type in REL_TYPES:
+        combined = combined + rel_weights.get(rel_type, 1.0) * stats["sum"][rel_type]
+
+    inter = sp.triu(combined, k=1).tocoo()
+    sizes = stats["target_sizes"].astype(np.float64)
+    denom = sizes[inter.row] * sizes[inter.col]
+    scores = np.divide(inter.data, denom, out=np.zeros_like(inter.data), where=denom > 0)
+
+    order = np.argsort(-scores)[:top]
+    ranked = []
+    for k in order:
+        a, b = int(inter.row[k]), int(inter.col[k])
+        row = {"a": a, "b": b, "score": float(scores[k]), "n_a": int(sizes[a]), "n_b": int(sizes[b])}
+        for rel_type in REL_TYPES:
+            row[f"{rel_type}_edges"] = int(stats["count"][rel_type][a, b])
+            row[f"{rel_type}_sum"] = float(stats["sum"][rel_type][a, b])
+        ranked.append(row)
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank community pairs that likely split one author")
+    add_connection_arguments(parser)
+    parser.add_argument("--author_id", help="OpenAlex author id of the target author")
+    parser.add_argument("--name", help="Exact display name of the target author (e.g. 'David M. Nathan')")
+    parser.add_argument("--top", type=int, default=20, help="Number of community pairs to show")
+    args = parser.parse_args()
+
+    graph = load_typed_edges(args.uri, args.user, args.password, args.db, args.author_id, args.name)
+    stats = community_pair_stats(graph)
+    print(f"{int(graph['target'].sum())} target works in "
+          f"{int((stats['target_sizes'] > 0).sum())} of {stats['n_communities']} communities")
+
+    for row in rank_merge_candidates(stats, args.top):
+        breakdown = ", ".join(f"{t}: {row[t + '_edges']} edges / {row[t + '_sum']:.2f}" for t in REL_TYPES)
+        print(f"Communities {row['a']} & {row['b']} (n={row['n_a']}, {row['n_b']}): "
+              f"score {row['score']:.3f} | {breakdown}")
+
+
+if __name__ == "__main__":
+    main()
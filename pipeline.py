@@ -0,0 +1,374 @@
+"""
+Pipeline orchestrator: fetch -> import -> cluster -> export
+
+Purpose
+- Run the README workflow (neo4j_data.py, neo4j_import.py, community_detection.py,
+  cluster_export_to_json.py) for several names from one command
+- Fingerprint every stage's inputs and parameters and skip stages whose outputs are current,
+  so a routine refresh only redoes what changed
+- Record per-stage timings
+
+Fingerprints (sha256, chained so a change upstream invalidates everything after it)
+- fetch  : cache file of the name (fetched only when missing, or with --refresh)
+- import : content hash of the cache (for store manifests, of the works they list) + import parameters
+- cluster: import fingerprint + clustering parameters
+- export : cluster fingerprint + export parameters; the export file's own hash is recorded too,
+           so a deleted or edited output is rebuilt
+- State lives in `pipeline_state.json`: per name and stage {fingerprint, seconds, finished, outputs},
+  plus what each database currently holds ({import, cluster} fingerprints)
+
+Concurrency
+- Names run concurrently (--workers). Fetches are independent; the database stages of names
+  sharing a database are serialized (neo4j_import clears the database), so use --db_per_name
+  (one database per name, Neo4j Enterprise) to run those in parallel too; each is created
+  (`CREATE DATABASE ... IF NOT EXISTS WAIT` on `system`) before its first import
+- A name whose export is current is skipped entirely, even when another name has since
+  replaced its graph in a shared database
+- With --stream, a name that has to be fetched is fetched and imported in one overlapped pass
+  (streaming_import.py) under its database lock; both stages are recorded from the written cache.
+  Import parameters streaming does not support (exclude_query_name, max_authors) fall back to
+  the regular fetch and import
+
+Credentials
+- NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD (and NEO4J_DATABASE) from the environment or neo4j_config.json
+  (neo4j_connection.py); every stage shares one pooled driver
+
+Usage
+- `python pipeline.py "David Nathan" "Russell Bowler" --workers 2`
+- `python pipeline.py "David Nathan" --method leiden --force cluster` (rerun from a stage on)
+- `python pipeline.py "David Nathan" --refresh --stream` (overlap fetching with the import)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import cache_format
+from neo4j_connection import get_connection
+
+STAGES = ("fetch", "import", "cluster", "export")
+STATE_PATH = "pipeline_state.json"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 of a file's content"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_digest(path):
+    """
+    sha256 of a cache's content
+
+    A store manifest holds only ids and labels, so its works are hashed too (streamed from the
+    works store); a refetch that changes a work's title or venue then changes the digest
+    """
+    if cache_format.detect_format(path) != cache_format.FORMAT_STORE:
+        return file_digest(path)
+    h = hashlib.sha256(file_digest(path).encode("utf-8"))
+    for work in cache_format.iter_works(path):
+        h.update(b"\0")
+        h.update(json.dumps(work, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def fingerprint(upstream, params):
+    """sha256 of an upstream fingerprint and a JSON-serializable parameter dict"""
+    payload = json.dumps({"upstream": upstream, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def database_name(author_name):
+    """
+    Database name for --db_per_name
+
+    Neo4j allows lowercase letters, digits, dots and dashes, starting with a letter and 3-63 characters
+    long. Accents are folded ("Jörg" -> "jorg") and names starting with a digit get a "db-" prefix.
+    When anything besides case and spacing is lost (accents, other characters, truncation) or the
+    result is too short, a short hash of the full name is appended, so different names never share
+    a database.
+    """
+    folded = unicodedata.normalize("NFKD", author_name.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    name = re.sub(r"[^a-z0-9.]+", "-", folded).strip("-.")
+    if name and not name[0].isalpha():
+        name = "db-" + name
+    if name != re.sub(r"\s+", "-", author_name.lower().strip()) or not 3 <= len(name) <= 63:
+        digest = hashlib.sha256(author_name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:54].rstrip('-.') or 'db'}-{digest}"
+    return name
+
+
+class PipelineState:
+    """Thread-safe view of pipeline_state.json, saved after every change"""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {"names": {}, "databases": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def stage(self, name, stage):
+        with self.lock:
+            return dict(self.data["names"].get(name, {}).get(stage, {}))
+
+    def database(self, db):
+        with self.lock:
+            return dict(self.data["databases"].get(db, {}))
+
+    def record(self, name, stage, fp, seconds, outputs=None, db=None):
+        with self.lock:
+            self.data["names"].setdefault(name, {})[stage] = {
+                "fingerprint": fp, "seconds": round(seconds, 3),
+                "finished": time.strftime("%Y-%m-%dT%H:%M:%S"), "outputs": outputs or {},
+            }
+            if db is not None:
+                held = self.data["databases"].setdefault(db, {})
+                held[stage] = fp
+                if stage == "import":
+                    held.pop("cluster", None)   # a fresh import has no communities yet
+            self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Pipeline:
+    def __init__(self, uri, user, password, db="neo4j", db_per_name=False, cache_fmt=cache_format.FORMAT_JSON,
+                 import_params=None, cluster_params=None, export_params=None, out_dir="exports",
+                 state_path=STATE_PATH, refresh=False, force_from=None, stream=False):
+        """
+        Args
+            uri, user, password: Neo4j connection
+            db (str): database shared by all names (ignored with db_per_name)
+            db_per_name (bool): one database per name (database_name), so names import in parallel
+            cache_fmt (str): cache format for fetched names
+            import_params (dict): neo4j_import.main keyword arguments (author_nodes, cotitle, ...)
+            cluster_params (dict): method, resolution, merge_threshold, knn_k
+            export_params (dict): format ("json" / "ndjson")
+            out_dir (str): export directory (<out_dir>/<Author>_clusters.<format>)
+            refresh (bool): fetch again even when the name is cached
+            force_from (str): rerun this stage and every later one
+            stream (bool): fetch and import names that need fetching concurrently (streaming_import.py)
+        """
+        self.uri, self.user, self.password = uri, user, password
+        self.db = db
+        self.db_per_name = db_per_name
+        self.cache_fmt = cache_fmt
+        self.import_params = import_params or {}
+        self.cluster_params = {"method": "louvain", "resolution": 1.0, "merge_threshold": None, "knn_k": None,
+                               **(cluster_params or {})}
+        self.export_params = {"format": "json", **(export_params or {})}
+        self.out_dir = out_dir
+        self.state = PipelineState(state_path)
+        self.refresh = refresh
+        self.forced = set(STAGES[STAGES.index(force_from):]) if force_from else set()
+        self.stream = stream
+        self.db_locks = {}
+        self._locks_lock = threading.Lock()
+        self.created = set()
+        self.timings = []
+
+    def _db_lock(self, db):
+        with self._locks_lock:
+            return self.db_locks.setdefault(db, threading.Lock())
+
+    def _ensure_database(self, db):
+        """Create a --db_per_name database on first use (call under its database lock)"""
+        if db in self.created:
+            return
+        conn = get_connection(self.uri, self.user, self.password, "system")
+        conn.execute_query("CREATE DATABASE $name IF NOT EXISTS WAIT", {"name": db}, database_="system")
+        self.created.add(db)
+
+    def _timed(self, name, stage, status, seconds):
+        self.timings.append((name, stage, status, seconds))
+        print(f"[{name}] {stage}: {status} ({seconds:.2f}s)")
+
+    # --- Stages ---
+
+    def _can_stream(self):
+        """streaming_import applies no COAUTHOR hub handling; such imports go through _import"""
+        return not self.import_params.get("exclude_query_name") and self.import_params.get("max_authors") is None
+
+    def _needs_fetch(self, name):
+        return cache_format.cache_path(name) is None or self.refresh or "fetch" in self.forced
+
+    def _fetch(self, name):
+        import neo4j_data
+
+        path = cache_format.cache_path(name)
+        if self._needs_fetch(name):
+            start = time.perf_counter()
+            neo4j_data.fetch_data(name, fmt=self.cache_fmt)
+            path = cache_format.cache_path(name)
+            self.state.record(name, "fetch", cache_digest(path), time.perf_counter() - start, {"cache": path})
+            self._timed(name, "fetch", "ran", time.perf_counter() - start)
+        else:
+            self._timed(name, "fetch", "cached", 0.0)
+        return path
+
+    def _stream(self, name, db):
+        """Fetch and import in one overlapped pass; records both stages"""
+        import streaming_import
+
+        params = {k: v for k, v in self.import_params.items()
+                  if k in ("author_nodes", "cotitle", "coauthor_payload")}
+        report = streaming_import.stream_import(self.uri, self.user, self.password, db, name,
+                                                fmt=self.cache_fmt, **params)
+        path = report["cache"]
+        self.state.record(name, "fetch", cache_digest(path), report["fetch_s"], {"cache": path})
+        import_fp = fingerprint(cache_digest(path), {"stage": "import", **self.import_params})
+        self.state.record(name, "import", import_fp, report["import_s"], {"database": db}, db=db)
+        self._timed(name, "fetch", "streamed", report["fetch_s"])
+        self._timed(name, "import", "streamed", report["import_s"])
+        return path
+
+    def _import(self, name, db, path, fp):
+        import neo4j_import
+
+        start = time.perf_counter()
+        neo4j_import.main(self.uri, self.user, self.password, db, path, **self.import_params)
+        self.state.record(name, "import", fp, time.perf_counter() - start, {"database": db}, db=db)
+        self._timed(name, "import", "ran", time.perf_counter() - start)
+
+    def _cluster(self, name, db, fp):
+        import community_detection as cd
+
+        start = time.perf_counter()
+        partition = cd.detect_communities(self.uri, self.user, self.password, db, **self.cluster_params)
+
+        outputs = {"communities": len(set(partition.values())), "nodes": len(partition)}
+        self.state.record(name, "cluster", fp, time.perf_counter() - start, outputs, db=db)
+        self._timed(name, "cluster", "ran", time.perf_counter() - start)
+
+    def _export(self, name, db, fp, out_path):
+        import cluster_export_to_json
+
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        cluster_export_to_json.export_clusters(self.uri, (self.user, self.password), db, out_path,
+                                               self.export_params["format"])
+        outputs = {"path": out_path, "sha256": file_digest(out_path)}
+        self.state.record(name, "export", fp, time.perf_counter() - start, outputs)
+        self._timed(name, "export", "ran", time.perf_counter() - start)
+
+    def _current(self, name, stage, fp):
+        return stage not in self.forced and self.state.stage(name, stage).get("fingerprint") == fp
+
+    def run_name(self, name):
+        """Run (or skip) every stage for one name"""
+        db = database_name(name) if self.db_per_name else self.db
+        streamed = self.stream and self._can_stream() and self._needs_fetch(name)
+        if streamed:
+            with self._db_lock(db):
+                if self.db_per_name:
+                    self._ensure_database(db)
+                path = self._stream(name, db)
+        else:
+            path = self._fetch(name)
+        if path is None:
+            raise FileNotFoundError(f"No cache for {name} after fetching")
+
+        import_fp = fingerprint(cache_digest(path), {"stage": "import", **self.import_params})
+        cluster_fp = fingerprint(import_fp, {"stage": "cluster", **self.cluster_params})
+        export_fp = fingerprint(cluster_fp, {"stage": "export", **self.export_params})
+        out_path = os.path.join(self.out_dir, f"{name}_clusters.{self.export_params['format']}")
+
+        exported = self.state.stage(name, "export").get("outputs", {})
+        if (self._current(name, "export", export_fp) and os.path.exists(out_path)
+                and exported.get("sha256") == file_digest(out_path)):
+            for stage in ("cluster", "export") if streamed else ("import", "cluster", "export"):
+                self._timed(name, stage, "current", 0.0)
+            return
+
+        # Database stages: what the database holds decides what has to run
+        with self._db_lock(db):
+            held = self.state.database(db)
+            # A streamed import is rerun only if another name replaced it in the meantime
+            if ("import" in self.forced and not streamed) or held.get("import") != import_fp:
+                if self.db_per_name:
+                    self._ensure_database(db)
+                self._import(name, db, path, import_fp)
+                held = self.state.database(db)
+            elif not streamed:
+                self._timed(name, "import", "current", 0.0)
+
+            if "cluster" in self.forced or held.get("cluster") != cluster_fp:
+                self._cluster(name, db, cluster_fp)
+            else:
+                self._timed(name, "cluster", "current", 0.0)
+
+            self._export(name, db, export_fp, out_path)
+
+    def run(self, names, workers=1):
+        """Run every name (concurrently with workers > 1); returns the timing rows"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(self.run_name, n) for n in names]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        width = max([len(n) for n in names] + [4])
+        print(f"\n{'Name':<{width}}  {'Stage':<8}  {'Status':<8}  {'Time (s)':>8}")
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        for name, stage, status, seconds in sorted(self.timings, key=lambda r: (r[0], order[r[1]])):
+            print(f"{name:<{width}}  {stage:<8}  {status:<8}  {seconds:>8.2f}")
+        print(f"Pipeline finished in {elapsed:.2f}s")
+        return self.timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, import, cluster and export names, skipping current stages")
+    parser.add_argument("names", nargs="+", help="Author names (e.g. 'David Nathan')")
+    parser.add_argument("--workers", type=int, default=1, help="Names processed concurrently")
+    parser.add_argument("--db_per_name", action="store_true", help="Use one Neo4j database per name")
+    parser.add_argument("--cache_format", choices=list(cache_format.EXTENSIONS), default=cache_format.FORMAT_JSON)
+    parser.add_argument("--refresh", action="store_true", help="Fetch from OpenAlex even when cached")
+    parser.add_argument("--force", choices=STAGES, help="Rerun this stage and all later ones")
+    parser.add_argument("--stream", action="store_true", help="Overlap fetching with the Neo4j import")
+    parser.add_argument("--cotitle", choices=["tfidf", "lsh", "cached"], default="tfidf")
+    parser.add_argument("--method", choices=["louvain", "leiden"], default="louvain")
+    parser.add_argument("--resolution", type=float, default=1.0)
+    parser.add_argument("--merge_threshold", type=float, default=None)
+    parser.add_argument("--knn_k", type=int, default=None)
+    parser.add_argument("--export_format", choices=["json", "ndjson"], default="json")
+    parser.add_argument("--out_dir", default="exports")
+    parser.add_argument("--state", default=STATE_PATH, help="Pipeline state file")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    pipeline = Pipeline(
+        conn.uri, *conn.auth,
+        db=conn.database,
+        db_per_name=args.db_per_name,
+        cache_fmt=args.cache_format,
+        import_params={"cotitle": args.cotitle},
+        cluster_params={"method": args.method, "resolution": args.resolution,
+                        "merge_threshold": args.merge_threshold, "knn_k": args.knn_k},
+        export_params={"format": args.export_format},
+        out_dir=args.out_dir,
+        state_path=args.state,
+        refresh=args.refresh,
+        force_from=args.force,
+        stream=args.stream,
+    )
+    pipeline.run(args.names, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Versioned on-disk snapshots of fused graphs and partitions
+
+Purpose
+- Cluster the same fused graph many times without reloading it from Neo4j
+- Keep every partition (with its parameters and quality metrics) instead of only the
+  last `community` property written to the graph, and compare any two of them
+
+Layout (one directory per snapshot name, e.g. the author name or database)
+    snapshots/<name>/manifest.json     versions and metadata (see below)
+    snapshots/<name>/graph-v<k>.npz    symmetric CSR adjacency (indptr, indices, weights) + id table
+    snapshots/<name>/partition-v<k>.npy  int64 community per node, aligned with its graph's id table (-1 = none)
+
+    manifest = {"graphs": [{version, file, nodes, edges, params, created}],
+                "partitions": [{version, graph, file, method, params, metrics, communities, created}]}
+
+Usage
+    save_graph("David Nathan", G, params={"cotitle_scale": 1.2})
+    G = load_graph("David Nathan")                       # latest graph version
+    v = save_partition("David Nathan", partition, "louvain", {"resolution": 1.0}, {"modularity": Q})
+    diff_partition_versions("David Nathan", v - 1, v)
+- `python snapshots.py list "David Nathan"`
+- `python snapshots.py diff "David Nathan" 1 2`
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+SNAPSHOT_DIR = "snapshots"
+
+
+def _dir(name, root=SNAPSHOT_DIR):
+    return os.path.join(root, name)
+
+
+def read_manifest(name, root=SNAPSHOT_DIR):
+    path = os.path.join(_dir(name, root), "manifest.json")
+    if not os.path.exists(path):
+        return {"graphs": [], "partitions": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(name, manifest, root=SNAPSHOT_DIR):
+    path = os.path.join(_dir(name, root), "manifest.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _entry(entries, version, kind):
+    if not entries:
+        raise FileNotFoundError(f"No {kind} snapshots saved")
+    if version is None:
+        return entries[-1]
+    for entry in entries:
+        if entry["version"] == version:
+            return entry
+    raise KeyError(f"No {kind} snapshot version {version}")
+
+
+# --- Graphs ---
+
+def save_graph(name, G, params=None, root=SNAPSHOT_DIR):
+    """Save a weighted networkx graph as a new graph version; returns the version number"""
+    import networkx as nx
+
+    os.makedirs(_dir(name, root), exist_ok=True)
+    manifest = read_manifest(name, root)
+    version = manifest["graphs"][-1]["version"] + 1 if manifest["graphs"] else 1
+
+    ids = list(G.nodes())
+    A = nx.to_scipy_sparse_array(G, nodelist=ids, weight="weight", format="csr")
+    file = f"graph-v{version}.npz"
+    tmp = os.path.join(_dir(name, root), file + ".tmp.npz")
+    np.savez_compressed(tmp, indptr=A.indptr, indices=A.indices, weights=A.data,
+                        ids=np.array([str(i) for i in ids], dtype=str))
+    os.replace(tmp, os.path.join(_dir(name, root), file))
+
+    manifest["graphs"].append({
+        "version": version, "file": file,
+        "nodes": len(ids), "edges": G.number_of_edges(),
+        "params": params or {}, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    write_manifest(name, manifest, root)
+    return version
+
+
+def load_graph_arrays(name, version=None, root=SNAPSHOT_DIR):
+    """(ids, csr adjacency) of a graph version (latest by default), without building networkx objects"""
+    import scipy.sparse as sp
+
+    entry = _entry(read_manifest(name, root)["graphs"], version, "graph")
+    with np.load(os.path.join(_dir(name, root), entry["file"]), allow_pickle=False) as z:
+        ids = z["ids"].tolist()
+        A = sp.csr_matrix((z["weights"], z["indices"], z["indptr"]), shape=(len(ids), len(ids)))
+    return ids, A
+
+
+def load_graph(name, version=None, root=SNAPSHOT_DIR):
+    """Weighted networkx graph of a graph version (latest by default)"""
+    import networkx as nx
+    import scipy.sparse as sp
+
+    ids, A = load_graph_arrays(name, version, root)
+    upper = sp.triu(A, k=1).tocoo()
+    G = nx.Graph()
+    G.add_nodes_from(ids)
+    G.add_weighted_edges_from(zip([ids[i] for i in upper.row.tolist()],
+                                  [ids[j] for j in upper.col.tolist()],
+                                  upper.data.tolist()))
+    return G
+
+
+# --- Partitions ---
+
+def save_partition(name, partition, method=None, params=None, metrics=None, graph_version=None,
+                   root=SNAPSHOT_DIR):
+    """
+    Save {node id: community} aligned with a graph version's id table; returns the partition version
+
+    Nodes of the partition missing from the graph are ignored; graph nodes missing from it get -1
+    """
+    manifest = read_manifest(name, root)
+    graph = _entry(manifest["graphs"], graph_version, "graph")
+    with np.load(os.path.join(_dir(name, root), graph["file"]), allow_pickle=False) as z:
+        ids = z["ids"].tolist()
+
+    labels = np.array([partition.get(node, -1) for node in ids], dtype=np.int64)
+    version = manifest["partitions"][-1]["version"] + 1 if manifest["partitions"] else 1
+    file = f"partition-v{version}.npy"
+    np.save(os.path.join(_dir(name, root), file), labels)
+
+    manifest["partitions"].append({
+        "version": version, "graph": graph["version"], "file": file,
+        "method": method, "params": params or {}, "metrics": metrics or {},
+        "communities": int(len(np.unique(labels[labels >= 0]))),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    write_manifest(name, manifest, root)
+    return version
+
+
+def load_partition_array(name, version=None, root=SNAPSHOT_DIR):
+    """Community array of a partition version (latest by default), aligned with its graph's ids"""
+    entry = _entry(read_manifest(name, root)["partitions"], version, "partition")
+    return np.load(os.path.join(_dir(name, root), entry["file"]), allow_pickle=False)
+
+
+def load_partition(name, version=None, root=SNAPSHOT_DIR):
+    """{node id: community} of a partition version (latest by default)"""
+    manifest = read_manifest(name, root)
+    entry = _entry(manifest["partitions"], version, "partition")
+    ids, _ = load_graph_arrays(name, entry["graph"], root)
+    labels = np.load(os.path.join(_dir(name, root), entry["file"]), allow_pickle=False)
+    return {node: int(c) for node, c in zip(ids, labels.tolist()) if c >= 0}
+
+
+def diff_partitions(a, b):
+    """
+    Compare two community arrays over the same nodes (-1 entries are ignored)
+
+    Returns dict:
+      - nodes, communities_a, communities_b
+      - same_label: nodes with the identical community id in both (meaningful when ids are stable)
+      - moved: nodes outside the best-matching b community of their a community
+      - split / merged: a communities spread over several b communities, b communities fed by several a ones
+      - ari: adjusted Rand index
+    """
+    import scipy.sparse as sp
+
+    a, b = np.asarray(a), np.asarray(b)
+    if a.shape != b.shape:
+        raise ValueError("Partitions must be aligned with the same graph")
+    valid = (a >= 0) & (b >= 0)
+    a, b = a[valid], b[valid]
+    n = len(a)
+    if n == 0:
+        return {"nodes": 0, "communities_a": 0, "communities_b": 0, "same_label": 0,
+                "moved": 0, "split": 0, "merged": 0, "ari": 1.0}
+
+    _, ia = np.unique(a, return_inverse=True)
+    _, ib = np.unique(b, return_inverse=True)
+    C = sp.coo_matrix((np.ones(n), (ia.ravel(), ib.ravel()))).tocsr()
+    C.sum_duplicates()
+
+    def pairs(x):
+        x = np.asarray(x, dtype=np.float64)
+        return float((x * (x - 1) / 2).sum())
+
+    index = pairs(C.data)
+    rows, cols = pairs(np.asarray(C.sum(axis=1)).ravel()), pairs(np.asarray(C.sum(axis=0)).ravel())
+    expected = rows * cols / pairs([n]) if n > 1 else 0.0
+    max_index = (rows + cols) / 2
+    ari = 1.0 if max_index == expected else (index - expected) / (max_index - expected)
+
+    return {
+        "nodes": n,
+        "communities_a": C.shape[0],
+        "communities_b": C.shape[1],
+        "same_label": int((a == b).sum()),
+        "moved": int(n - C.max(axis=1).toarray().sum()),
+        "split": int((np.diff(C.indptr) > 1).sum()),
+        "merged": int((np.diff(C.tocsc().indptr) > 1).sum()),
+        "ari": float(ari),
+    }
+
+
+def diff_partition_versions(name, version_a, version_b, root=SNAPSHOT_DIR):
+    """diff_partitions of two saved versions, aligned through node ids when their graphs differ"""
+    entries = read_manifest(name, root)["partitions"]
+    ea, eb = _entry(entries, version_a, "partition"), _entry(entries, version_b, "partition")
+    if ea["graph"] == eb["graph"]:
+        return diff_partitions(load_partition_array(name, version_a, root),
+                               load_partition_array(name, version_b, root))
+    pa, pb = load_partition(name, version_a, root), load_partition(name, version_b, root)
+    nodes = [node for node in pa if node in pb]
+    return diff_partitions([pa[node] for node in nodes], [pb[node] for node in nodes])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or compare graph / partition snapshots")
+    parser.add_argument("command", choices=["list", "diff"])
+    parser.add_argument("name", help="Snapshot name (directory under snapshots/)")
+    parser.add_argument("versions", type=int, nargs="*", help="Two partition versions for diff")
+    parser.add_argument("--root", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        manifest = read_manifest(args.name, args.root)
+        for g in manifest["graphs"]:
+            print(f"graph v{g['version']}: {g['nodes']} nodes, {g['edges']} edges  {g['created']}  {g['params']}")
+        for p in manifest["partitions"]:
+            metrics = ", ".join(f"{k} {v:.4f}" if isinstance(v, float) else f"{k} {v}" for k, v in p["metrics"].items())
+            print(f"partition v{p['version']} (graph v{p['graph']}): {p['method']} {p['params']} -> "
+                  f"{p['communities']} communities | {metrics}")
+    else:
+        if len(args.versions) != 2:
+            parser.error("diff needs two partition versions")
+        for key, value in diff_partition_versions(args.name, *args.versions, root=args.root).items():
+            print(f"{key:>14}: {value:.4f}" if isinstance(value, float) else f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
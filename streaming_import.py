@@ -0,0 +1,218 @@
+"""
+Streaming fetch + import: OpenAlex fetching overlapped with Neo4j ingestion
+
+Purpose
+- neo4j_data.fetch_data has to finish every candidate's works before neo4j_import.main starts, so
+  the network-bound and the database-bound phases run back to back
+- Here the works of each candidate author flow through a bounded queue straight into node
+  ingestion and incremental edge construction; end-to-end time approaches the longer of the
+  two phases instead of their sum
+
+How it works
+1) Candidates are resolved with fetch_author_data (labels 0, 1, 2, ... in candidate order, as neo4j_data.py)
+2) Producer: a thread pool fetches the works of every candidate; each finished candidate is put on
+   a bounded queue (a full queue stalls the fetch workers, so memory stays bounded)
+3) Consumer: for every queued candidate, its works not seen yet become PUBLICATION (and AUTHOR) nodes,
+   then their COAUTHOR / COVENUE edges to the works already loaded (incremental_clustering.EdgeIndex)
+   are written, all in UNWIND batches
+4) Once the producer is done, COTITLE edges are computed over all titles (any cotitle mode of
+   neo4j_import.py) and the cache file is written, exactly as neo4j_data.py would have written it
+
+Usage
+- `python streaming_import.py "David Nathan"` (replaces `neo4j_data.py` + `neo4j_import.py` for one name)
+- `python pipeline.py "David Nathan" --stream` does the same for names that need fetching
+
+Notes
+- Like neo4j_import.main, the database is cleared first
+- COAUTHOR hub handling (exclude_query_name / max_authors) is not applied; run neo4j_import.py on
+  the written cache when it is needed
+"""
+
+import argparse
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import openAlex_to_HGCN as oth
+import cache_format
+from incremental_clustering import REL_TYPES, EdgeIndex, write_edges, write_works
+from neo4j_connection import add_connection_arguments
+from neo4j_import import Neo4jImportData, PAYLOAD_FULL, COAUTHOR_PAYLOADS
+
+_DONE = object()
+
+
+def _put(out, item, stop):
+    """Blocking put that gives up once the consumer has stopped"""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _produce(author_ids, out, stop, timings, workers=4, max_works=100):
+    """Fetch the works of every candidate and queue (author_id, works); ends with _DONE or the exception"""
+    def fetch(author_id):
+        if not stop.is_set():
+            _put(out, (author_id, oth.fetch_works_for_author(author_id, max_works)), stop)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(fetch, author_id) for author_id in author_ids]:
+                future.result()
+        timings["fetch_end"] = time.perf_counter()
+        _put(out, _DONE, stop)
+    except BaseException as e:
+        _put(out, e, stop)
+
+
+def cotitle_pairs(name, ids, titles, cotitle="tfidf", min_similarity=0.60):
+    """
+    COTITLE pairs over all works, with the same modes as neo4j_import.main
+
+    Pairs come back as (a, b, sim) with a < b, the direction add_cotitle_edge_from_pairs MERGEs
+    (cotitle_cache.apply_cotitle_pairs matches edges by direction)
+    """
+    if cotitle == "lsh":
+        from title_lsh import cotitle_pairs_lsh
+        pairs = cotitle_pairs_lsh(ids, titles, min_similarity)
+    elif cotitle == "cached":
+        from cotitle_cache import load_or_compute
+        pairs = load_or_compute(name, ids, titles, min_similarity).pairs(min_similarity)
+    else:
+        from title_lsh import exact_cotitle_pairs
+        pairs = exact_cotitle_pairs(ids, titles, min_similarity)
+    return [(*sorted((a, b)), sim) for a, b, sim in pairs if a != b]
+
+
+def stream_import(uri, user, password, db, name, author_data=None, fmt=cache_format.FORMAT_JSON,
+                  author_nodes=False, cotitle="tfidf", min_similarity=0.60, coauthor_payload=PAYLOAD_FULL,
+                  workers=4, queue_size=8, max_works=100, batch_size=1000):
+    """
+    Fetch a name from OpenAlex and import it into Neo4j while it is being fetched
+
+    Args
+        uri, user, password: Neo4j connection (None: from neo4j_connection's environment / config file)
+        db (str): database name (cleared first)
+        name (str): author name to fetch
+        author_data (dict): already resolved candidates (e.g. from fetch_author_data_batch)
+        fmt (str): cache format written at the end
+        author_nodes (bool): also create AUTHOR nodes and AUTHORED relationships
+        cotitle (str): "tfidf", "lsh" or "cached" (see neo4j_import.main)
+        min_similarity (float): COTITLE cosine threshold
+        coauthor_payload (str): "full", "ids" or "none" (see neo4j_import.add_coauthor_edge)
+        workers (int): concurrent works fetches
+        queue_size (int): fetched candidates waiting for import before the fetch workers stall
+        max_works (int): works fetched per candidate
+
+    Returns dict: works, edges (count per type), cache (path), fetch_s, import_s (time the consumer
+                  spent importing), total_s
+    """
+    start = time.perf_counter()
+    if author_data is None:
+        author_data = oth.fetch_author_data(name)
+    author_id_to_label = {author_id: str(i) for i, author_id in enumerate(author_data.keys())}
+
+    path = cache_format.cache_path(name, fmt)
+    imp = Neo4jImportData(uri, user, password, db, path)
+    db = imp.db
+    out = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    timings = {}
+    producer = threading.Thread(target=_produce, daemon=True,
+                                args=(list(author_data), out, stop, timings, workers, max_works))
+    try:
+        producer.start()
+        import_start = time.perf_counter()
+        imp.delete_all_nodes()
+        imp.create_indexes()
+        import_s = time.perf_counter() - import_start
+
+        index = EdgeIndex()
+        fetched = {}
+        counts = Counter()
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            author_id, author_works = item
+            fetched[author_id] = author_works
+
+            import_start = time.perf_counter()
+            new_works, edges = [], []
+            for work in author_works:
+                if work["id"] in index:
+                    continue
+                new_works.append(work)
+                edges.extend((other, work["id"], t, props) for other, t, props in index.add(work))
+            write_works(imp.driver, db, new_works, author_nodes=author_nodes, batch_size=batch_size)
+            write_edges(imp.driver, db, edges, coauthor_payload, batch_size)
+            counts.update(t for _, _, t, _ in edges)
+            import_s += time.perf_counter() - import_start
+            print(f"Imported {len(new_works)} works of {author_id} ({len(index)} total, {out.qsize()} queued)")
+        fetch_s = timings["fetch_end"] - start
+
+        # Cache in candidate order, as neo4j_data.fetch_data writes it
+        import_start = time.perf_counter()
+        works_data = {}
+        for author_id, author in author_data.items():
+            author["works"] = [w["id"] for w in fetched[author_id]]
+            for work in fetched[author_id]:
+                works_data[work["id"]] = work
+
+        pairs = cotitle_pairs(name, list(works_data), [w.get("title") for w in works_data.values()],
+                              cotitle, min_similarity)
+        write_edges(imp.driver, db, [(a, b, "COTITLE", {"similarity": float(sim)}) for a, b, sim in pairs],
+                    coauthor_payload, batch_size)
+        counts["COTITLE"] += len(pairs)
+        import_s += time.perf_counter() - import_start
+
+        oth.save_data_to_json(name, author_data, works_data, author_id_to_label, fmt)
+        imp.node_count()
+        imp.edge_count()
+    finally:
+        stop.set()
+        imp.close()
+
+    return {
+        "works": len(works_data),
+        "edges": dict(counts),
+        "cache": path,
+        "fetch_s": fetch_s,
+        "import_s": import_s,
+        "total_s": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch a name from OpenAlex and import it into Neo4j concurrently")
+    parser.add_argument("name", help="Author name to fetch (e.g. 'David Nathan')")
+    add_connection_arguments(parser)
+    parser.add_argument("--format", choices=list(cache_format.EXTENSIONS), default=cache_format.FORMAT_JSON,
+                        help="Cache format to write")
+    parser.add_argument("--cotitle", choices=["tfidf", "lsh", "cached"], default="tfidf")
+    parser.add_argument("--coauthor_payload", choices=COAUTHOR_PAYLOADS, default=PAYLOAD_FULL)
+    parser.add_argument("--author_nodes", action="store_true", help="Also create AUTHOR nodes (author_queries.py)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent works fetches")
+    parser.add_argument("--queue_size", type=int, default=8, help="Fetched candidates buffered for import")
+    args = parser.parse_args()
+
+    report = stream_import(
+        args.uri, args.user, args.password, args.db, args.name, fmt=args.format,
+        author_nodes=args.author_nodes, cotitle=args.cotitle, coauthor_payload=args.coauthor_payload,
+        workers=args.workers, queue_size=args.queue_size,
+    )
+    edges = ", ".join(f"{t}: {report['edges'].get(t, 0)}" for t in REL_TYPES)
+    print(f"{report['works']} works | {edges} | cache: {report['cache']}")
+    print(f"fetch {report['fetch_s']:.2f}s | import {report['import_s']:.2f}s | "
+          f"total {report['total_s']:.2f}s (sequential ~{report['fetch_s'] + report['import_s']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
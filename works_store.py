@@ -0,0 +1,264 @@
+"""
+Global deduplicated works store with per-name manifests
+
+Purpose
+- Keep one copy of every OpenAlex work, shared by all cached names, in an indexed SQLite file
+- Keep each name's own data small: a manifest with candidate authors, labels, and work ids
+
+What it creates
+- cache/works.sqlite
+    works(id TEXT PRIMARY KEY, title, year, venue, authors JSON)
+- cache/<Author Name>_data.manifest.json
+  {
+    "format": "works-store",
+    "store": "works.sqlite",                      (relative to the manifest's directory)
+    "author_name": str,
+    "author_data": {<openalex_author_id>: {..., "works": [work ids]}},
+    "author_id_to_label": {<openalex_author_id>: "0|1|2|..."},
+    "work_ids": [work ids, in works_data order]
+  }
+
+How to run
+- Write a name through the store: `python neo4j_data.py "David Nathan" --format store`
+- Move existing caches (and cache/works/*_works.json) into the store:
+  `python works_store.py --migrate`
+
+Notes
+- Readers go through cache_format.read_cache / iter_works, which detect manifests by file name
+- Name-level reads are primary-key lookups on the store; no directory scans and no duplicate parsing
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+
+
+MANIFEST_FORMAT = "works-store"
+MANIFEST_SUFFIX = ".manifest.json"
+STORE_FILE = "works.sqlite"
+CACHE_DIR = "cache"
+
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 900
+
+
+def manifest_path(author_name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{author_name}_data{MANIFEST_SUFFIX}")
+
+
+def is_manifest(path):
+    return str(path).endswith(MANIFEST_SUFFIX)
+
+
+class WorksStore:
+    def __init__(self, path=os.path.join(CACHE_DIR, STORE_FILE)):
+        """
+        Open (and create if needed) the works store
+
+        Args
+            path (str): SQLite file holding the deduplicated works
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS works (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                year INTEGER,
+                venue TEXT,
+                authors TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT count(*) FROM works").fetchone()[0]
+
+    def put_works(self, works):
+        """Insert or refresh works (cache work schema); returns the number written"""
+        rows = [(w["id"], w.get("title"), w.get("year"), w.get("venue"), json.dumps(w.get("authors", [])))
+                for w in works]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO works (id, title, year, venue, authors) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def iter_works(self, work_ids):
+        """Yield works for `work_ids` in the given order, looked up by primary key in chunks"""
+        work_ids = list(work_ids)
+        for start in range(0, len(work_ids), _LOOKUP_CHUNK):
+            chunk = work_ids[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found = {
+                row[0]: {"id": row[0], "title": row[1], "year": row[2], "authors": json.loads(row[4]), "venue": row[3]}
+                for row in self.conn.execute(
+                    f"SELECT id, title, year, venue, authors FROM works WHERE id IN ({placeholders})", chunk)
+            }
+            for wid in chunk:
+                if wid in found:
+                    yield found[wid]
+
+    def get_works(self, work_ids):
+        """works_data dict {work_id: work} for `work_ids`, in the given order"""
+        return {work["id"]: work for work in self.iter_works(work_ids)}
+
+
+# --- Manifests ---
+
+def _store_for(manifest_file, manifest):
+    return WorksStore(os.path.join(os.path.dirname(manifest_file), manifest.get("store", STORE_FILE)))
+
+
+def read_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"{path} is not a works-store manifest")
+    return manifest
+
+
+def write_manifest(path, author_name, author_data, author_id_to_label, work_ids):
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "store": STORE_FILE,
+        "author_name": author_name,
+        "author_data": author_data,
+        "author_id_to_label": author_id_to_label,
+        "work_ids": list(work_ids),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def save_name(path, data):
+    """Write a cache dict as store rows plus a manifest at `path`"""
+    manifest_dir = os.path.dirname(path) or "."
+    with WorksStore(os.path.join(manifest_dir, STORE_FILE)) as store:
+        store.put_works(data["works_data"].values())
+    write_manifest(path, data.get("author_name"), data["author_data"], data["author_id_to_label"],
+                   data["works_data"].keys())
+
+
+def iter_name_works(path):
+    """Stream a name's works from the store in manifest order"""
+    manifest = read_manifest(path)
+    with _store_for(path, manifest) as store:
+        yield from store.iter_works(manifest["work_ids"])
+
+
+def load_name(path):
+    """Read a manifest and its works into the cache dict"""
+    manifest = read_manifest(path)
+    with _store_for(path, manifest) as store:
+        works_data = store.get_works(manifest["work_ids"])
+    return {
+        "author_name": manifest.get("author_name"),
+        "author_data": manifest["author_data"],
+        "works_data": works_data,
+        "author_id_to_label": manifest["author_id_to_label"],
+    }
+
+
+def read_name_metadata(path):
+    manifest = read_manifest(path)
+    return {k: manifest.get(k) for k in ("author_name", "author_data", "author_id_to_label")}
+
+
+def add_author_works(author_name, author_id, works, cache_dir=CACHE_DIR):
+    """
+    Store works fetched for one candidate author and record them in the name's manifest
+
+    Creates the manifest if the name has none yet, seeding it from the name's
+    JSON or columnar cache when one exists. Returns the manifest path.
+    """
+    # Imported here: cache_format imports this module for format detection
+    import cache_format
+
+    path = manifest_path(author_name, cache_dir)
+    existing = cache_format.cache_path(author_name, cache_dir=cache_dir)
+    if not os.path.exists(path) and existing is not None:
+        save_name(path, cache_format.read_cache(existing))
+
+    if os.path.exists(path):
+        manifest = read_manifest(path)
+    else:
+        manifest = {"author_name": author_name, "author_data": {}, "author_id_to_label": {}, "work_ids": []}
+
+    with WorksStore(os.path.join(cache_dir, STORE_FILE)) as store:
+        store.put_works(works)
+
+    new_ids = [w["id"] for w in works]
+    known = set(manifest["work_ids"])
+    work_ids = manifest["work_ids"] + [wid for wid in new_ids if wid not in known]
+
+    author = manifest["author_data"].get(author_id)
+    if author is not None:
+        author_known = set(author["works"])
+        author["works"] = author["works"] + [wid for wid in new_ids if wid not in author_known]
+
+    write_manifest(path, author_name, manifest["author_data"], manifest["author_id_to_label"], work_ids)
+    return path
+
+
+def migrate(cache_dir=CACHE_DIR):
+    """
+    Move every per-name cache in `cache_dir` (JSON or columnar) and any legacy
+    cache/works/<name>_<author_id>_works.json files into the store + manifests
+
+    The migrated JSON / columnar files are renamed to `*.superseded` (cache_format.supersede_other_formats)
+    """
+    import cache_format
+
+    migrated = []
+    for author_name in cache_format.list_cached_names(cache_dir):
+        path = manifest_path(author_name, cache_dir)
+        src = cache_format.cache_path(author_name, cache_dir=cache_dir)
+        if src != path:
+            save_name(path, cache_format.read_cache(src))
+            migrated.append(author_name)
+        cache_format.supersede_other_formats(path)
+
+    works_dir = os.path.join(cache_dir, "works")
+    if os.path.isdir(works_dir):
+        for file in sorted(os.listdir(works_dir)):
+            if not file.endswith("_works.json"):
+                continue
+            author_name, _, author_id = file[:-len("_works.json")].rpartition("_")
+            with open(os.path.join(works_dir, file), 'r', encoding='utf-8') as f:
+                add_author_works(author_name, author_id, json.load(f), cache_dir)
+
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated works store for cached names")
+    parser.add_argument("--migrate", action="store_true", help="Move existing caches into the store")
+    parser.add_argument("--cache_dir", default=CACHE_DIR, help="Cache directory")
+    args = parser.parse_args()
+
+    if args.migrate:
+        names = migrate(args.cache_dir)
+        print(f"Migrated {len(names)} names into {os.path.join(args.cache_dir, STORE_FILE)}")
+
+    with WorksStore(os.path.join(args.cache_dir, STORE_FILE)) as store:
+        print(f"Works in store: {len(store)}")
+
+
+if __name__ == "__main__":
+    main()